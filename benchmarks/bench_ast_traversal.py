@@ -0,0 +1,103 @@
+"""
+Benchmark dos percursos da AST de node.py.
+
+Monta uma árvore de 1 milhão de nós e compara os percursos por geradores
+(pilhas explícitas e deque) e a busca indexada por tipo com as versões
+anteriores: recursão para DFS e busca, `list.pop(0)` para BFS.
+
+Uso:
+    python benchmarks/bench_ast_traversal.py [nós]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from cheesepp.node import *
+
+
+def old_find(node, node_type):
+    """find_nodes_by_type anterior: recursivo, percorre a árvore toda"""
+    result = []
+
+    def visit(current):
+        if current.node_type == node_type:
+            result.append(current)
+        for child in current.children:
+            visit(child)
+    visit(node)
+    return result
+
+
+def old_bfs(node):
+    """breadth_first_search anterior: fila numa lista com pop(0)"""
+    queue = [node]
+    count = 0
+    while queue:
+        current = queue.pop(0)
+        count += 1
+        queue.extend(current.children)
+    return count
+
+
+def chain(length, seed):
+    """Cadeia `v plus 1 plus 2 ...` com `length` operadores"""
+    expr = VariableNode(f"v{seed}")
+    for i in range(length):
+        expr = BinaryOpNode(expr, "+", LiteralNode(i, "int"))
+    return expr
+
+
+def build(total):
+    # Cada atribuição: 1 + cadeia de 2 * 499 + 1 nós = 1000 nós
+    statements = [AssignmentNode(f"x{i}", chain(499, i)) for i in range(total // 1000)]
+    return ProgramNode(statements)
+
+
+def timed(label, function, *args):
+    start = time.perf_counter()
+    try:
+        value = function(*args)
+    except RecursionError:
+        print(f"  {label:<36} RecursionError")
+        return None
+    print(f"  {label:<36} {(time.perf_counter() - start) * 1000:9.1f} ms")
+    return value
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    print(f"árvore de {total} nós (atribuições com cadeias de 499 operadores)")
+    tree = timed("montar (com índice por tipo)", build, total)
+    count = timed("pré-ordem (gerador)", lambda: sum(1 for _ in ASTTraverser.iter_preorder(tree)))
+    timed("pós-ordem (gerador)", lambda: sum(1 for _ in ASTTraverser.iter_postorder(tree)))
+    timed("largura (deque)", lambda: sum(1 for _ in ASTTraverser.iter_breadth_first(tree)))
+    timed("largura anterior (pop(0))", old_bfs, tree)
+    literals = timed("busca por tipo, índice (1ª, ordena)", ASTTraverser.find_nodes_by_type, tree, NodeType.LITERAL)
+    timed("busca por tipo, índice (repetida)", ASTTraverser.find_nodes_by_type, tree, NodeType.LITERAL)
+    timed("busca por tipo, sem ordem", ASTTraverser.find_nodes_by_type_unordered, tree, NodeType.LITERAL)
+    timed("busca por tipo anterior (recursiva)", old_find, tree, NodeType.LITERAL)
+    print(f"  {count} nós, {len(literals)} literais")
+
+    # Remover e religar uma atribuição atualiza o índice só com a subárvore dela
+    statement = tree.children[len(tree.children) // 2]
+    timed("remover uma atribuição", tree.remove_child, statement)
+    timed("religar a atribuição", tree.add_child, statement)
+
+    wide = ProgramNode([PrintNode(LiteralNode(i, "int")) for i in range(50_000)])
+    print("árvore larga (50 mil comandos no mesmo nível)")
+    timed("largura (deque)", lambda: sum(1 for _ in ASTTraverser.iter_breadth_first(wide)))
+    timed("largura anterior (pop(0))", old_bfs, wide)
+
+    deep = ProgramNode([AssignmentNode("x", chain(100_000, 0))])
+    print("árvore profunda (cadeia de 100 mil operadores)")
+    timed("busca por tipo, índice (1ª, ordena)", ASTTraverser.find_nodes_by_type, deep, NodeType.BINARY_OP)
+    timed("busca por tipo, índice (repetida)", ASTTraverser.find_nodes_by_type, deep, NodeType.BINARY_OP)
+    timed("busca por tipo anterior (recursiva)", old_find, deep, NodeType.BINARY_OP)
+    timed("ast_to_dict", ast_to_dict, deep)
+
+
+if __name__ == "__main__":
+    main()
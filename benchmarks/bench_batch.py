@@ -0,0 +1,63 @@
+"""
+Benchmark do modo em lote (NumPy).
+
+Compara uma chamada de BatchRuntime sobre N registros com N chamadas
+separadas de Runtime.run (medidas numa amostra e extrapoladas).
+
+Uso:
+    python benchmarks/bench_batch.py [registros]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+
+from cheesepp.parser import parse
+from cheesepp.runtime import Runtime
+from cheesepp.batch import BatchRuntime
+
+
+FORMULA = """Cheese
+Glyn(total) = x times 3 plus y;
+Stilton total greater 100 Blue
+    Glyn(faixa) = 2;
+White
+    Glyn(faixa) = 1;
+Glyn(i) = 0;
+Cheddar
+    Glyn(total) = total divided 2;
+    Glyn(i) = i plus 1;
+Coleraine total less 10
+NoCheese"""
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    program = parse(FORMULA)
+    rng = np.random.default_rng(42)
+    xs = rng.integers(0, 1000, n)
+    ys = rng.integers(0, 1000, n)
+
+    start = time.perf_counter()
+    BatchRuntime(n).run(program, FORMULA, inputs={"x": xs, "y": ys})
+    batch_time = time.perf_counter() - start
+
+    sample = min(n, 10_000)
+    start = time.perf_counter()
+    for x, y in zip(xs[:sample].tolist(), ys[:sample].tolist()):
+        rt = Runtime()
+        rt.env.update(x=x, y=y)
+        rt.run(program, FORMULA)
+    scalar_time = (time.perf_counter() - start) * n / sample
+
+    print(f"{n} registros")
+    print(f"  BatchRuntime:          {batch_time:.3f}s")
+    print(f"  Runtime por registro:  {scalar_time:.3f}s (estimado a partir de {sample})")
+    print(f"  ganho:                 {scalar_time / batch_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Benchmark de expressões longas.
+
+Avalia uma cadeia `1 plus 1 plus ...` com N termos (a espinha esquerda da
+gramática vira uma árvore de profundidade N) e um loop com expressões de
+tamanho médio, que exercita a forma pós-fixa guardada em cache.
+
+Uso:
+    python benchmarks/bench_deep_expr.py [termos]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from cheesepp.parser import parse
+from cheesepp.runtime import Runtime
+
+
+LOOP = """Cheese
+Glyn(i) = 0;
+Glyn(s) = 0;
+Cheddar
+    Glyn(i) = i plus 1;
+    Glyn(s) = s plus i times 2 minus i divided 4 plus i times i minus 3 plus 1;
+Coleraine i greater_equals 100000
+NoCheese"""
+
+
+def main():
+    terms = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    source = "Cheese Glyn(x) = " + " plus ".join(["1"] * terms) + "; NoCheese"
+
+    start = time.perf_counter()
+    program = parse(source)
+    parsed = time.perf_counter()
+    runtime = Runtime()
+    runtime.run(program, source)
+    finished = time.perf_counter()
+    assert runtime.env["x"] == terms
+
+    print(f"Expressão com {terms} termos (limite de recursão: {sys.getrecursionlimit()})")
+    print(f"  parse:     {parsed - start:.3f}s")
+    print(f"  execução:  {finished - parsed:.3f}s")
+
+    program = parse(LOOP)
+    start = time.perf_counter()
+    Runtime().run(program, LOOP)
+    print(f"Loop com expressões de 10 termos, 100000 iterações: {time.perf_counter() - start:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
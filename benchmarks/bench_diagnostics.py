@@ -0,0 +1,75 @@
+"""
+Benchmark dos diagnósticos em fluxo (diagnostics.py).
+
+Verifica um lote de arquivos com erros de sintaxe e compara o pico de
+memória e o tempo de dois jeitos de relatar: juntar todos os erros num
+ErrorReporter e formatar no fim, e escrever cada erro em JSONL assim que
+ele aparece, guardando só as contagens (keep=0).
+
+Uso:
+    python benchmarks/bench_diagnostics.py [arquivos] [erros por arquivo]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from cheesepp.cli import check_file
+from cheesepp.diagnostics import JSONLWriter
+from cheesepp.errors import ErrorReporter
+
+
+def write_files(directory, files, errors):
+    paths = []
+    for f in range(files):
+        lines = [f"Glyn(a{i}) = a{i} plus {i};" if i % 3 else f"Glyn(a{i}) = a{i} plus ;"
+                 for i in range(errors * 3)]
+        path = os.path.join(directory, f"programa_{f}.cheesepp")
+        with open(path, "w") as out:
+            out.write("Cheese\n" + "\n".join(lines) + "\nNoCheese")
+        paths.append(path)
+    return paths
+
+
+def collected(paths, errors):
+    reporter = ErrorReporter()
+    reporter.max_errors = errors
+    for path in paths:
+        check_file(path, reporter)
+    return len(reporter.get_formatted_errors()), reporter.get_error_count()
+
+
+def streamed(paths, errors):
+    with open(os.devnull, "w") as devnull, JSONLWriter(devnull) as sink:
+        reporter = ErrorReporter(sink=sink, keep=0)
+        reporter.max_errors = errors
+        for path in paths:
+            check_file(path, reporter)
+    return sink.written, reporter.get_error_count()
+
+
+def measure(label, function, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    _, count = function(*args)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<28} {seconds * 1000:9.1f} ms  pico {peak / 1024:9.0f} KiB  ({count} erros)")
+
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000
+    errors = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_files(directory, files, errors)
+        print(f"{files} arquivos, {errors} erros em cada")
+        measure("juntar e formatar no fim", collected, paths, errors)
+        measure("JSONL em fluxo, keep=0", streamed, paths, errors)
+
+
+if __name__ == "__main__":
+    main()
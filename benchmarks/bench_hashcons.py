@@ -0,0 +1,120 @@
+"""
+Benchmark do hash-consing da AST.
+
+Gera dois corpora com subexpressões repetidas e compara, com e sem o
+compartilhamento de nós, a quantidade de nós de expressão, a memória
+retida pela AST e o tempo de parse.
+
+Uso:
+    python benchmarks/bench_hashcons.py
+"""
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from cheesepp.ast import *
+from cheesepp.parser import parse
+from cheesepp.transformer import ConstantPool
+
+
+class NoSharing(ConstantPool):
+    """Uma string e um nó novos a cada ocorrência"""
+
+    def name(self, token):
+        return str(token)
+
+    def _shared(self, table, key, factory):
+        return factory(key)
+
+    def binop(self, left, op, right):
+        return BinOp(left, op, right)
+
+
+def accumulator_corpus(variables=1000, reads=10):
+    lines = [f"Glyn(var{i}) = {i % 10};" for i in range(variables)]
+    lines.append("Glyn(total) = 0;")
+    for _ in range(reads):
+        lines.extend(f"Glyn(total) = total plus var{i} times 2;" for i in range(variables))
+    return "Cheese\n" + "\n".join(lines) + "\nNoCheese"
+
+
+def rules_corpus(rules=2000):
+    # Regras de preço geradas: as mesmas fórmulas com limites diferentes
+    lines = []
+    for i in range(rules):
+        lines.append(f"""Stilton preco times quantidade greater {i % 50 * 10} Blue
+    Glyn(desconto) = preco times quantidade times 0.1 plus frete divided 2;
+White
+    Glyn(desconto) = frete divided 2;""")
+    return "Cheese\n" + "\n".join(lines) + "\nNoCheese"
+
+
+def expressions(program):
+    """Raízes das expressões do programa, sem recursão"""
+    pending = list(program)
+    while pending:
+        node = pending.pop()
+        if isinstance(node, CheeseAssign):
+            yield node.value
+        elif isinstance(node, CheesePrint):
+            yield node.expr
+        elif isinstance(node, CheeseIf):
+            yield node.condition
+            pending.extend(node.then_branch)
+            pending.extend(node.else_branch)
+        elif isinstance(node, CheeseLoop):
+            yield node.condition
+            pending.extend(node.body)
+        elif isinstance(node, Expression):
+            yield node
+
+
+def count_nodes(program):
+    """(ocorrências, nós distintos) de expressão"""
+    occurrences = 0
+    distinct = set()
+    pending = list(expressions(program))
+    while pending:
+        node = pending.pop()
+        occurrences += 1
+        distinct.add(id(node))
+        if isinstance(node, BinOp):
+            pending.append(node.left)
+            pending.append(node.right)
+    return occurrences, len(distinct)
+
+
+def measure(source, pool):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    program = parse(source, pool)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return program, retained, elapsed
+
+
+def main():
+    for label, source in (("acumulador (1000 variáveis x 10 leituras)", accumulator_corpus()),
+                          ("regras de preço (2000 regras)", rules_corpus())):
+        plain, plain_memory, plain_time = measure(source, NoSharing())
+        shared, shared_memory, shared_time = measure(source, ConstantPool())
+        occurrences, plain_distinct = count_nodes(plain)
+        _, shared_distinct = count_nodes(shared)
+        print(label)
+        print(f"  nós de expressão: {plain_distinct} -> {shared_distinct} "
+              f"({occurrences} ocorrências)")
+        print(f"  memória da AST:   {plain_memory / 1024:.0f} KB -> {shared_memory / 1024:.0f} KB "
+              f"({100 * (plain_memory - shared_memory) / plain_memory:.0f}% a menos)")
+        print(f"  parse:            {plain_time:.3f}s -> {shared_time:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
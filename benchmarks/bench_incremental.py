@@ -0,0 +1,90 @@
+"""
+Benchmark da análise incremental.
+
+Gera um programa de 50 mil linhas e mede a latência de edições de um
+caractere com `Document.edit`, comparando com analisar o arquivo inteiro
+de novo a cada tecla.
+
+Uso:
+    python benchmarks/bench_incremental.py [linhas] [edições]
+"""
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from cheesepp.incremental import Document
+from cheesepp.parser import parse
+
+
+def corpus(lines):
+    body = []
+    for i in range(lines):
+        if i % 100 == 0:
+            body.append(f"Glyn(i{i}) = 0;")
+            body.append(f"Cheddar Glyn(i{i}) = i{i} plus 1; Coleraine i{i} greater_equals 3")
+        elif i % 7 == 0:
+            body.append(f"Wensleydale(Glyn(v{i - 1}));")
+        else:
+            body.append(f"Glyn(v{i}) = v{i - 1} times 2 plus {i % 10};")
+    return "Cheese\nGlyn(v0) = 1;\n" + "\n".join(body) + "\nNoCheese"
+
+
+def one_char_edits(document, count, seed=0):
+    """
+    Edições de um caractere em pontos aleatórios: troca um dígito, digita
+    um dígito a mais e o apaga em seguida (o texto não muda de tamanho no fim)
+    """
+    rng = random.Random(seed)
+    digits = [i for i, char in enumerate(document.text) if char.isdigit()]
+    for _ in range(count // 3):
+        position = rng.choice(digits)
+        yield "troca", (position, position + 1, str(rng.randint(0, 9)))
+        yield "insere", (position, position, str(rng.randint(1, 9)))
+        yield "apaga", (position, position + 1, "")
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 600
+    source = corpus(lines)
+
+    start = time.perf_counter()
+    parse(source)
+    full = time.perf_counter() - start
+
+    start = time.perf_counter()
+    document = Document(source)
+    opened = time.perf_counter() - start
+
+    latencies = {}
+    reparsed = []
+    for kind, edit in one_char_edits(document, count):
+        start = time.perf_counter()
+        document.edit(*edit)
+        latencies.setdefault(kind, []).append(time.perf_counter() - start)
+        reparsed.append(document.reparsed)
+
+    # A árvore incremental é a mesma de uma análise completa do texto final
+    final = parse(document.text, document.pool)
+    assert len(final) == len(document.statements)
+    assert all(getattr(a, 'value', None) is getattr(b, 'value', None)
+               for a, b in zip(final, document.statements))
+
+    print(f"{lines} linhas, {len(source) / 1024:.0f} KB, {len(document.statements)} comandos")
+    print(f"  análise completa (parse):    {full * 1000:.0f} ms")
+    print(f"  abrir Document:              {opened * 1000:.0f} ms")
+    for kind, times in latencies.items():
+        times.sort()
+        print(f"  edição de um caractere ({kind}): p50 {statistics.median(times) * 1000:.2f} ms, "
+              f"p99 {times[int(len(times) * 0.99)] * 1000:.2f} ms")
+    every = sorted(seconds for times in latencies.values() for seconds in times)
+    print(f"  comandos reanalisados:       no máximo {max(reparsed)} de {len(document.statements)}")
+    print(f"  ganho por tecla:             {full / statistics.median(every):.0f}x")
+
+
+if __name__ == "__main__":
+    main()
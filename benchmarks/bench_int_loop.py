@@ -0,0 +1,57 @@
+"""
+Benchmark do caminho rápido de inteiros.
+
+Roda o mesmo loop contador com literais inteiros (1) e com literais
+float (1.0) e compara os tempos do runtime.
+
+Uso:
+    python benchmarks/bench_int_loop.py [iterações]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from cheesepp.parser import parse
+from cheesepp.runtime import Runtime
+
+
+LOOP = """Cheese
+Glyn(i) = {zero};
+Glyn(soma) = {zero};
+Cheddar
+    Glyn(soma) = soma plus i times {dois};
+    Glyn(i) = i plus {um};
+Coleraine i greater_equals {n}
+NoCheese"""
+
+
+def run_once(code: str) -> float:
+    """Executa o programa uma vez e devolve o tempo em segundos"""
+    program = parse(code)
+    start = time.perf_counter()
+    Runtime().run(program, code)
+    return time.perf_counter() - start
+
+
+def best_of(code: str, repeat: int = 5) -> float:
+    return min(run_once(code) for _ in range(repeat))
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    int_code = LOOP.format(zero="0", um="1", dois="2", n=n)
+    float_code = LOOP.format(zero="0.0", um="1.0", dois="2.0", n=f"{n}.0")
+
+    int_time = best_of(int_code)
+    float_time = best_of(float_code)
+
+    print(f"Loop com {n} iterações")
+    print(f"  literais inteiros: {int_time:.4f}s")
+    print(f"  literais float:    {float_time:.4f}s")
+    print(f"  ganho:             {float_time / int_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark do pool de constantes (nomes internados e literais compartilhados).
+
+Usa o programa de 1000 variáveis do PerformanceTestSuite e uma variante
+gerada em que cada variável é lida várias vezes. Compara memória retida
+pela AST e o tempo de execução (consultas ao dicionário do ambiente) com
+e sem o pool.
+
+Uso:
+    python benchmarks/bench_intern.py [leituras_por_variavel]
+"""
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from cheesepp.parser import parse
+from cheesepp.runtime import Runtime
+from cheesepp.transformer import ConstantPool
+
+VARIABLES = 1000
+
+
+class NoSharing(ConstantPool):
+    """Comportamento antigo: uma string e um nó novos a cada ocorrência"""
+
+    def name(self, token):
+        return str(token)
+
+    def _shared(self, table, key, factory):
+        return factory(key)
+
+
+def large_program():
+    # Mesmo programa de PerformanceTestSuite.parsing_performance_tests
+    return "Cheese\n" + "\n".join(f"Glyn(var{i}) = {i};" for i in range(VARIABLES)) + "\nNoCheese"
+
+
+def generated_program(reads):
+    lines = [f"Glyn(var{i}) = {i % 10};" for i in range(VARIABLES)]
+    lines.append("Glyn(total) = 0;")
+    for _ in range(reads):
+        lines.extend(f"Glyn(total) = total plus var{i} times 2;" for i in range(VARIABLES))
+    return "Cheese\n" + "\n".join(lines) + "\nNoCheese"
+
+
+def retained(source, pool):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    ast = parse(source, pool)
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return ast, after - before
+
+
+def run_time(ast, repeat=15):
+    best = float('inf')
+    for _ in range(repeat):
+        runtime = Runtime()
+        start = time.perf_counter()
+        runtime.run(ast)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    reads = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    for label, source in (("1000 variáveis", large_program()),
+                          (f"1000 variáveis, {reads} leituras cada", generated_program(reads))):
+        shared_ast, shared = retained(source, ConstantPool())
+        plain_ast, plain = retained(source, NoSharing())
+        print(label)
+        print(f"  memória da AST:   {plain / 1024:.0f} KB -> {shared / 1024:.0f} KB "
+              f"({100 * (plain - shared) / plain:.0f}% a menos)")
+        plain_time = run_time(plain_ast)
+        shared_time = run_time(shared_ast)
+        print(f"  execução:         {plain_time * 1000:.1f} ms -> {shared_time * 1000:.1f} ms "
+              f"({plain_time / shared_time:.2f}x)")
+
+    # Consultas ao dicionário isoladas: chave internada (mesmo objeto) x cópia igual
+    keys = [sys.intern(f"var{i}") for i in range(VARIABLES)]
+    env = {key: i for i, key in enumerate(keys)}
+    copies = ["".join(["var", str(i)]) for i in range(VARIABLES)]
+    for key in copies:
+        hash(key)
+    timings = {}
+    for label, names in (("internadas", keys), ("cópias", copies)):
+        start = time.perf_counter()
+        for _ in range(3000):
+            for name in names:
+                env[name]
+        timings[label] = time.perf_counter() - start
+    print(f"3M consultas ao ambiente: cópias {timings['cópias']:.3f}s, "
+          f"internadas {timings['internadas']:.3f}s "
+          f"({timings['cópias'] / timings['internadas']:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Benchmark de um passe vazio sobre o IR (ir.py).
+
+Monta um programa de 1 milhão de nós e mede um passe que não faz nada em
+cada nó, com três formas de escolher o método: a tabela por classe do
+IRVisitor, uma cadeia de isinstance (como os passes faziam antes) e o
+accept() dos nós de node.py. Também mede `lower` da árvore de node.py.
+
+Uso:
+    python benchmarks/bench_ir_pass.py [nós]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from cheesepp.ast import *
+from cheesepp.ir import IRVisitor, iter_nodes, lower
+from cheesepp.node import *
+
+
+class NoOpPass(IRVisitor):
+    """Um método vazio por classe do IR"""
+
+    def visit_assign(self, node): pass
+    def visit_print(self, node): pass
+    def visit_if(self, node): pass
+    def visit_loop(self, node): pass
+    def visit_belgian(self, node): pass
+    def visit_empty(self, node): pass
+    def visit_binop(self, node): pass
+    def visit_number(self, node): pass
+    def visit_string(self, node): pass
+    def visit_var(self, node): pass
+
+
+def isinstance_pass(program, visitor):
+    """O mesmo passe escolhendo o método por uma cadeia de isinstance"""
+    for node in iter_nodes(program):
+        if isinstance(node, CheeseAssign):
+            visitor.visit_assign(node)
+        elif isinstance(node, CheesePrint):
+            visitor.visit_print(node)
+        elif isinstance(node, CheeseIf):
+            visitor.visit_if(node)
+        elif isinstance(node, CheeseLoop):
+            visitor.visit_loop(node)
+        elif isinstance(node, Belgian):
+            visitor.visit_belgian(node)
+        elif isinstance(node, BinOp):
+            visitor.visit_binop(node)
+        elif isinstance(node, Number):
+            visitor.visit_number(node)
+        elif isinstance(node, String):
+            visitor.visit_string(node)
+        elif isinstance(node, Var):
+            visitor.visit_var(node)
+        else:
+            visitor.visit_empty(node)
+
+
+class NoOpNodeVisitor(NodeVisitor):
+    def visit_program(self, node): pass
+    def visit_block(self, node): pass
+    def visit_assignment(self, node): pass
+    def visit_binary_op(self, node): pass
+    def visit_unary_op(self, node): pass
+    def visit_variable(self, node): pass
+    def visit_literal(self, node): pass
+    def visit_function_call(self, node): pass
+    def visit_conditional(self, node): pass
+    def visit_loop(self, node): pass
+    def visit_print(self, node): pass
+    def visit_debug(self, node): pass
+
+
+def build_ir(total):
+    """Atribuições e Stiltons com cadeias de 20 operações; ~50 nós por grupo"""
+    program = []
+    count = 0
+    i = 0
+    while count < total:
+        expr = Var(f"v{i}")
+        for j in range(20):
+            expr = BinOp(expr, "+", Number(i * 20 + j))
+        program.append(CheeseAssign(f"x{i}", expr))
+        program.append(CheeseIf(BinOp(Var(f"x{i}"), ">", Number(0)),
+                                [CheesePrint(String("sim"))], [Belgian(), None]))
+        count += 50
+        i += 1
+    return program
+
+
+def build_nodes(total):
+    statements = []
+    for i in range(total // 51):
+        expr = VariableNode(f"v{i}")
+        for j in range(20):
+            expr = BinaryOpNode(expr, "+", LiteralNode(i * 20 + j, "int"))
+        statements.append(AssignmentNode(f"x{i}", expr))
+        statements.append(ConditionalNode(BinaryOpNode(VariableNode(f"x{i}"), ">", LiteralNode(0, "int")),
+                                          BlockNode([PrintNode(LiteralNode("sim", "string"))]),
+                                          BlockNode([DebugNode()])))
+    return ProgramNode(statements)
+
+
+def timed(label, nodes, function, *args):
+    start = time.perf_counter()
+    value = function(*args)
+    seconds = time.perf_counter() - start
+    per_node = f"{seconds / nodes * 1e9:6.0f} ns/nó" if nodes else ""
+    print(f"  {label:<34} {seconds * 1000:8.1f} ms  {per_node}")
+    return value
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    program = build_ir(total)
+    nodes = sum(1 for _ in iter_nodes(program))
+    print(f"IR com {nodes} nós")
+    timed("percurso sem visitar (iter_nodes)", nodes, lambda: sum(1 for _ in iter_nodes(program)))
+    timed("passe vazio, tabela por classe", nodes, NoOpPass().walk, program)
+    timed("passe vazio, cadeia de isinstance", nodes, isinstance_pass, program, NoOpPass())
+
+    tree = build_nodes(total)
+    tree_nodes = sum(1 for _ in ASTTraverser.iter_preorder(tree))
+    print(f"node.py com {tree_nodes} nós")
+    visitor = NoOpNodeVisitor()
+    timed("passe vazio, accept()", tree_nodes,
+          lambda: [node.accept(visitor) for node in ASTTraverser.iter_preorder(tree)] and None)
+    timed("lower para o IR", tree_nodes, lower, tree)
+
+
+if __name__ == "__main__":
+    main()
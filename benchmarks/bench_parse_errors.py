@@ -0,0 +1,73 @@
+"""
+Benchmark da análise com recuperação de erros (parser.py).
+
+Gera um programa grande e uma cópia com erros de sintaxe espalhados e
+compara: o parse do programa correto, o parse com recuperação da cópia com
+erros (todos os erros numa passada) e o ciclo antigo de corrigir um erro e
+analisar tudo de novo até o programa passar.
+
+Uso:
+    python benchmarks/bench_parse_errors.py [comandos] [erros]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from lark.exceptions import UnexpectedInput
+
+from cheesepp.errors import ErrorReporter
+from cheesepp.parser import parse
+
+
+def statements(total):
+    return [f"Glyn(a{i}) = a{i % 50} plus {i} times (b minus 2);" for i in range(total)]
+
+
+def wrap(lines):
+    return "Cheese\n" + "\n".join(lines) + "\nNoCheese"
+
+
+def timed(label, function, *args):
+    start = time.perf_counter()
+    value = function(*args)
+    print(f"  {label:<36} {(time.perf_counter() - start) * 1000:9.1f} ms")
+    return value
+
+
+def fix_one_at_a_time(lines, broken):
+    """Analisa, corrige a linha do primeiro erro e repete até passar"""
+    lines = list(lines)
+    parses = 0
+    while True:
+        parses += 1
+        try:
+            return parse(wrap(lines)), parses
+        except UnexpectedInput as error:
+            index = error.line - 2
+            lines[index] = broken[index]
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    errors = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    good = statements(total)
+    bad = list(good)
+    for k in range(errors):
+        i = (k + 1) * total // (errors + 1)
+        bad[i] = f"Glyn(a{i}) = a{i % 50} plus times (b minus 2);"
+
+    print(f"{total} comandos, {errors} erros")
+    timed("parse do programa correto", parse, wrap(good))
+    reporter = ErrorReporter()
+    reporter.max_errors = errors
+    timed("parse com recuperação, sem erros", parse, wrap(good), None, ErrorReporter())
+    timed("parse com recuperação, com erros", parse, wrap(bad), None, reporter)
+    print(f"  {reporter.get_error_count()} erros encontrados numa passada")
+    _, parses = timed("corrigir e analisar de novo", fix_one_at_a_time, bad, good)
+    print(f"  {parses} análises completas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark da avaliação parcial (partial.py).
+
+Compila uma vez, com e sem avaliação parcial, programas sem entradas (os
+exemplos e uma soma com um Cheddar de N voltas) e compara o custo da
+compilação, o tempo de cada execução e quantas execuções pagam a fase a
+mais. Também mostra que um laço infinito para no combustível.
+
+Uso:
+    python benchmarks/bench_partial.py [voltas do laço] [execuções]
+"""
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from cheesepp.program import Program
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+SOMA = """Cheese
+Glyn(soma) = 0;
+Glyn(i) = 1;
+Cheddar
+    Glyn(soma) = soma plus i times i;
+    Glyn(i) = i plus 1;
+Coleraine i greater {n}
+Wensleydale(soma);
+NoCheese"""
+
+INFINITO = "Cheese Glyn(i) = 0; Cheddar Glyn(i) = i plus 1; Coleraine i less 0 NoCheese"
+
+
+def per_run(program, runs):
+    start = time.perf_counter()
+    for _ in range(runs):
+        program.run()
+    return (time.perf_counter() - start) / runs
+
+
+def compare(label, source, runs):
+    plain = Program(source)
+    folded = Program(source, partial=True)
+    assert plain.run().output == folded.run().output
+    before, after = per_run(plain, runs), per_run(folded, runs)
+    cost = folded.timings['partial']
+    paid = f"{cost / (before - after):.1f}" if before > after else "-"
+    print(f"  {label:<18} parcial {cost * 1000:8.3f} ms  execução {before * 1e6:9.1f} -> "
+          f"{after * 1e6:7.1f} µs  paga em {paid} execuções "
+          f"({folded.stats['partial_residual']} comandos no residual)")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    for path in sorted(glob.glob(os.path.join(ROOT, "exemplos", "*.cheesepp"))):
+        with open(path, encoding="utf-8") as f:
+            compare(os.path.basename(path), f.read(), runs)
+    compare(f"soma de {n} voltas", SOMA.format(n=n), runs)
+
+    program = Program(INFINITO, partial=True, fuel=1_000_000)
+    print(f"  laço infinito: combustível {program.stats['partial_fuel']} em "
+          f"{program.timings['partial'] * 1000:.1f} ms, laço no residual")
+
+
+if __name__ == "__main__":
+    main()
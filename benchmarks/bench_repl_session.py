@@ -0,0 +1,66 @@
+"""
+Benchmark de uma sessão interativa longa (session.py).
+
+Simula um REPL que recebe uma entrada por variável e depois repete
+algumas entradas. Compara o caminho antigo (parse da linha completa e
+Runtime com o contexto, que copia todas as variáveis a cada execução) com
+a Session, em que cada entrada custa proporcional a ela mesma.
+
+Uso:
+    python benchmarks/bench_repl_session.py [entradas]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from cheesepp.ctx import CheeseContext
+from cheesepp.parser import parse
+from cheesepp.runtime import Runtime
+from cheesepp.session import Session
+
+
+def entries(total):
+    lines = [f"Glyn(v{i}) = (v{i // 2} plus {i}) times 2;" for i in range(total)]
+    # Entradas repetidas, como as do histórico do REPL
+    lines += [f"Glyn(v0) = (v{i % 50} plus {i % 50}) times 2;" for i in range(total)]
+    return lines
+
+
+def old_repl(lines):
+    context = CheeseContext(keep_output=False)
+    runtime = Runtime(context=context)
+    for line in lines:
+        code = "Cheese " + line + " NoCheese"
+        context.execution_context.set_source_code(code)
+        runtime.run(parse(code), code)
+    return context
+
+
+def session_repl(lines):
+    session = Session(CheeseContext(keep_output=False))
+    for line in lines:
+        session.execute(line)
+    return session.context
+
+
+def timed(label, total, function, *args):
+    start = time.perf_counter()
+    value = function(*args)
+    seconds = time.perf_counter() - start
+    print(f"  {label:<26} {seconds * 1000:9.1f} ms  {seconds / total * 1e6:8.1f} µs/entrada")
+    return value
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    lines = entries(total)
+    print(f"{len(lines)} entradas, {total} variáveis")
+    old = timed("parse + Runtime(context)", len(lines), old_repl, lines)
+    new = timed("Session", len(lines), session_repl, lines)
+    assert old.get_variable(f"v{total - 1}") == new.get_variable(f"v{total - 1}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark do cache de resultados (memo.py).
+
+Simula um servidor que recebe muitas vezes as mesmas submissões: N
+requisições sorteadas entre K pares (programa, entradas) distintos,
+atendidas por execute_request num só processo. Compara o tempo sem cache de
+resultados, com o cache em memória e com o cache em arquivos.
+
+Uso:
+    python benchmarks/bench_result_cache.py [requisições] [submissões distintas]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from cheesepp import server
+from cheesepp.memo import ResultCache
+
+PROGRAMA = """Cheese
+Glyn(soma) = 0;
+Glyn(i) = 0;
+Cheddar
+    Glyn(soma) = soma plus i times {k};
+    Glyn(i) = i plus 1;
+Coleraine i greater n
+Wensleydale(Glyn(soma));
+NoCheese"""
+
+
+def measure(label, results, requests):
+    server._results = results
+    start = time.perf_counter()
+    for source, inputs in requests:
+        response = server.execute_request(source, inputs, time_limit=None, memory=None)
+        assert response["ok"], response
+    seconds = time.perf_counter() - start
+    hits = f"  ({results.hits} acertos)" if results is not None else ""
+    print(f"  {label:<22} {seconds * 1000:9.1f} ms  {seconds / len(requests) * 1e6:8.1f} µs/req{hits}")
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    distinct = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    rng = random.Random(42)
+    submissions = [(PROGRAMA.format(k=k % 5 + 1), {"n": 2_000 + k}) for k in range(distinct)]
+    requests = [rng.choice(submissions) for _ in range(total)]
+    print(f"{total} requisições, {distinct} submissões distintas")
+    measure("sem cache", None, requests)
+    measure("memória", ResultCache(), requests)
+    with tempfile.TemporaryDirectory() as directory:
+        measure("arquivos", ResultCache(path=directory), requests)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark da verificação semântica (semantic.py).
+
+Gera programas com N atribuições em Stilton e Cheddar aninhados e mede o
+tempo de SemanticChecker.check para tamanhos crescentes; o tempo por
+comando deve ficar constante.
+
+Uso:
+    python benchmarks/bench_semantic.py [comandos do maior programa]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from cheesepp.ast import BinOp, CheeseAssign, CheeseIf, CheeseLoop, CheesePrint, Number, Var
+from cheesepp.semantic import SemanticChecker
+
+
+def build(statements):
+    """Programa em blocos de 10 comandos: atribuições, um Stilton e um Cheddar"""
+    program = []
+    for block in range(statements // 10):
+        a, b = f"a{block}", f"b{block}"
+        program.append(CheeseAssign(a, Number(block)))
+        program.append(CheeseIf(BinOp(Var(a), '>', Number(1)),
+                                [CheeseAssign(b, BinOp(Var(a), '+', Number(1)))],
+                                [CheeseAssign(b, Number(0))]))
+        program.append(CheeseLoop([CheeseAssign(a, BinOp(Var(a), '+', Number(1)))],
+                                  BinOp(Var(a), '>', Number(block + 2))))
+        program.extend(CheeseAssign(f"c{block}_{i}", BinOp(Var(b), '*', Var(a)))
+                       for i in range(6))
+        program.append(CheesePrint(Var(b)))
+    return program
+
+
+def timed(function, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    largest = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    size = max(largest // 16, 10)
+    print(f"{'comandos':>10} {'verificação':>13} {'por comando':>12}")
+    while size <= largest:
+        program = build(size)
+        check = timed(lambda: SemanticChecker().check(program))
+        print(f"{size:>10} {check * 1000:>10.1f} ms {check / size * 1e6:>9.2f} µs")
+        size *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark do formato binário da AST (serialize.py).
+
+Compara carregar a AST binária com analisar o código de novo e com pickle,
+tanto para a AST do runtime quanto para um Program completo e para uma
+árvore de node.py.
+
+Uso:
+    python benchmarks/bench_serialize.py [comandos]
+"""
+import os
+import pickle
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from cheesepp.node import AssignmentNode, BinaryOpNode, LiteralNode, Position, ProgramNode, VariableNode
+from cheesepp.parser import parse
+from cheesepp.program import Program
+from cheesepp.serialize import dump_tree, dumps, load_tree, loads
+
+
+def source(statements):
+    lines = [f"Glyn(a{i}) = a{i % 50} plus {i} times (b minus 2);" for i in range(statements)]
+    lines.append("Stilton a1 greater 10 Blue Wensleydale(SwisssimSwiss); White Wensleydale(a2 divided 2.5);")
+    return "Cheese\n" + "\n".join(lines) + "\nNoCheese"
+
+
+def timed(function, *args, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, value
+
+
+def row(label, seconds, size=None):
+    extra = f"{size / 1024:10.0f} KiB" if size is not None else ""
+    print(f"  {label:<28} {seconds * 1000:9.1f} ms {extra}")
+
+
+def main():
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    code = source(statements)
+
+    print(f"AST do runtime ({statements} comandos, {len(code) / 1024:.0f} KiB de código)")
+    parsed, ast = timed(parse, code, repeat=1)
+    encoded, data = timed(dumps, ast)
+    decoded, _ = timed(loads, data)
+    pickled = pickle.dumps(ast)
+    unpickled, _ = timed(pickle.loads, pickled)
+    row("parse", parsed)
+    row("dumps", encoded, len(data))
+    row("loads", decoded)
+    row("pickle.loads", unpickled, len(pickled))
+    print(f"  loads / parse: {parsed / decoded:.1f}x mais rápido")
+
+    print("Program completo (parse, CSE e tipos)")
+    compiled, program = timed(Program, code, repeat=1)
+    raw = program.to_bytes()
+    loaded, _ = timed(Program.from_bytes, raw)
+    row("Program(código)", compiled)
+    row("Program.from_bytes", loaded, len(raw))
+
+    print("Árvore de node.py (atribuições com cadeias de 50 operadores)")
+    tree = ProgramNode([])
+    for i in range(statements // 10):
+        expr = VariableNode("x", Position(i + 1, 1))
+        for j in range(50):
+            expr = BinaryOpNode(expr, "+", LiteralNode(j, "int"))
+        tree.add_child(AssignmentNode(f"v{i}", expr, position=Position(i + 1, 1)))
+    encoded, data = timed(dump_tree, tree)
+    decoded, _ = timed(load_tree, data)
+    row("dump_tree", encoded, len(data))
+    row("load_tree", decoded)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark de concatenação de strings em loop.
+
+Monta uma string de N MB com `Glyn(s) = s plus Swiss...Swiss` dentro de um
+Cheddar, com e sem o StrBuilder (desligado elevando BUILDER_THRESHOLD).
+
+Uso:
+    python benchmarks/bench_string_builder.py [megabytes]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from cheesepp import strings
+from cheesepp.parser import parse
+from cheesepp.runtime import Runtime
+
+
+CHUNK = "0123456789" * 10
+
+
+def program(iterations):
+    return f"""Cheese
+Glyn(i) = 0;
+Glyn(s) = Swiss>Swiss;
+Cheddar
+    Glyn(s) = s plus Swiss{CHUNK}Swiss;
+    Glyn(i) = i plus 1;
+Coleraine i greater_equals {iterations}
+Wensleydale(i);
+NoCheese"""
+
+
+def measure(megabytes, threshold):
+    strings.BUILDER_THRESHOLD = threshold
+    iterations = int(megabytes * 1_000_000) // len(CHUNK)
+    source = program(iterations)
+    runtime = Runtime(output=lambda line: None)
+    start = time.perf_counter()
+    runtime.run(parse(source), source)
+    elapsed = time.perf_counter() - start
+    assert len(runtime.env["s"]) == 1 + iterations * len(CHUNK)
+    return elapsed
+
+
+def main():
+    megabytes = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    default = strings.BUILDER_THRESHOLD
+
+    builder = measure(megabytes, default)
+    print(f"{megabytes:g} MB com StrBuilder:      {builder:.3f}s")
+
+    # Sem o builder o custo é quadrático: mede em tamanhos menores
+    for size in (megabytes / 10, megabytes / 5):
+        plain = measure(size, float('inf'))
+        print(f"{size:g} MB com str (cópias):   {plain:.3f}s")
+        builder_small = measure(size, default)
+        print(f"{size:g} MB com StrBuilder:      {builder_small:.3f}s")
+    strings.BUILDER_THRESHOLD = default
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark da tabela de símbolos com escopos.
+
+Compara a SymbolTable atual (símbolos visíveis, pilhas de sombreamento e
+log de desfazer por escopo) com a versão anterior, que guardava tudo num
+único dicionário e varria a tabela inteira a cada saída de escopo.
+
+Uso:
+    python benchmarks/bench_symbols.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from cheesepp.ctx import Symbol, SymbolTable, SymbolType
+
+
+class FlatSymbolTable:
+    """A tabela anterior: um dicionário só, saída de escopo O(total de símbolos)"""
+
+    def __init__(self):
+        self.symbols = {}
+        self.scope_stack = [0]
+        self.current_scope = 0
+
+    def enter_scope(self):
+        self.current_scope += 1
+        self.scope_stack.append(self.current_scope)
+
+    def exit_scope(self):
+        if len(self.scope_stack) > 1:
+            exiting_scope = self.scope_stack.pop()
+            to_remove = [name for name, symbol in self.symbols.items()
+                         if symbol.scope_level == exiting_scope]
+            for name in to_remove:
+                del self.symbols[name]
+            self.current_scope = self.scope_stack[-1]
+
+    def define(self, name, symbol_type, value, line_number=None):
+        if name in self.symbols and self.symbols[name].scope_level == self.current_scope:
+            return False
+        self.symbols[name] = Symbol(name, symbol_type, value, self.current_scope, line_number)
+        return True
+
+    def lookup(self, name):
+        for scope_level in reversed(self.scope_stack):
+            if name in self.symbols:
+                symbol = self.symbols[name]
+                if symbol.scope_level <= scope_level:
+                    return symbol
+        return None
+
+
+def deep_nesting(table, depth=500, per_scope=20, globals_=200):
+    """Escopos aninhados fundo, metade dos nomes escondendo globais"""
+    for i in range(globals_):
+        table.define(f"g{i}", SymbolType.VARIABLE, i)
+
+    def run():
+        for level in range(depth):
+            table.enter_scope()
+            for i in range(per_scope):
+                name = f"g{(level * per_scope + i) % globals_}" if i % 2 else f"s{level}_{i}"
+                table.define(name, SymbolType.VARIABLE, level)
+            for i in range(per_scope):
+                table.lookup(f"g{i}")
+                table.lookup(f"ausente{i}")
+        for _ in range(depth):
+            table.exit_scope()
+        return sum(table.lookup(f"g{i}") is None for i in range(globals_))
+    return run
+
+
+def many_short_scopes(table, globals_=20_000, scopes=200):
+    """Muitos símbolos globais e blocos curtos entrando e saindo"""
+    for i in range(globals_):
+        table.define(f"g{i}", SymbolType.VARIABLE, i)
+
+    def run():
+        for n in range(scopes):
+            table.enter_scope()
+            for i in range(5):
+                table.define(f"t{i}", SymbolType.VARIABLE, n)
+                table.lookup(f"g{n * 5 + i}")
+            table.exit_scope()
+        return 0
+    return run
+
+
+def measure(workload, factory):
+    run = workload(factory())
+    start = time.perf_counter()
+    lost = run()
+    return time.perf_counter() - start, lost
+
+
+def main():
+    for label, workload in (("aninhamento profundo (500 escopos x 20 símbolos)", deep_nesting),
+                            ("20 mil globais, 200 blocos curtos", many_short_scopes)):
+        flat, flat_lost = measure(workload, FlatSymbolTable)
+        chained, chained_lost = measure(workload, SymbolTable)
+        print(label)
+        print(f"  tabela anterior: {flat * 1000:8.1f} ms ({flat_lost} globais perdidos ao sair dos escopos)")
+        print(f"  tabela atual:    {chained * 1000:8.1f} ms ({chained_lost} globais perdidos)")
+        print(f"  ganho:           {flat / chained:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
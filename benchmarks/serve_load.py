@@ -0,0 +1,99 @@
+"""
+Gerador de carga para o `cheesepp serve`.
+
+Sobe um CheeseServer em um socket Unix temporário (ou usa um já rodando
+com --socket/--port), dispara requisições de vários clientes concorrentes
+e mostra a vazão e as latências p50/p99.
+
+Uso:
+    python benchmarks/serve_load.py [requisições] [clientes] [--socket PATH | --port N]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from cheesepp.server import CheeseServer
+
+
+PROGRAM = """Cheese
+Glyn(i) = 0;
+Glyn(soma) = 0;
+Cheddar
+    Glyn(i) = i plus 1;
+    Glyn(soma) = soma plus i times x;
+Coleraine i greater_equals 50
+Wensleydale(Glyn(soma));
+NoCheese"""
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def client(count, connect, latencies, errors):
+    reader, writer = await connect()
+    try:
+        for n in range(count):
+            payload = {"source": PROGRAM, "inputs": {"x": n}}
+            start = time.perf_counter()
+            writer.write(json.dumps(payload).encode() + b"\n")
+            await writer.drain()
+            response = json.loads(await reader.readline())
+            latencies.append(time.perf_counter() - start)
+            if not response["ok"]:
+                errors.append(response["error"])
+    finally:
+        writer.close()
+
+
+async def run(args):
+    server = None
+    socket_path = args.socket
+    if socket_path is None and args.port is None:
+        socket_path = os.path.join(tempfile.mkdtemp(), "cheesepp.sock")
+        server = CheeseServer(workers=args.workers)
+        await server.start(socket_path)
+
+    if socket_path:
+        connect = lambda: asyncio.open_unix_connection(socket_path)
+    else:
+        connect = lambda: asyncio.open_connection("127.0.0.1", args.port)
+
+    latencies, errors = [], []
+    per_client = args.requests // args.clients
+    start = time.perf_counter()
+    await asyncio.gather(*(client(per_client, connect, latencies, errors)
+                           for _ in range(args.clients)))
+    elapsed = time.perf_counter() - start
+
+    if server is not None:
+        await server.close()
+
+    print(f"{len(latencies)} requisições, {args.clients} clientes, {elapsed:.2f}s")
+    print(f"  vazão:  {len(latencies) / elapsed:.0f} req/s")
+    print(f"  p50:    {percentile(latencies, 50) * 1000:.2f} ms")
+    print(f"  p99:    {percentile(latencies, 99) * 1000:.2f} ms")
+    if errors:
+        print(f"  erros:  {len(errors)} (primeiro: {errors[0]})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Carga para o cheesepp serve")
+    parser.add_argument("requests", nargs="?", type=int, default=5000)
+    parser.add_argument("clients", nargs="?", type=int, default=32)
+    parser.add_argument("--socket", help="Socket de um servidor já rodando")
+    parser.add_argument("--port", type=int, help="Porta TCP de um servidor já rodando")
+    parser.add_argument("--workers", type=int, help="Processos do servidor embutido")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
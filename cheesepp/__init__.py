@@ -1,5 +1,16 @@
-from .parser import parse
+__version__ = "0.1.0"
+__author__ = "Ana Júlia Mendes, Arthur Sousa, Júlia Fortunato, Maria Clara Oleari"
+
+from .parser import parse, parse_statements
 from .runtime import Runtime
+from .inference import CheeseType, TypeInfo, infer_types
+from .semantic import SemanticChecker, check_semantics
+from .batch import BatchRuntime
+from .program import Program, RunResult
+from .memo import ResultCache
+from .incremental import Document
+from .session import Session
+from .ir import IRVisitor, lower
 from .ctx import CheeseContext, ExecutionContext, SymbolTable
 from .errors import (
     CheeseError, CheeseLexicalError, CheeseSyntaxError, 
@@ -20,23 +31,34 @@ def compile_and_run(source_code: str, debug: bool = False) -> str:
         str: A saída da execução do programa
         
     Levanta:
+        CheeseSyntaxError: Com todos os erros de sintaxe (até ErrorReporter.max_errors)
         CheeseError: Se a compilação ou a execução falhar
     """
     try:
-        ast = parse(source_code)
-        runtime = Runtime()    
+        # Todos os erros de sintaxe numa passada, em vez de só o primeiro
+        reporter = ErrorReporter()
+        ast = parse(source_code, reporter=reporter)
+        if reporter.has_errors():
+            raise CheeseSyntaxError(reporter.get_formatted_errors().rstrip())
+        context = CheeseContext()
+        runtime = Runtime(context=context)
         runtime.run(ast, source_code)
         
-        return runtime.env.get('__output__', '')
+        return context.get_output()
         
+    except CheeseSyntaxError:
+        raise
     except Exception as e:
         raise CheeseError(f"Falha de interpretação: {str(e)}")
 
 
 
 __all__ = [
-    'parse', 'compile_and_run',
-    'Runtime',
+    'parse', 'parse_statements', 'compile_and_run',
+    'Runtime', 'BatchRuntime', 'Program', 'RunResult', 'ResultCache', 'Document', 'Session',
+    'IRVisitor', 'lower',
+    'CheeseType', 'TypeInfo', 'infer_types',
+    'SemanticChecker', 'check_semantics',
     'CheeseContext', 'ExecutionContext', 'SymbolTable',
     'CheeseError', 'CheeseLexicalError', 'CheeseSyntaxError',
     'CheeseSemanticError', 'CheeseRuntimeError', 'CheeseTypeError',
@@ -3,27 +3,61 @@ class CheeseAssign:
         self.name = name
         self.value = value
 
-class BinOp:
+class Expression:
+    """
+    Base dos nós de expressão. São imutáveis: o parser compartilha um único
+    nó para cada subárvore repetida (hash-consing), então igualdade estrutural
+    vira comparação de identidade.
+    """
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} é imutável")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} é imutável")
+
+class BinOp(Expression):
+    __slots__ = ('left', 'op', 'right')
+
     def __init__(self, left, op, right):
-        self.left = left
-        self.op = op
-        self.right = right
+        object.__setattr__(self, 'left', left)
+        object.__setattr__(self, 'op', op)
+        object.__setattr__(self, 'right', right)
+
+    def __reduce__(self):
+        return (BinOp, (self.left, self.op, self.right))
+
+class Number(Expression):
+    __slots__ = ('value',)
 
-class Number:
     def __init__(self, value):
-        self.value = value
+        object.__setattr__(self, 'value', value)
+
+    def __reduce__(self):
+        return (Number, (self.value,))
+
+class Var(Expression):
+    __slots__ = ('name',)
 
-class Var:
     def __init__(self, name):
-        self.name = name
+        object.__setattr__(self, 'name', name)
+
+    def __reduce__(self):
+        return (Var, (self.name,))
 
 class CheesePrint:
     def __init__(self, expr):
         self.expr = expr
 
-class String:
+class String(Expression):
+    __slots__ = ('value',)
+
     def __init__(self, value):
-        self.value = value
+        object.__setattr__(self, 'value', value)
+
+    def __reduce__(self):
+        return (String, (self.value,))
 
 class CheeseIf:
     def __init__(self, condition, then_branch, else_branch):
@@ -38,4 +72,4 @@ class CheeseLoop:
 
 class Belgian:
     def __init__(self):
-        pass
\ No newline at end of file
+        pass
@@ -0,0 +1,244 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from .ast import *
+from .errors import CheeseRuntimeError
+from .inference import CheeseType, GENERIC_HANDLERS, infer_types
+from .ir import dispatch_table, lower
+from .node import ASTNode
+from .runtime import APPLY, CONST, LOAD, postfix
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depende do ambiente
+    np = None
+
+
+# Operadores inteiros que podem transbordar o int64 das colunas
+_INT_OPS = ('+', '-', '*')
+# Produtos abaixo disso (em float) cabem com folga num int64
+_SAFE_PRODUCT = 2.0 ** 62
+
+
+def _integer(value) -> bool:
+    """Se o valor é um inteiro Python ou uma coluna de inteiros de tamanho fixo"""
+    if isinstance(value, np.ndarray):
+        return value.dtype.kind in 'iu'
+    return type(value) is int or isinstance(value, np.integer)
+
+
+def _fits_int64(array) -> bool:
+    """Se os valores do array cabem num int64 (inteiros Python grandes viram object)"""
+    kind = array.dtype.kind
+    return kind == 'i' or (kind == 'u' and array.dtype.itemsize < 8)
+
+
+def _exact(op, left, right):
+    """
+    `left op right` para inteiros sem transbordar: com int64 quando cabe,
+    senão com um array de inteiros Python, exatos como os do Runtime.
+    """
+    a, b = np.asarray(left), np.asarray(right)
+    if _fits_int64(a) and _fits_int64(b):
+        a, b = a.astype(np.int64), b.astype(np.int64)
+        if op == '+':
+            result = a + b
+            overflow = ((a ^ result) & (b ^ result)) < 0
+        elif op == '-':
+            result = a - b
+            overflow = ((a ^ b) & (a ^ result)) < 0
+        else:
+            result = a * b
+            overflow = np.abs(a.astype(float) * b) >= _SAFE_PRODUCT
+        if not overflow.any():
+            return result if result.ndim else result.item()
+    objects = np.asarray(left, dtype=object), np.asarray(right, dtype=object)
+    return GENERIC_HANDLERS[op](*objects)
+
+
+def _dtype_type(array) -> CheeseType:
+    """Rótulo de tipo para uma coluna de entrada"""
+    kind = array.dtype.kind
+    if kind == 'b':
+        return CheeseType.BOOL
+    if kind in 'iu':
+        return CheeseType.INT
+    if kind == 'f':
+        return CheeseType.FLOAT
+    if kind in 'US':
+        return CheeseType.STR
+    return CheeseType.UNKNOWN
+
+
+class BatchRuntime:
+    """
+    Runtime vetorizado do Cheese++.
+
+    Executa o mesmo programa para `size` registros de uma vez: cada variável
+    do ambiente guarda um array NumPy com um elemento por registro. Os ramos
+    de Stilton e as iterações de Cheddar rodam sob máscaras de registros ativos.
+    """
+
+    def __init__(self, size: int):
+        if np is None:
+            raise CheeseRuntimeError("O modo em lote precisa do NumPy instalado",
+                                     suggestions=["pip install numpy"])
+        self.size = size
+        self.env: Dict[str, Any] = {}
+        self.events: List[Tuple[Any, Any]] = []
+        self.last_source = None
+        self.code: Dict[Any, list] = {}
+        self._all = np.ones(size, dtype=bool)
+
+    def bind(self, inputs: Dict[str, Any]) -> None:
+        """Preenche o ambiente inicial com uma coluna (ou escalar) por variável"""
+        for name, values in inputs.items():
+            array = np.asarray(values)
+            if array.ndim == 0:
+                self.env[name] = array.item()
+            elif len(array) != self.size:
+                raise CheeseRuntimeError(
+                    f"Entrada '{name}' tem {len(array)} registros, esperado {self.size}")
+            else:
+                if array.dtype.kind in 'US':
+                    array = array.astype(object)
+                self.env[name] = array
+
+    def analyze(self, program):
+        """Inferência de tipos usando os dtypes das colunas de entrada"""
+        initial = {}
+        for name, value in self.env.items():
+            if isinstance(value, np.ndarray):
+                initial[name] = _dtype_type(value)
+            else:
+                initial[name] = _dtype_type(np.asarray(value))
+        info = infer_types(program, initial)
+        if info.errors:
+            raise info.errors[0]
+        return info
+
+    def run(self, program, source_code=None, inputs: Optional[Dict[str, Any]] = None):
+        """Executa o programa (IR ou árvore de node.py) para todos os registros"""
+        if isinstance(program, ASTNode):
+            program = lower(program)
+        self.last_source = source_code
+        if inputs:
+            self.bind(inputs)
+        self.analyze(program)
+        with np.errstate(all='ignore'):
+            self._block(program, self._all)
+        return self.env
+
+    def _block(self, statements, mask) -> None:
+        for stmt in statements:
+            if stmt is not None:
+                self.exec(stmt, mask)
+
+    def exec(self, node, mask) -> None:
+        """Executa um comando apenas nos registros ativos da máscara"""
+        _EXEC.get(type(node), BatchRuntime._exec_expression)(self, node, mask)
+
+    def _exec_assign(self, node, mask) -> None:
+        value = self.eval(node.value, mask)
+        if mask is self._all:
+            self.env[node.name] = value
+        else:
+            self.env[node.name] = self._select(mask, value, self.env.get(node.name, 0))
+
+    def _exec_print(self, node, mask) -> None:
+        self.events.append((mask, self.eval(node.expr, mask)))
+
+    def _exec_if(self, node, mask) -> None:
+        cond = self._truth(self.eval(node.condition, mask))
+        then_mask = mask & cond
+        else_mask = mask & ~cond
+        if then_mask.any():
+            self._block(node.then_branch, then_mask)
+        if else_mask.any():
+            self._block(node.else_branch, else_mask)
+
+    def _exec_loop(self, node, mask) -> None:
+        # Cada registro sai do loop quando a sua própria condição fica verdadeira
+        active = mask & ~self._truth(self.eval(node.condition, mask))
+        while active.any():
+            self._block(node.body, active)
+            active = active & ~self._truth(self.eval(node.condition, active))
+
+    def _exec_belgian(self, node, mask) -> None:
+        if self.last_source:
+            self.events.append((mask, "=== Belgian Mode ==="))
+            self.events.append((mask, self.last_source))
+        else:
+            self.events.append((mask, "No source available."))
+
+    def _exec_expression(self, node, mask) -> None:
+        self.eval(node, mask)
+
+    def eval(self, node, mask):
+        """Avalia uma expressão para todos os registros, sem recursão"""
+        code = self.code.get(node)
+        if code is None:
+            code = self.code[node] = postfix(node)
+        stack = []
+        for kind, arg in code:
+            if kind == LOAD:
+                stack.append(self.env.get(arg, 0))
+            elif kind == CONST:
+                stack.append(arg)
+            else:
+                right = stack.pop()
+                stack[-1] = self._apply(arg.op, stack[-1], right, mask)
+        return stack[-1]
+
+    def _apply(self, op, left, right, mask):
+        if op == '/':
+            zero = np.asarray(right == 0) & mask
+            if zero.any():
+                raise ZeroDivisionError("division by zero")
+        if op in _INT_OPS and _integer(left) and _integer(right) and (
+                isinstance(left, np.ndarray) or isinstance(right, np.ndarray)):
+            # O int64 transborda em silêncio; o Runtime usa inteiros exatos
+            return _exact(op, left, right)
+        result = GENERIC_HANDLERS[op](left, right)
+        if isinstance(result, np.ndarray) and result.dtype == object and op in (
+                '==', '!=', '>', '<', '>=', '<='):
+            result = result.astype(bool)
+        return result
+
+    def _truth(self, value):
+        """Converte o valor de uma condição em uma máscara booleana"""
+        if isinstance(value, np.ndarray):
+            return value.astype(bool)
+        return np.full(self.size, bool(value))
+
+    def _select(self, mask, new, old):
+        """np.where que preserva strings como objetos Python"""
+        if isinstance(new, str) or isinstance(old, str) or \
+                getattr(new, 'dtype', None) == object or getattr(old, 'dtype', None) == object:
+            new = np.broadcast_to(np.asarray(new, dtype=object), (self.size,))
+            old = np.broadcast_to(np.asarray(old, dtype=object), (self.size,))
+        return np.where(mask, new, old)
+
+    def record(self, index: int) -> Dict[str, Any]:
+        """Ambiente final de um único registro, com valores Python"""
+        result = {}
+        for name, value in self.env.items():
+            if isinstance(value, np.ndarray):
+                value = value[index]
+            result[name] = value.item() if hasattr(value, 'item') else value
+        return result
+
+    def outputs(self) -> List[List[str]]:
+        """Linhas impressas por Wensleydale, separadas por registro"""
+        lines: List[List[str]] = [[] for _ in range(self.size)]
+        for mask, value in self.events:
+            array = isinstance(value, np.ndarray)
+            for index in np.flatnonzero(mask):
+                item = value[index] if array else value
+                lines[index].append(str(item.item() if hasattr(item, 'item') else item))
+        return lines
+
+    def __repr__(self):
+        return f"BatchRuntime(size={self.size}, vars={len(self.env)})"
+
+
+_EXEC = dispatch_table(BatchRuntime, '_exec_', BatchRuntime._exec_expression)
@@ -1,27 +1,48 @@
 import sys
 import os
+import time
 import argparse
 from typing import Optional, List
 from pathlib import Path
 
 from .parser import parse
-from .runtime import Runtime
+from .runtime import Runtime, display
+from .session import Session
 from .ctx import CheeseContext
 from .errors import CheeseError, ErrorReporter
+from .diagnostics import WRITERS
+from .semantic import check_semantics
+from .snapshot import Checkpointer
+from .optimizer import eliminate_common_subexpressions
+from .partial import DEFAULT_FUEL, partially_evaluate
+from .columnar import DEFAULT_CHUNK_SIZE, map_csv
+from .server import (DEFAULT_CACHE_SIZE, DEFAULT_MEMORY_LIMIT, DEFAULT_RESULT_CACHE_SIZE,
+                     DEFAULT_TIME_LIMIT)
 from . import __version__, __author__
 
 
 class CheeseREPL:
     """
         Estrutura de repetição Read-Eval-Print para programação interativa Cheese++.
+        Cada linha pode ser um programa completo ou comandos soltos, sem o
+        Cheese/NoCheese em volta; o estado fica na Session.
     """
     
     def __init__(self, debug: bool = False):
-        self.context = CheeseContext()
-        self.runtime = Runtime()
+        self.context = CheeseContext(echo=print, keep_output=False)
+        self.session = Session(self.context)
         self.debug = debug
         self.history: List[str] = []
         
+    @property
+    def runtime(self) -> Runtime:
+        return self.session.runtime
+        
+    def welcome_message(self):
+        """Display welcome message"""
+        print(f"Cheese++ {__version__} interactive shell")
+        print("Type statements directly (e.g. Glyn(x) = 1; Wensleydale(x);)")
+        print("Type 'help' for commands, 'exit' to quit")
         
     def help_message(self):
         """Display help message"""
@@ -34,8 +55,8 @@ class CheeseREPL:
         print("  vars          - Show current variables")
         print("  reset         - Reset the environment")
         print("\nCheesepp++ Language Reference:")
-        print("  Cheese        - Start program")
-        print("  NoCheese      - End program")
+        print("  Cheese        - Start program (optional in the shell)")
+        print("  NoCheese      - End program (optional in the shell)")
         print("  Wensleydale() - Print function")
         print("  Swiss...Swiss - String literals")
         print("  Glyn()        - Variable function")
@@ -43,11 +64,11 @@ class CheeseREPL:
         
     def show_variables(self):
         """Show current variables"""
-        symbols = self.context.execution_context.symbol_table.get_all_symbols()
-        if symbols:
+        variables = self.session.variables
+        if variables:
             print("Current variables:")
-            for name, symbol in symbols.items():
-                print(f"  {name} = {symbol.value} (scope: {symbol.scope_level})")
+            for name, value in variables.items():
+                print(f"  {name} = {value}")
         else:
             print("No variables defined")
             
@@ -82,8 +103,7 @@ class CheeseREPL:
             self.show_variables()
             return True
         elif line.lower() == 'reset':
-            self.context.reset()
-            self.runtime = Runtime()
+            self.session.reset()
             print("Reset de ambiente realizado")
             return True
         elif line.lower().startswith('debug '):
@@ -104,19 +124,12 @@ class CheeseREPL:
         
         # Tentativa de execução do código
         try:
-            # Parse e execução
-            ast = parse(line)
-            self.context.execution_context.set_source_code(line)
-            result = self.runtime.run(ast, line)
+            # Parse (ou cache) e execução na sessão
+            result = self.session.execute(line)
             
             # Mostra o resultado da execução, se possível
             if result is not None:
-                print(result)
-                
-            # Mostra a saída do ambiente, se tiver uma
-            output = self.context.get_output()
-            if output:
-                print(output)
+                print(display(result))
                 
         except CheeseError as e:
             print(f"Error: {e}")
@@ -148,7 +161,10 @@ class CheeseREPL:
                 continue
 
 
-def execute_file(filename: str, debug: bool = False, verbose: bool = False) -> int:
+def execute_file(filename: str, debug: bool = False, verbose: bool = False,
+                 checkpoint: Optional[str] = None, checkpoint_every: Optional[int] = None,
+                 strict: bool = False, partial: bool = False, fuel: int = DEFAULT_FUEL,
+                 optimize: bool = False) -> int:
     """
     Executa um arquivo Cheese++.
     
@@ -156,6 +172,12 @@ def execute_file(filename: str, debug: bool = False, verbose: bool = False) -> i
         filename: Caminho para o arquivo Cheese++
         debug: Habilita o modo de depuração
         verbose: Habilita a saída detalhada
+        checkpoint: Arquivo de snapshot para retomar execuções interrompidas
+        checkpoint_every: Grava um snapshot a cada N comandos
+        strict: Não executa se a verificação semântica encontrar erros
+        partial: Avalia na compilação o que não depende da execução
+        fuel: Comandos que a avaliação parcial pode executar
+        optimize: Elimina subexpressões comuns em temporários ocultos
         
     Retorna:
         Código de saída (0 para sucesso, 1 para erro)
@@ -174,26 +196,64 @@ def execute_file(filename: str, debug: bool = False, verbose: bool = False) -> i
             print(f"Executing file: {filename}")
             print(f"Source code length: {len(source_code)} characters")
             
-        # Cria um ambiente de execução e contexto
-        context = CheeseContext()
-        runtime = Runtime()
+        # Cria um ambiente de execução e contexto; a saída passa pelo
+        # contexto e é impressa na hora
+        context = CheeseContext(echo=print, keep_output=False)
+        runtime = Runtime(context=context)
         error_reporter = ErrorReporter()
         
         # Parse e executa
         try:
-            ast = parse(source_code)
+            timings = {}
+            start = time.perf_counter()
+            ast = parse(source_code, reporter=error_reporter)
+            timings['parse'] = time.perf_counter() - start
+            if strict and not error_reporter.has_errors():
+                for error in check_semantics(ast):
+                    error_reporter.report_error(error)
+            if error_reporter.has_errors():
+                print(error_reporter.get_formatted_errors(), end='')
+                return 1
+            if partial:
+                start = time.perf_counter()
+                ast, folded = partially_evaluate(ast, fuel)
+                timings['partial'] = time.perf_counter() - start
+            if optimize:
+                start = time.perf_counter()
+                ast, cse = eliminate_common_subexpressions(ast)
+                timings['cse'] = time.perf_counter() - start
+                runtime.cse_savings = cse.savings
             context.execution_context.set_source_code(source_code)
-            result = runtime.run(ast, source_code)
-            
-            # Mostra a saida do resultado, se houver
-            output = context.get_output()
-            if output:
-                print(output)
+            start = time.perf_counter()
+            if checkpoint:
+                checkpointer = Checkpointer(checkpoint, checkpoint_every,
+                                            output=context.execution_context.add_output)
+                result = checkpointer.run(ast, source_code, runtime)
+                if verbose and checkpointer.resumed:
+                    print(f"Resumed from checkpoint {checkpoint}")
+                if checkpointer.interrupted:
+                    print(f"Execution interrupted; state saved to {checkpoint}")
+                    return 1
+            else:
+                result = runtime.run(ast, source_code)
+            timings['run'] = time.perf_counter() - start
                 
             if verbose:
                 print(f"Execution completed successfully")
                 stats = context.get_statistics()
                 print(f"Statistics: {stats}")
+                phases = ', '.join(f"{name} {seconds * 1000:.2f}ms" for name, seconds in timings.items())
+                if optimize:
+                    phases += f"; CSE saved {runtime.cse_saved} evaluations"
+                print(f"Profile: {phases}")
+                if partial:
+                    print(f"Partial evaluation: {folded.folded} statements folded, "
+                          f"{folded.residual} left, {folded.fuel_used} fuel used"
+                          + (" (fuel exhausted)" if folded.exhausted else ""))
+                if optimize:
+                    # Contagem no código reescrito; a da execução está no Profile
+                    print(f"CSE: {cse.temporaries} temporaries, "
+                          f"{cse.eliminated} operator evaluations removed from the code (static count)")
                 
             return 0
             
@@ -212,7 +272,163 @@ def execute_file(filename: str, debug: bool = False, verbose: bool = False) -> i
         return 1
 
 
+def map_file(program_file: str, input_file: str, output_file: str,
+             columns: Optional[str] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+             workers: Optional[int] = None, verbose: bool = False,
+             schema: Optional[str] = None) -> int:
+    """
+    Executa um programa Cheese++ para cada linha de um CSV.
+    `schema` fixa tipos de colunas, no formato "nome:tipo,nome:tipo".
+    
+    Retorna:
+        Código de saída (0 para sucesso, 1 para erro)
+    """
+    try:
+        with open(program_file, 'r', encoding='utf-8') as f:
+            source_code = f.read()
+        selected = [c.strip() for c in columns.split(',')] if columns else None
+        types = {}
+        for item in (schema.split(',') if schema else []):
+            name, _, kind = item.partition(':')
+            if not kind:
+                raise CheeseError(f"Invalid schema entry '{item}'",
+                                  suggestions=["Use name:type, e.g. price:float"])
+            types[name.strip()] = kind.strip()
+        rows = map_csv(source_code, input_file, output_file, selected, chunk_size, workers,
+                       types or None)
+        if verbose:
+            print(f"{rows} rows written to {output_file}")
+        return 0
+    except (CheeseError, OSError, ZeroDivisionError) as e:
+        print(f"Error: {e}")
+        return 1
+
+
+def map_main(argv: List[str]) -> int:
+    """Ponto de entrada do subcomando map"""
+    parser = argparse.ArgumentParser(
+        prog='cheesepp map',
+        description="Run a Cheese++ program once per CSV row"
+    )
+    parser.add_argument('program', help='Cheese++ program file')
+    parser.add_argument('--input', required=True, help='Input CSV (header row names the variables)')
+    parser.add_argument('--output', required=True, help='Output CSV')
+    parser.add_argument('--columns', help='Comma-separated variables to write (default: all assigned)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help='Rows per chunk')
+    parser.add_argument('--workers', type=int, help='Worker processes (default: CPU count)')
+    parser.add_argument('--schema', help='Column types as name:type pairs (int, float or str); '
+                                         'other columns are typed from the first chunk')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Enable verbose output')
+    args = parser.parse_args(argv)
+    return map_file(args.program, args.input, args.output, args.columns,
+                    args.chunk_size, args.workers, args.verbose, args.schema)
+
+
+def check_file(filename: str, reporter: ErrorReporter) -> None:
+    """Relata os erros de sintaxe e, se não houver, os semânticos e de tipo de um arquivo"""
+    reporter.start_file(filename)
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            source_code = f.read()
+    except OSError as e:
+        reporter.report_error(CheeseError(f"Cannot read file: {e.strerror}"))
+        return
+    before = reporter.get_error_count()
+    program = parse(source_code, reporter=reporter)
+    if program is not None and reporter.get_error_count() == before:
+        for error in check_semantics(program):
+            reporter.report_error(error)
+
+
+def check_files(filenames: List[str], output_format: str = 'text', output: Optional[str] = None,
+                max_errors: int = 10, keep: int = 0) -> int:
+    """
+    Verifica vários arquivos Cheese++ sem executá-los, escrevendo cada erro
+    no formato pedido (text, jsonl ou sarif) assim que ele é encontrado.
+    Só `keep` erros ficam em memória; os demais são apenas contados.
+    
+    Retorna:
+        Código de saída (0 sem erros, 1 com erros)
+    """
+    stream = open(output, 'w', encoding='utf-8') if output else sys.stdout
+    try:
+        with WRITERS[output_format](stream) as sink:
+            reporter = ErrorReporter(sink=sink, keep=keep)
+            reporter.max_errors = max_errors
+            for filename in filenames:
+                check_file(filename, reporter)
+    finally:
+        if output:
+            stream.close()
+    if output_format == 'text':
+        print(f"{reporter.get_error_count()} error(s) in {len(filenames)} file(s)", file=sys.stderr)
+    return 1 if reporter.has_errors() else 0
+
+
+def check_main(argv: List[str]) -> int:
+    """Ponto de entrada do subcomando check"""
+    parser = argparse.ArgumentParser(
+        prog='cheesepp check',
+        description="Check Cheese++ files without running them, streaming diagnostics"
+    )
+    parser.add_argument('files', nargs='+', help='Cheese++ files to check')
+    parser.add_argument('--format', choices=sorted(WRITERS), default='text',
+                        help='Diagnostics format (default: text)')
+    parser.add_argument('--output', help='Write diagnostics to this file (default: stdout)')
+    parser.add_argument('--max-errors', type=int, default=10,
+                        help='Syntax errors reported per file before giving up on it')
+    args = parser.parse_args(argv)
+    return check_files(args.files, args.format, args.output, args.max_errors)
+
+
+def serve_main(argv: List[str]) -> int:
+    """Ponto de entrada do subcomando serve"""
+    import asyncio
+    from .server import serve
+
+    parser = argparse.ArgumentParser(
+        prog='cheesepp serve',
+        description="Serve Cheese++ programs over a local socket (one JSON request per line)"
+    )
+    parser.add_argument('--socket', help='Unix socket path (default: TCP on --host/--port)')
+    parser.add_argument('--host', default='127.0.0.1', help='TCP host')
+    parser.add_argument('--port', type=int, default=7878, help='TCP port')
+    parser.add_argument('--workers', type=int, help='Worker processes (default: CPU count)')
+    parser.add_argument('--time-limit', type=float, default=DEFAULT_TIME_LIMIT,
+                        help='Maximum seconds per request')
+    parser.add_argument('--memory-limit', type=float, default=DEFAULT_MEMORY_LIMIT,
+                        help='Maximum extra MB per request')
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_CACHE_SIZE,
+                        help='Compiled programs kept per worker')
+    parser.add_argument('--result-cache-size', type=int, default=DEFAULT_RESULT_CACHE_SIZE,
+                        help='Results of pure programs kept per worker (0 disables)')
+    parser.add_argument('--result-ttl', type=float,
+                        help='Seconds a cached result stays valid (default: no expiry)')
+    parser.add_argument('--result-cache-dir',
+                        help='Keep cached results as files in this directory, shared by all workers')
+    args = parser.parse_args(argv)
+
+    where = args.socket or f"{args.host}:{args.port}"
+    print(f"Cheese++ {__version__} serving on {where}")
+    try:
+        asyncio.run(serve(args.socket, args.host, args.port, workers=args.workers,
+                          time_limit=args.time_limit, memory_limit=args.memory_limit,
+                          cache_size=args.cache_size, result_cache_size=args.result_cache_size,
+                          result_ttl=args.result_ttl, result_cache_dir=args.result_cache_dir))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == 'map':
+        sys.exit(map_main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == 'serve':
+        sys.exit(serve_main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == 'check':
+        sys.exit(check_main(sys.argv[2:]))
+
     parser = argparse.ArgumentParser(
         description=f"Cheese++ Compiler v{__version__}",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -222,6 +438,13 @@ Examples:
   cheesepp program.cheesepp   # Executa um arquivo Cheese++
   cheesepp -d program.cheesepp # Executa com o modo de depuração
   cheesepp -v program.cheesepp # Executa com saída detalhada
+  cheesepp --strict program.cheesepp # Recusa programas com variáveis indefinidas
+  cheesepp --partial -v program.cheesepp # Avalia na compilação e mostra os tempos
+  cheesepp -O -v program.cheesepp # Elimina subexpressões comuns e mostra o resumo
+  cheesepp map program.cheesepp --input data.csv --output out.csv
+  cheesepp --checkpoint state.ckpt program.cheesepp
+  cheesepp serve --socket /tmp/cheesepp.sock
+  cheesepp check --format jsonl src/*.cheesepp
         """
     )
     
@@ -243,6 +466,44 @@ Examples:
         help='Enable verbose output'
     )
     
+    parser.add_argument(
+        '--checkpoint',
+        metavar='PATH',
+        help='Save snapshots to PATH (on SIGTERM/SIGINT/SIGUSR1) and resume from it'
+    )
+    
+    parser.add_argument(
+        '--checkpoint-every',
+        type=int,
+        metavar='N',
+        help='Also save a snapshot every N statements'
+    )
+    
+    parser.add_argument(
+        '--strict',
+        action='store_true',
+        help='Refuse to run programs with semantic or type errors (e.g. undefined variables)'
+    )
+    
+    parser.add_argument(
+        '--partial',
+        action='store_true',
+        help='Evaluate the parts of the program that need no input at compile time'
+    )
+    
+    parser.add_argument(
+        '--fuel',
+        type=int,
+        default=DEFAULT_FUEL,
+        help=f'Statements the partial evaluator may run (default: {DEFAULT_FUEL})'
+    )
+    
+    parser.add_argument(
+        '-O', '--optimize',
+        action='store_true',
+        help='Eliminate common subexpressions into hidden temporaries before running'
+    )
+    
     parser.add_argument(
         '--version',
         action='version',
@@ -252,7 +513,9 @@ Examples:
     args = parser.parse_args()
     
     if args.file:
-        exit_code = execute_file(args.file, args.debug, args.verbose)
+        exit_code = execute_file(args.file, args.debug, args.verbose,
+                                 args.checkpoint, args.checkpoint_every, args.strict,
+                                 args.partial, args.fuel, args.optimize)
         sys.exit(exit_code)
     else:
         repl = CheeseREPL(debug=args.debug)
@@ -0,0 +1,210 @@
+import csv
+import itertools
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from .ast import *
+from .batch import BatchRuntime, np
+from .errors import CheeseRuntimeError
+from .ir import iter_statements
+from .parser import parse
+
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+# Programa já analisado em cada processo de trabalho
+_worker_program = None
+_worker_source = None
+
+
+def assigned_names(program) -> List[str]:
+    """Variáveis atribuídas pelo programa, na ordem em que aparecem"""
+    names = {}
+    for node in iter_statements(program):
+        if type(node) is CheeseAssign:
+            names.setdefault(node.name)
+    return list(names)
+
+
+# Tipos aceitos para as colunas de entrada e os dtypes correspondentes
+COLUMN_TYPES = ('int', 'float', 'str')
+_DTYPES = {'int': 'int64', 'float': 'float64'}
+
+
+def _fits(values: Sequence[str], kind: str) -> bool:
+    """Se todos os valores convertem para o dtype de `kind`"""
+    try:
+        np.asarray(values, dtype=object).astype(str).astype(_DTYPES[kind])
+        return True
+    except (ValueError, OverflowError):
+        return False
+
+
+def infer_schema(header: List[str], rows: List[List[str]],
+                 schema: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """
+    Decide o tipo de cada coluna uma vez, pela amostra `rows` (o primeiro
+    bloco), e o mantém para todos os blocos. Células vazias não contam; um
+    inteiro fora do int64 faz a coluna virar float. Os tipos de `schema`
+    têm precedência sobre a amostra.
+    """
+    schema = dict(schema or {})
+    for name, kind in schema.items():
+        if kind not in COLUMN_TYPES:
+            raise CheeseRuntimeError(f"Unknown type '{kind}' for column '{name}'",
+                                     suggestions=[f"Use one of: {', '.join(COLUMN_TYPES)}"])
+        if name not in header:
+            raise CheeseRuntimeError(f"Column '{name}' is not in the input header")
+    for i, name in enumerate(header):
+        if name in schema:
+            continue
+        sample = [row[i] for row in rows if i < len(row) and row[i].strip()]
+        schema[name] = next((kind for kind in ('int', 'float') if _fits(sample, kind)), 'str')
+    return schema
+
+
+def column_to_array(values: Sequence[str], kind: str = 'str', name: str = '',
+                    first_line: int = 2):
+    """
+    Converte uma coluna de texto em array do tipo `kind` (ver infer_schema).
+    Células vazias valem 0 nas colunas numéricas, como uma variável nunca
+    atribuída; uma célula que não converte é um erro com a linha do CSV.
+    """
+    if kind == 'str':
+        return np.asarray(values, dtype=object).astype(str).astype(object)
+    cells = [value if value.strip() else '0' for value in values]
+    try:
+        return np.asarray(cells, dtype=object).astype(str).astype(_DTYPES[kind])
+    except (ValueError, OverflowError):
+        # Procura a célula que não converte, para a mensagem
+        offset = next(i for i, value in enumerate(cells) if not _fits([value], kind))
+    value = cells[offset]
+    wider = 'float' if kind == 'int' and _fits([value], 'float') else 'str'
+    raise CheeseRuntimeError(
+        f"Line {first_line + offset}, column '{name}': '{value}' is not a valid {kind}",
+        suggestions=[f"Set the column type with --schema {name}:{wider}"])
+
+
+def _format(value: Any) -> str:
+    if hasattr(value, 'item'):
+        value = value.item()
+    return str(value)
+
+
+def run_chunk(program, source: Optional[str], header: List[str],
+              rows: List[List[str]], columns: List[str],
+              schema: Optional[Dict[str, str]] = None, first_line: int = 2) -> List[List[str]]:
+    """
+    Executa o programa para um bloco de linhas e devolve as colunas de saída.
+    `first_line` é a linha do CSV em que o bloco começa, para as mensagens.
+    """
+    size = len(rows)
+    width = len(header)
+    for offset, row in enumerate(rows):
+        if len(row) != width:
+            raise CheeseRuntimeError(
+                f"Line {first_line + offset} has {len(row)} fields, expected {width}")
+    if schema is None:
+        schema = infer_schema(header, rows)
+    inputs = {name: column_to_array([row[i] for row in rows], schema[name], name, first_line)
+              for i, name in enumerate(header)}
+    runtime = BatchRuntime(size)
+    runtime.run(program, source, inputs=inputs)
+
+    output_columns = []
+    for name in columns:
+        value = runtime.env.get(name, 0)
+        if isinstance(value, np.ndarray):
+            output_columns.append([_format(v) for v in value])
+        else:
+            output_columns.append([_format(value)] * size)
+    if not output_columns:
+        return [[] for _ in rows]
+    return [list(row) for row in zip(*output_columns)]
+
+
+def _init_worker(source: str) -> None:
+    global _worker_program, _worker_source
+    _worker_program = parse(source)
+    _worker_source = source
+
+
+def _worker_chunk(header, rows, columns, schema, first_line):
+    return run_chunk(_worker_program, _worker_source, header, rows, columns, schema, first_line)
+
+
+def read_chunks(reader: Iterator[List[str]], chunk_size: int) -> Iterator[List[List[str]]]:
+    """Agrupa as linhas do CSV em blocos, sem carregar o arquivo inteiro na memória"""
+    chunk: List[List[str]] = []
+    for row in reader:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def map_csv(source: str, input_path: str, output_path: str,
+            columns: Optional[List[str]] = None,
+            chunk_size: int = DEFAULT_CHUNK_SIZE,
+            workers: Optional[int] = None,
+            schema: Optional[Dict[str, str]] = None) -> int:
+    """
+    Executa um programa Cheese++ para cada linha de um CSV.
+
+    Cada coluna de entrada preenche a variável de mesmo nome no ambiente
+    inicial; as variáveis escolhidas em `columns` (por padrão, todas as
+    atribuídas pelo programa) viram as colunas do CSV de saída. Os blocos
+    são processados em paralelo e escritos na ordem original. O tipo de cada
+    coluna vem de `schema` ou do primeiro bloco (ver infer_schema) e vale
+    para o arquivo inteiro, então o resultado não depende de `chunk_size`.
+
+    Retorna:
+        Número de linhas processadas
+    """
+    if np is None:
+        raise CheeseRuntimeError("O modo map precisa do NumPy instalado",
+                                 suggestions=["pip install numpy"])
+    program = parse(source)
+    if columns is None:
+        columns = assigned_names(program)
+    workers = workers or os.cpu_count() or 1
+
+    total = 0
+    with open(input_path, newline='', encoding='utf-8') as infile, \
+            open(output_path, 'w', newline='', encoding='utf-8') as outfile:
+        reader = csv.reader(infile)
+        try:
+            header = [name.strip() for name in next(reader)]
+        except StopIteration:
+            raise CheeseRuntimeError(f"Arquivo de entrada '{input_path}' está vazio")
+        writer = csv.writer(outfile)
+        writer.writerow(columns)
+
+        chunks = read_chunks(reader, chunk_size)
+        first = next(chunks, [])
+        schema = infer_schema(header, first, schema)
+        chunks = itertools.chain([first], chunks) if first else chunks
+        if workers == 1:
+            for rows in chunks:
+                writer.writerows(run_chunk(program, source, header, rows, columns,
+                                           schema, total + 2))
+                total += len(rows)
+            return total
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(source,)) as pool:
+            # Limita os blocos em voo para manter a memória constante
+            in_flight = deque()
+            for rows in chunks:
+                in_flight.append(pool.submit(_worker_chunk, header, rows, columns,
+                                             schema, total + 2))
+                total += len(rows)
+                if len(in_flight) >= workers * 2:
+                    writer.writerows(in_flight.popleft().result())
+            while in_flight:
+                writer.writerows(in_flight.popleft().result())
+    return total
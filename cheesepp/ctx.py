@@ -1,8 +1,12 @@
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Callable, Iterable, Optional, List
 from dataclasses import dataclass
 from enum import Enum
 
 
+# Marca de nome ausente do ambiente (um valor None é válido)
+_MISSING = object()
+
+
 class SymbolType(Enum):
     """Enumeração de tipos em Cheese++"""
     VARIABLE = "variable"
@@ -27,27 +31,43 @@ class SymbolTable:
     """
     Implementação de tabela de símbolos para o interpretador Cheese++.
     Gerencia declarações de variáveis, pesquisas e gerenciamento de escopo.
+
+    `symbols` guarda só o símbolo visível de cada nome, então a pesquisa é
+    um acesso ao dicionário. Um símbolo que esconde outro de um escopo
+    externo empilha o antigo em `_shadowed`, e cada escopo aberto anota em
+    `_undo` os nomes que definiu: sair do escopo desfaz só essas definições.
     """
     
     def __init__(self):
         self.symbols: Dict[str, Symbol] = {}
         self.scope_stack: List[int] = [0]  
         self.current_scope: int = 0
+        # Símbolos escondidos por um de mesmo nome num escopo interno
+        self._shadowed: Dict[str, List[Symbol]] = {}
+        # Nomes definidos em cada escopo aberto, na ordem da definição
+        self._undo: List[List[str]] = [[]]
         
     def enter_scope(self) -> None:
         """Entra em um novo escopo"""
         self.current_scope += 1
         self.scope_stack.append(self.current_scope)
+        self._undo.append([])
         
     def exit_scope(self) -> None:
         """Sair do escopo atual e remover símbolos desse escopo"""
         if len(self.scope_stack) > 1:
-            exiting_scope = self.scope_stack.pop()
-            
-            to_remove = [name for name, symbol in self.symbols.items() 
-                        if symbol.scope_level == exiting_scope]
-            for name in to_remove:
-                del self.symbols[name]
+            self.scope_stack.pop()
+            symbols = self.symbols
+            shadowed = self._shadowed
+            for name in reversed(self._undo.pop()):
+                outer = shadowed.get(name)
+                if outer:
+                    # Volta a valer o símbolo do escopo externo
+                    symbols[name] = outer.pop()
+                    if not outer:
+                        del shadowed[name]
+                else:
+                    del symbols[name]
             self.current_scope = self.scope_stack[-1]
     
     def define(self, name: str, symbol_type: SymbolType, value: Any, 
@@ -56,9 +76,12 @@ class SymbolTable:
         Define um novo símbolo no escopo atual.
         Retorna True se for bem sucedido, False se o símbolo já existir no escopo atual.
         """
+        visible = self.symbols.get(name)
         # Checka se um simbolo existe no escopo atual
-        if name in self.symbols and self.symbols[name].scope_level == self.current_scope:
-            return False
+        if visible is not None:
+            if visible.scope_level == self.current_scope:
+                return False
+            self._shadowed.setdefault(name, []).append(visible)
             
         self.symbols[name] = Symbol(
             name=name,
@@ -67,21 +90,20 @@ class SymbolTable:
             scope_level=self.current_scope,
             line_number=line_number
         )
+        self._undo[-1].append(name)
         return True
     
+    def scope_names(self) -> List[str]:
+        """Nomes definidos no escopo atual, na ordem da definição"""
+        return list(self._undo[-1])
+    
     def lookup(self, name: str) -> Optional[Symbol]:
-        """Pesquisar um símbolo na tabela de símbolos (pesquisar do escopo atual para cima)"""
-        
-        for scope_level in reversed(self.scope_stack):
-            if name in self.symbols:
-                symbol = self.symbols[name]
-                if symbol.scope_level <= scope_level:
-                    return symbol
-        return None
+        """Pesquisar um símbolo na tabela de símbolos (o do escopo mais interno)"""
+        return self.symbols.get(name)
     
     def update(self, name: str, value: Any) -> bool:
         """Atualizar o valor de um símbolo existente"""
-        symbol = self.lookup(name)
+        symbol = self.symbols.get(name)
         if symbol:
             symbol.value = value
             return True
@@ -101,9 +123,13 @@ class ExecutionContext:
     Gerencia o ambiente de execução, incluindo tabelas de símbolos e estado do tempo de execução.
     """
     
-    def __init__(self):
+    def __init__(self, echo: Optional[Callable[[str], Any]] = None, keep_output: bool = True):
         self.symbol_table = SymbolTable()
         self.output_buffer: List[str] = []
+        # Cada linha de saída também pode ser repassada na hora (ex.: print);
+        # sem keep_output ela não fica guardada no buffer
+        self.echo = echo
+        self.keep_output = keep_output
         self.error_messages: List[str] = []
         self.debug_mode: bool = False
         self.source_code: Optional[str] = None
@@ -115,7 +141,42 @@ class ExecutionContext:
         
     def add_output(self, message: str) -> None:
         """Adicionar mensagem de saída ao buffer de saída"""
-        self.output_buffer.append(str(message))
+        text = str(message)
+        if self.keep_output:
+            self.output_buffer.append(text)
+        if self.echo is not None:
+            self.echo(text)
+
+    def load_variables(self, env: Dict[str, Any], names: Optional[Iterable[str]] = None) -> None:
+        """
+        Copia os símbolos visíveis para o ambiente do runtime; com `names`,
+        só os desses nomes, sem percorrer a tabela inteira
+        """
+        symbols = self.symbol_table.symbols
+        for name in (symbols if names is None else names):
+            symbol = symbols.get(name)
+            if symbol is not None:
+                env[name] = symbol.value
+
+    def store_variables(self, env: Dict[str, Any], names: Optional[Iterable[str]] = None) -> int:
+        """
+        Grava o ambiente do runtime na tabela de símbolos; com `names`, só as
+        variáveis desses nomes que estão no ambiente.
+        Retorna quantas variáveis eram novas.
+        """
+        symbols = self.symbol_table.symbols
+        declared = 0
+        for name in (env if names is None else names):
+            value = env.get(name, _MISSING)
+            if value is _MISSING:
+                continue
+            symbol = symbols.get(name)
+            if symbol is None:
+                self.symbol_table.define(name, SymbolType.VARIABLE, value)
+                declared += 1
+            else:
+                symbol.value = value
+        return declared
         
     def add_error(self, message: str, line_number: Optional[int] = None) -> None:
         """Adicionar mensagem de erro ao buffer de erros"""
@@ -162,8 +223,8 @@ class CheeseContext:
     Fornece uma interface unificada para gerenciar o contexto de compilação e execução.
     """
     
-    def __init__(self):
-        self.execution_context = ExecutionContext()
+    def __init__(self, echo: Optional[Callable[[str], Any]] = None, keep_output: bool = True):
+        self.execution_context = ExecutionContext(echo, keep_output)
         self.compilation_phase = "lexical"  
         self.statistics = {
             "variables_declared": 0,
@@ -183,6 +244,19 @@ class CheeseContext:
             
     def get_statistics(self) -> Dict[str, int]:
         return self.statistics.copy()
+
+    def record_run(self, env: Dict[str, Any], statements: int, expressions: int,
+                   calls: int, names: Optional[Iterable[str]] = None) -> None:
+        """
+        Fim de uma execução do runtime: grava as variáveis (só `names`, se
+        dado) e soma os contadores, uma vez por execução em vez de um
+        increment_stat por nó
+        """
+        stats = self.statistics
+        stats["variables_declared"] += self.execution_context.store_variables(env, names)
+        stats["functions_called"] += calls
+        stats["expressions_evaluated"] += expressions
+        stats["statements_executed"] += statements
         
     def declare_variable(self, name: str, value: Any, line_number: Optional[int] = None) -> bool:
         """Declaração de variável no contexto"""
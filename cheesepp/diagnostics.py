@@ -0,0 +1,145 @@
+"""
+Diagnósticos do Cheese++ em formato de máquina.
+
+Um ErrorReporter com `sink` entrega cada erro ao sink no momento em que ele
+é relatado, e o sink escreve um registro com arquivo, linha, coluna, tipo,
+mensagem e sugestões. Um processo supervisor lê os registros enquanto a
+verificação ainda roda, sem que nenhum dos lados junte listas de erros:
+
+- TextWriter: uma linha `arquivo:linha:coluna: tipo error: mensagem`
+- JSONLWriter: um objeto JSON por linha
+- SARIFWriter: um log SARIF 2.1.0, com os resultados escritos um a um
+
+Cada registro sai numa só chamada de `write` seguida de `flush`.
+"""
+import json
+from pathlib import Path
+from typing import IO, Any, Dict, Optional
+
+from . import __version__
+from .errors import CheeseError, ErrorType
+
+SARIF_VERSION = "2.1.0"
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+
+
+def diagnostic(error: CheeseError, file: Optional[str] = None) -> Dict[str, Any]:
+    """Registro de um erro, com as chaves usadas no JSONL"""
+    info = error.error_info
+    return {
+        'file': file,
+        'line': info.line_number,
+        'column': info.column_number,
+        'type': info.error_type.value,
+        'message': info.message,
+        'context': info.context,
+        'suggestions': list(info.suggestions or ()),
+    }
+
+
+class _Writer:
+    """Base dos sinks: `write(error, file)` para cada erro e `close()` no fim"""
+
+    def __init__(self, stream: IO[str]):
+        self.stream = stream
+        self.written = 0
+
+    def _emit(self, text: str) -> None:
+        self.stream.write(text)
+        self.stream.flush()
+
+    def write(self, error: CheeseError, file: Optional[str] = None) -> None:
+        self._emit(self.format(error, file))
+        self.written += 1
+
+    def format(self, error: CheeseError, file: Optional[str]) -> str:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        self.stream.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class TextWriter(_Writer):
+    """Uma linha por erro, no formato dos compiladores"""
+
+    def format(self, error, file):
+        info = error.error_info
+        where = ":".join(str(part) for part in (file, info.line_number, info.column_number)
+                         if part is not None)
+        prefix = f"{where}: " if where else ""
+        return f"{prefix}{info.error_type.value} error: {info.message}\n"
+
+
+class JSONLWriter(_Writer):
+    """Um objeto JSON por linha (ver `diagnostic`)"""
+
+    def format(self, error, file):
+        return json.dumps(diagnostic(error, file), ensure_ascii=False) + "\n"
+
+
+class SARIFWriter(_Writer):
+    """
+    Log SARIF com uma execução do Cheese++. O cabeçalho sai na criação, cada
+    resultado sai quando o erro é relatado e `close()` fecha o documento; só
+    depois do close o arquivo é JSON válido.
+    """
+
+    def __init__(self, stream: IO[str]):
+        super().__init__(stream)
+        log = {
+            'version': SARIF_VERSION,
+            '$schema': SARIF_SCHEMA,
+            'runs': [{
+                'tool': {'driver': {
+                    'name': 'Cheese++',
+                    'version': __version__,
+                    'rules': [{'id': kind.value} for kind in ErrorType],
+                }},
+                'results': [],
+            }],
+        }
+        head, self._tail = json.dumps(log).split('"results": []')
+        self._emit(head + '"results": [\n')
+        self._closed = False
+
+    def format(self, error, file):
+        info = error.error_info
+        result: Dict[str, Any] = {
+            'ruleId': info.error_type.value,
+            'level': 'error',
+            'message': {'text': info.message},
+        }
+        location: Dict[str, Any] = {}
+        if file is not None:
+            location['artifactLocation'] = {'uri': Path(file).as_posix()}
+        if info.line_number:
+            region: Dict[str, Any] = {'startLine': info.line_number}
+            if info.column_number:
+                region['startColumn'] = info.column_number
+            if info.context:
+                region['snippet'] = {'text': info.context}
+            location['region'] = region
+        if location:
+            result['locations'] = [{'physicalLocation': location}]
+        if info.suggestions:
+            result['properties'] = {'suggestions': list(info.suggestions)}
+        separator = ",\n" if self.written else ""
+        return separator + json.dumps(result, ensure_ascii=False)
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._emit("\n]" + self._tail + "\n")
+
+
+WRITERS = {
+    'text': TextWriter,
+    'jsonl': JSONLWriter,
+    'sarif': SARIFWriter,
+}
@@ -51,6 +51,17 @@ class CheeseError(Exception):
         )
         super().__init__(str(self.error_info))
 
+    def __reduce__(self):
+        # Entre processos (map, serve) o erro volta com o mesmo ErrorInfo
+        return _restore_error, (type(self), self.error_info)
+
+
+def _restore_error(cls, error_info: ErrorInfo) -> CheeseError:
+    error = cls.__new__(cls)
+    error.error_info = error_info
+    Exception.__init__(error, str(error_info))
+    return error
+
 
 class CheeseLexicalError(CheeseError):
     """Erros de análise léxica"""
@@ -100,16 +111,39 @@ class ErrorReporter:
     """
     Sistema de gerenciamento e relatório de erros para o compilador Cheese++.
     Coleta, formata e relata erros durante a compilação e a execução.
+
+    Com `sink` (ver diagnostics.py), cada erro é escrito no momento em que é
+    relatado. Com `keep`, no máximo `keep` erros ficam em `errors`; depois
+    disso o reporter só conta, então a memória não cresce com o lote.
     """
     
-    def __init__(self):
+    def __init__(self, sink=None, keep: Optional[int] = None):
         self.errors: List[CheeseError] = []
         self.warnings: List[str] = []
         self.max_errors = 10  
+        self.sink = sink
+        self.keep = keep
+        # Arquivo dos erros relatados a seguir, repassado ao sink
+        self.file: Optional[str] = None
+        self.error_count = 0
+        self.counts: Dict[ErrorType, int] = {}
+        self._file_errors = 0
+        
+    def start_file(self, file: Optional[str]) -> None:
+        """Passa a relatar erros de `file`; max_errors vale por arquivo"""
+        self.file = file
+        self._file_errors = 0
         
     def report_error(self, error: CheeseError) -> None:
         """Reporta um erro"""
-        self.errors.append(error)
+        self.error_count += 1
+        self._file_errors += 1
+        kind = error.error_info.error_type
+        self.counts[kind] = self.counts.get(kind, 0) + 1
+        if self.sink is not None:
+            self.sink.write(error, self.file)
+        if self.keep is None or len(self.errors) < self.keep:
+            self.errors.append(error)
         
     def report_lexical_error(self, message: str, line_number: Optional[int] = None,
                            column_number: Optional[int] = None, context: Optional[str] = None) -> None:
@@ -151,15 +185,15 @@ class ErrorReporter:
         
     def has_errors(self) -> bool:
         """Checka se existe algum erro"""
-        return len(self.errors) > 0
+        return self.error_count > 0
         
     def has_warnings(self) -> bool:
         """Checka se existe algum aviso"""
         return len(self.warnings) > 0
         
     def get_error_count(self) -> int:
-        """Pega o número de erros"""
-        return len(self.errors)
+        """Pega o número de erros, inclusive os que não foram guardados"""
+        return self.error_count
         
     def get_warning_count(self) -> int:
         """Pega o número de avisos"""
@@ -167,7 +201,7 @@ class ErrorReporter:
         
     def should_stop_compilation(self) -> bool:
         """Verificar se a compilação deve ser interrompida devido ao excesso de erros"""
-        return len(self.errors) >= self.max_errors
+        return self._file_errors >= self.max_errors
         
     def get_errors_by_type(self, error_type: ErrorType) -> List[CheeseError]:
         """Pega erros de um tipo específico"""
@@ -175,12 +209,14 @@ class ErrorReporter:
         
     def get_formatted_errors(self) -> str:
         """Obter todos os erros formatados como uma string"""
-        if not self.errors:
+        if not self.error_count:
             return "Não foram encontrados erros"
             
-        result = f"Encontrados {len(self.errors)} erro(s):\n"
+        result = f"Encontrados {self.error_count} erro(s):\n"
         for i, error in enumerate(self.errors, 1):
             result += f"{i}. {error}\n"
+        if self.error_count > len(self.errors):
+            result += f"... e mais {self.error_count - len(self.errors)} erro(s)\n"
             
         return result
         
@@ -198,13 +234,13 @@ class ErrorReporter:
     def get_summary(self) -> str:
         """Obter um resumo de todos os erros e avisos"""
         summary = f"Compilation Summary:\n"
-        summary += f"- Errors: {len(self.errors)}\n"
+        summary += f"- Errors: {self.error_count}\n"
         summary += f"- Warnings: {len(self.warnings)}\n"
         
-        if self.errors:
+        if self.error_count:
             summary += f"\nErros por tipo:\n"
             for error_type in ErrorType:
-                count = len(self.get_errors_by_type(error_type))
+                count = self.counts.get(error_type, 0)
                 if count > 0:
                     summary += f"- {error_type.value.title()}: {count}\n"
                     
@@ -214,9 +250,12 @@ class ErrorReporter:
         """Limpar todos os erros e avisos"""
         self.errors.clear()
         self.warnings.clear()
+        self.error_count = 0
+        self.counts.clear()
+        self._file_errors = 0
         
     def __repr__(self):
-        return f"ErrorReporter(errors={len(self.errors)}, warnings={len(self.warnings)})"
+        return f"ErrorReporter(errors={self.error_count}, warnings={len(self.warnings)})"
 
 
 
@@ -230,12 +269,18 @@ ERROR_MESSAGES = {
     "invalid_swiss": "Invalid Swiss string format",
     "division_by_zero": "Division by zero",
     "invalid_syntax": "Invalid syntax near '{token}'",
+    "invalid_character": "Invalid character '{char}'",
+    "used_before_assignment": "Variable '{var_name}' may be used before it is assigned",
+    "incomplete_statement": "Incomplete statement at the end of the input",
+    "integer_too_large": "Integer with about {digits} digits is too large to print (limit: {limit} digits)",
 }
 
 SUGGESTIONS = {
     "undefined_variable": ["Check variable name spelling", "Ensure variable is declared before use"],
+    "used_before_assignment": ["Assign the variable before this point on every path"],
     "missing_cheese": ["Add 'Cheese' at the beginning of your program"],
     "missing_nocheese": ["Add 'NoCheese' at the end of your program"],
     "missing_brie": ["Add 'Brie' at the end of the statement"],
     "invalid_swiss": ["Use Swiss...Swiss format for strings"],
+    "incomplete_statement": ["Finish the statement and end it with ';' or Brie"],
 }
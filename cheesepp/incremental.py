@@ -0,0 +1,179 @@
+import re
+import threading
+from bisect import bisect_left
+from typing import List, Optional
+
+from lark import Lark
+from lark.exceptions import LarkError
+from lark.visitors import Transformer_NonRecursive
+
+from .ast import *
+from .parser import grammar
+from .transformer import CheeseTransformer, ConstantPool
+
+_HEADER = re.compile(r'\s*Cheese')
+_FOOTER = 'NoCheese'
+_WRAP_HEADER = 'Cheese '
+_WRAP_FOOTER = ' NoCheese'
+
+_parser = None
+_parser_lock = threading.Lock()
+
+
+def _tree_parser() -> Lark:
+    """Parser que devolve a árvore com posições (criado no primeiro uso)"""
+    global _parser
+    with _parser_lock:
+        if _parser is None:
+            _parser = Lark(grammar, start='start', parser='lalr', propagate_positions=True)
+        return _parser
+
+
+def _parse_statements(text: str, offset: int = 0):
+    """Árvores dos comandos de nível superior de um trecho do corpo"""
+    # Mesmo estado inicial do arquivo inteiro, para o lexer contextual
+    # reconhecer o primeiro token do trecho do mesmo jeito
+    tree = _tree_parser().parse(_WRAP_HEADER + text + _WRAP_FOOTER)
+    return tree.children[0].children, offset - len(_WRAP_HEADER)
+
+
+def _is_word(char: str) -> bool:
+    return char.isalnum() or char == '_'
+
+
+class _StatementBuilder(Transformer_NonRecursive, CheeseTransformer):
+    """O CheeseTransformer aplicado a uma árvore já pronta, sem recursão"""
+
+
+class Document:
+    """
+    Código-fonte Cheese++ mantido entre edições, para editores e ferramentas.
+
+    O corpo do programa é dividido nos seus comandos de nível superior; cada
+    um guarda onde termina no texto. Uma edição reanalisa só os comandos que
+    ela toca, e os demais continuam sendo os mesmos objetos. O pool de
+    constantes é o mesmo em todas as edições, então uma expressão reescrita
+    igual à anterior volta a ser o mesmo nó e reaproveita o código pós-fixo
+    já guardado em `Runtime.code`.
+
+    A análise parcial só é aceita quando não pode mudar o resto do programa:
+    se o último comando reanalisado é um Cheddar (cuja condição poderia
+    continuar) ou um Stilton (cujo White engole os comandos seguintes), ou se
+    a edição cola duas palavras, a região cresce. Edições em `Cheese` ou
+    `NoCheese` e regiões com erro de sintaxe reanalisam o arquivo inteiro.
+    """
+
+    def __init__(self, text: str, pool: Optional[ConstantPool] = None):
+        self.pool = pool if pool is not None else ConstantPool()
+        self._builder = _StatementBuilder()
+        self._builder.pool = self.pool
+        self.text = text
+        # Comandos de nível superior e a posição em que cada um termina; as
+        # posições a partir de `_shift_at` ainda precisam somar `_shift`, para
+        # que digitar num mesmo ponto não desloque o arquivo inteiro
+        self.statements: List = []
+        self._ends: List[int] = []
+        self._shift_at = 0
+        self._shift = 0
+        # Comandos analisados pela última edição
+        self.reparsed = 0
+        self._parse_all()
+
+    def _build(self, trees, offset: int):
+        statements = []
+        ends = []
+        for tree in trees:
+            # `;` ou `Brie` sozinhos viram None, como em parse()
+            statements.append(self._builder.transform(tree) if tree.children else None)
+            ends.append(offset + tree.meta.end_pos)
+        return statements, ends
+
+    def _parse_all(self) -> None:
+        # Se falhar, os últimos comandos válidos continuam em `statements`
+        self._body = None
+        tree = _tree_parser().parse(self.text)
+        self.statements, self._ends = self._build(tree.children[0].children, 0)
+        self._shift_at, self._shift = len(self._ends), 0
+        self._body = (_HEADER.match(self.text).end(), self.text.rindex(_FOOTER))
+        self.reparsed = len(self.statements)
+
+    def _end(self, index: int) -> int:
+        end = self._ends[index]
+        return end + self._shift if index >= self._shift_at else end
+
+    def _find(self, position: int) -> int:
+        """Primeiro comando que termina em `position` ou depois"""
+        ends, at = self._ends, self._shift_at
+        if at and ends[at - 1] >= position:
+            return bisect_left(ends, position, 0, at)
+        return bisect_left(ends, position - self._shift, at)
+
+    def _replace(self, first: int, stop: int, ends: List[int], delta: int) -> None:
+        """Troca as posições de `first:stop` e desloca as seguintes em `delta`"""
+        old, at, shift = self._ends, self._shift_at, self._shift
+        # Acerta as posições entre o deslocamento pendente e a edição
+        if at < first:
+            old[at:first] = [end + shift for end in old[at:first]]
+        elif at > stop:
+            old[stop:at] = [end - shift for end in old[stop:at]]
+        old[first:stop] = ends
+        self._shift_at = first + len(ends)
+        self._shift = shift + delta
+
+    def edit(self, start: int, end: int, new_text: str) -> List:
+        """
+        Troca `text[start:end]` por `new_text` e devolve os comandos atualizados.
+        Em erro de sintaxe o texto fica editado e a próxima edição reanalisa
+        o arquivo inteiro.
+        """
+        if not 0 <= start <= end <= len(self.text):
+            raise ValueError(f"Edição fora do texto: {start}..{end}")
+        old_body = self._body
+        self.text = self.text[:start] + new_text + self.text[end:]
+        delta = len(new_text) - (end - start)
+
+        if old_body is None or start <= old_body[0] or end > old_body[1]:
+            self._parse_all()
+            return self.statements
+
+        body_end = old_body[1] + delta
+        count = len(self._ends)
+        # Um comando intacto de cada lado: a condição de um Cheddar ou o White
+        # de um Stilton logo antes da edição podem continuar nela, e os tokens
+        # das fronteiras continuam sendo lidos no mesmo estado do parser
+        first = max(self._find(start) - 1, 0)
+        last = self._find(end) + 1
+
+        while True:
+            region_start = self._end(first - 1) if first else old_body[0]
+            to_end = last >= count - 1
+            region_end = body_end if to_end else self._end(last) + delta
+            try:
+                trees, offset = _parse_statements(self.text[region_start:region_end], region_start)
+            except LarkError:
+                self._parse_all()
+                return self.statements
+
+            tail = trees[-1].children[0].data if trees and trees[-1].children else None
+            if _is_word(self.text[region_end - 1:region_end]) and _is_word(self.text[region_end:region_end + 1]):
+                if to_end:
+                    self._parse_all()
+                    return self.statements
+                last += 1
+            elif not to_end and tail == 'if_stmt':
+                last = count - 1
+            elif not to_end and tail == 'loop_stmt':
+                last += 1
+            else:
+                break
+
+        statements, new_ends = self._build(trees, offset)
+        stop = min(last, count - 1) + 1
+        self._replace(first, stop, new_ends, delta)
+        self.statements[first:stop] = statements
+        self._body = (old_body[0], body_end)
+        self.reparsed = len(statements)
+        return self.statements
+
+    def __repr__(self):
+        return f"Document({len(self.statements)} comandos, {len(self.text)} caracteres)"
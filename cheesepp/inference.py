@@ -0,0 +1,312 @@
+import operator
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from enum import Enum
+
+from .ast import *
+from .errors import CheeseTypeError, ERROR_MESSAGES
+from .ir import IRVisitor
+from .strings import StrBuilder, concat
+
+
+class CheeseType(Enum):
+    """Rótulos de tipo inferidos para as expressões do Cheese++"""
+    NUM = "num"  # int ou float
+    INT = "int"
+    FLOAT = "float"
+    STR = "str"
+    BOOL = "bool"
+    UNKNOWN = "unknown"
+
+
+CONCRETE_TYPES = (CheeseType.INT, CheeseType.FLOAT, CheeseType.STR, CheeseType.BOOL)
+NUMERIC_TYPES = (CheeseType.INT, CheeseType.FLOAT, CheeseType.NUM)
+
+ORDER_OPS = ('>', '<', '>=', '<=')
+EQUALITY_OPS = ('==', '!=')
+
+OPERATORS: Dict[str, Callable[[Any, Any], Any]] = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.truediv,
+    '==': operator.eq,
+    '!=': operator.ne,
+    '>': operator.gt,
+    '<': operator.lt,
+    '>=': operator.ge,
+    '<=': operator.le,
+}
+
+
+def type_of(value: Any) -> CheeseType:
+    """Rótulo de tipo de um valor já calculado pelo runtime"""
+    if isinstance(value, bool):
+        return CheeseType.BOOL
+    if isinstance(value, int):
+        return CheeseType.INT
+    if isinstance(value, float):
+        return CheeseType.FLOAT
+    if isinstance(value, (str, StrBuilder)):
+        return CheeseType.STR
+    return CheeseType.UNKNOWN
+
+
+def join(a: Optional[CheeseType], b: Optional[CheeseType]) -> Optional[CheeseType]:
+    """Junta dois rótulos vindos de caminhos diferentes do programa"""
+    if a is None:
+        return b
+    if b is None or a == b:
+        return a
+    if a in NUMERIC_TYPES and b in NUMERIC_TYPES:
+        return CheeseType.NUM
+    return CheeseType.UNKNOWN
+
+
+def _candidates(label: CheeseType):
+    """Tipos concretos que um rótulo pode representar em runtime"""
+    if label == CheeseType.UNKNOWN:
+        return CONCRETE_TYPES
+    if label == CheeseType.NUM:
+        return (CheeseType.INT, CheeseType.FLOAT)
+    return (label,)
+
+
+def _result_type(op: str, left: CheeseType, right: CheeseType) -> Optional[CheeseType]:
+    """
+    Tipo do resultado de `left op right` para rótulos concretos.
+    Retorna None quando a operação certamente falha no runtime.
+    """
+    numeric = (CheeseType.INT, CheeseType.FLOAT, CheeseType.BOOL)
+    if op in EQUALITY_OPS:
+        return CheeseType.BOOL
+    if op in ORDER_OPS:
+        if left in numeric and right in numeric:
+            return CheeseType.BOOL
+        if left == right == CheeseType.STR:
+            return CheeseType.BOOL
+        return None
+    if left in numeric and right in numeric:
+        # Inteiros só viram float na divisão ou ao encontrar um float
+        if op == '/' or CheeseType.FLOAT in (left, right):
+            return CheeseType.FLOAT
+        return CheeseType.INT
+    if op == '+' and left == right == CheeseType.STR:
+        return CheeseType.STR
+    # Python repete strings por inteiros e booleanos ('a' * 3), mas não por floats
+    if op == '*' and CheeseType.STR in (left, right):
+        other = right if left == CheeseType.STR else left
+        if other in (CheeseType.INT, CheeseType.BOOL):
+            return CheeseType.STR
+    return None
+
+
+def _combine(op: str, left: CheeseType, right: CheeseType) -> Tuple[Optional[CheeseType], bool]:
+    """
+    Junta os resultados de todas as combinações concretas dos operandos.
+    Retorna o rótulo do resultado (None se todas falham) e se alguma falha.
+    """
+    result = None
+    may_fail = False
+    for lt in _candidates(left):
+        for rt in _candidates(right):
+            outcome = _result_type(op, lt, rt)
+            if outcome is None:
+                may_fail = True
+            else:
+                result = join(result, outcome)
+    return result, may_fail
+
+
+def _guarded(op: str, fn: Callable[[Any, Any], Any]) -> Callable[[Any, Any], Any]:
+    """Cria um handler que traduz falhas de tipo do Python em CheeseTypeError"""
+    def handler(left, right):
+        try:
+            return fn(left, right)
+        except TypeError:
+            raise CheeseTypeError(ERROR_MESSAGES["invalid_operation"].format(
+                op=op, type1=type_of(left).value, type2=type_of(right).value))
+    return handler
+
+
+def _operator(op: str, left: CheeseType, right: CheeseType) -> Callable[[Any, Any], Any]:
+    """Função crua do operador; `+` entre strings acumula num StrBuilder"""
+    if op == '+' and (CheeseType.STR in _candidates(left) or CheeseType.STR in _candidates(right)):
+        return concat
+    return OPERATORS[op]
+
+
+# Handlers genéricos: usados quando algum operando tem tipo desconhecido
+GENERIC_HANDLERS = {op: _guarded(op, _operator(op, CheeseType.UNKNOWN, CheeseType.UNKNOWN))
+                    for op in OPERATORS}
+
+
+def select_handler(op: str, left: CheeseType, right: CheeseType) -> Callable[[Any, Any], Any]:
+    """
+    Escolhe o handler de um BinOp a partir dos rótulos dos operandos.
+    Quando nenhuma combinação possível falha não há guarda nenhuma.
+    """
+    result, may_fail = _combine(op, left, right)
+    if result is not None and not may_fail:
+        return _operator(op, left, right)
+    return GENERIC_HANDLERS[op]
+
+
+class TypeInfo:
+    """
+    Resultado da inferência: rótulos por nó, handlers escolhidos e conflitos.
+    `errors` são conflitos em comandos que certamente executam; os de
+    comandos dentro de Stilton e Cheddar, que podem nunca executar, ficam em
+    `warnings` e só falham (com CheeseTypeError) se forem alcançados.
+    """
+
+    def __init__(self):
+        self.types: Dict[Any, CheeseType] = {}
+        self.handlers: Dict[BinOp, Callable[[Any, Any], Any]] = {}
+        self.errors: List[CheeseTypeError] = []
+        self.warnings: List[CheeseTypeError] = []
+        self.env: Dict[str, CheeseType] = {}
+
+    def type_of(self, node) -> CheeseType:
+        """Rótulo inferido para um nó (UNKNOWN se nunca visitado)"""
+        return self.types.get(node, CheeseType.UNKNOWN)
+
+    def __repr__(self):
+        return (f"TypeInfo(nodes={len(self.types)}, errors={len(self.errors)}, "
+                f"warnings={len(self.warnings)})")
+
+
+# Rótulo das folhas constantes do IR
+_LEAF_TYPES: Dict[type, Callable[[Any], CheeseType]] = {
+    Number: lambda node: type_of(node.value),
+    String: lambda node: CheeseType.STR,
+}
+
+
+def _unknown(node) -> CheeseType:
+    return CheeseType.UNKNOWN
+
+
+class TypeInference(IRVisitor):
+    """
+    Inferência de tipos sensível ao fluxo para programas Cheese++.
+
+    Percorre os comandos na ordem de execução mantendo o tipo de cada
+    variável; junta os ramos de CheeseIf e itera CheeseLoop até o ponto fixo.
+    """
+
+    def __init__(self, initial: Optional[Dict[str, CheeseType]] = None,
+                 default: CheeseType = CheeseType.INT):
+        # Variáveis nunca atribuídas valem 0 no runtime
+        self.initial = dict(initial or {})
+        self.default = default
+        self.info = TypeInfo()
+        self._reported = set()
+        # Quantos Stilton e Cheddar envolvem o comando atual: acima de zero
+        # o comando pode não executar
+        self._conditional = 0
+
+    def infer(self, program) -> TypeInfo:
+        """Analisa o programa e devolve o TypeInfo"""
+        env = dict(self.initial)
+        self.visit_block(program, env)
+        self.info.env = env
+        return self.info
+
+    def visit_assign(self, node: CheeseAssign, env: Dict[str, CheeseType]) -> None:
+        env[node.name] = self.expression(node.value, env)
+
+    def visit_print(self, node: CheesePrint, env: Dict[str, CheeseType]) -> None:
+        self.expression(node.expr, env)
+
+    def visit_if(self, node: CheeseIf, env: Dict[str, CheeseType]) -> None:
+        self.expression(node.condition, env)
+        self._conditional += 1
+        then_env = dict(env)
+        self.visit_block(node.then_branch, then_env)
+        else_env = dict(env)
+        self.visit_block(node.else_branch, else_env)
+        self._conditional -= 1
+        self._merge_into(env, then_env, else_env)
+
+    def visit_loop(self, node: CheeseLoop, env: Dict[str, CheeseType]) -> None:
+        # A condição é testada antes de cada volta, então o corpo pode não rodar
+        entry = dict(env)
+        while True:
+            self.expression(node.condition, entry)
+            body_env = dict(entry)
+            self._conditional += 1
+            self.visit_block(node.body, body_env)
+            self._conditional -= 1
+            widened = dict(entry)
+            self._merge_into(widened, entry, body_env)
+            if widened == entry:
+                break
+            entry = widened
+        env.clear()
+        env.update(entry)
+
+    def visit_binop(self, node, env: Dict[str, CheeseType]) -> None:
+        # Expressão usada como comando
+        self.expression(node, env)
+
+    visit_number = visit_string = visit_var = visit_binop
+
+    def _merge_into(self, target, a, b) -> None:
+        for name in set(a) | set(b):
+            target[name] = join(a.get(name, self.default), b.get(name, self.default))
+
+    def expression(self, node, env: Dict[str, CheeseType]) -> CheeseType:
+        """Rótulo de uma expressão; percorre a árvore sem recursão"""
+        types = self.info.types
+        values: List[CheeseType] = []
+        stack: List[Tuple[Any, bool]] = [(node, False)]
+        while stack:
+            current, expanded = stack.pop()
+            kind = type(current)
+            if kind is BinOp:
+                if not expanded:
+                    stack.append((current, True))
+                    stack.append((current.right, False))
+                    stack.append((current.left, False))
+                    continue
+                right = values.pop()
+                left = values.pop()
+                result = self._binop(current, left, right)
+            elif kind is Var:
+                result = env.get(current.name, self.default)
+            else:
+                result = _LEAF_TYPES.get(kind, _unknown)(current)
+            types[current] = join(types.get(current), result)
+            values.append(result)
+        return values[-1]
+
+    def _binop(self, node: BinOp, left: CheeseType, right: CheeseType) -> CheeseType:
+        result, _ = _combine(node.op, left, right)
+
+        previous = self.info.handlers.get(node)
+        handler = select_handler(node.op, left, right)
+        if previous is not None and previous is not handler:
+            # O mesmo nó visto com tipos diferentes (ex.: iterações de um loop)
+            handler = GENERIC_HANDLERS[node.op]
+        self.info.handlers[node] = handler
+
+        if result is None:
+            self._report(node, left, right)
+            return CheeseType.UNKNOWN
+        return result
+
+    def _report(self, node: BinOp, left: CheeseType, right: CheeseType) -> None:
+        if node in self._reported:
+            return
+        self._reported.add(node)
+        found = self.info.warnings if self._conditional else self.info.errors
+        found.append(CheeseTypeError(
+            ERROR_MESSAGES["invalid_operation"].format(
+                op=node.op, type1=left.value, type2=right.value),
+            suggestions=["Verifique os tipos dos operandos"]))
+
+
+def infer_types(program, initial: Optional[Dict[str, CheeseType]] = None,
+                default: CheeseType = CheeseType.INT) -> TypeInfo:
+    """Roda a inferência de tipos sobre um programa já analisado sintaticamente"""
+    return TypeInference(initial, default).infer(program)
@@ -0,0 +1,295 @@
+"""
+IR único do Cheese++.
+
+As classes de ast.py são o IR: é o que o parser produz e o que todos os
+passes (otimizador, inferência de tipos, serialização) e engines (Runtime,
+BatchRuntime) consomem. Árvores montadas com node.py entram por `lower`.
+
+Os passes escolhem o método de cada nó por uma tabela classe → função
+montada uma vez por classe (`dispatch_table`), sem cadeias de isinstance
+nem accept(). Como o IR é fechado, a tabela usa a classe exata do nó.
+"""
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from .ast import *
+from .errors import CheeseSemanticError
+from .node import *
+from .transformer import ConstantPool
+
+# Sufixo dos métodos de cada classe do IR; `list` é um bloco de comandos e
+# None é o comando vazio (';' ou Brie)
+NODE_NAMES: Dict[type, str] = {
+    list: 'block',
+    type(None): 'empty',
+    CheeseAssign: 'assign',
+    CheesePrint: 'print',
+    CheeseIf: 'if',
+    CheeseLoop: 'loop',
+    Belgian: 'belgian',
+    BinOp: 'binop',
+    Number: 'number',
+    String: 'string',
+    Var: 'var',
+}
+
+EXPRESSIONS = (BinOp, Number, String, Var)
+
+
+def dispatch_table(owner: type, prefix: str,
+                   default: Optional[Callable] = None) -> Dict[type, Callable]:
+    """
+    Tabela classe do IR → função `owner.<prefix><nome>`. Classes sem método
+    ficam com `default` (ou de fora da tabela, se não houver default).
+    """
+    table = {}
+    for node_class, name in NODE_NAMES.items():
+        method = getattr(owner, prefix + name, None)
+        if method is None:
+            method = default
+        if method is not None:
+            table[node_class] = method
+    return table
+
+
+class IRVisitor:
+    """
+    Base dos passes sobre o IR.
+
+    Subclasses definem `visit_assign`, `visit_binop`, `visit_block`, ... (ver
+    NODE_NAMES) e `visit(node, *args)` chama o método da classe do nó pela
+    tabela montada na criação da subclasse. `walk` chama os métodos para
+    cada nó do programa, em pré-ordem e sem recursão.
+    """
+
+    _dispatch: Dict[type, Callable] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._dispatch = dispatch_table(cls, 'visit_', cls.generic_visit)
+
+    def visit(self, node, *args):
+        return self._dispatch.get(type(node), type(self).generic_visit)(self, node, *args)
+
+    def generic_visit(self, node, *args):
+        return None
+
+    def visit_block(self, statements, *args):
+        for stmt in statements:
+            self.visit(stmt, *args)
+
+    def walk(self, program) -> None:
+        """Visita cada ocorrência de comando e expressão; blocos não são visitados"""
+        dispatch = self._dispatch
+        generic = type(self).generic_visit
+        for node in iter_nodes(program):
+            dispatch.get(type(node), generic)(self, node)
+
+
+IRVisitor._dispatch = dispatch_table(IRVisitor, 'visit_', IRVisitor.generic_visit)
+
+
+# Filhos de cada classe do IR na ordem de execução: blocos e expressões
+_CHILDREN: Dict[type, Callable[[Any], tuple]] = {
+    CheeseAssign: lambda node: (node.value,),
+    CheesePrint: lambda node: (node.expr,),
+    CheeseIf: lambda node: (node.condition, node.then_branch, node.else_branch),
+    CheeseLoop: lambda node: (node.body, node.condition),
+    BinOp: lambda node: (node.left, node.right),
+}
+
+# Blocos aninhados de cada comando composto
+_BLOCKS: Dict[type, Callable[[Any], tuple]] = {
+    CheeseIf: lambda node: (node.then_branch, node.else_branch),
+    CheeseLoop: lambda node: (node.body,),
+}
+
+
+def iter_nodes(program) -> Iterator[Any]:
+    """
+    Gera todos os nós do programa em pré-ordem, uma vez por ocorrência
+    (uma expressão compartilhada aparece em cada lugar em que é usada).
+    """
+    stack = [program]
+    pop = stack.pop
+    push = stack.append
+    children = _CHILDREN
+    while stack:
+        node = pop()
+        kind = type(node)
+        if kind is BinOp:
+            # O caso mais comum, sem passar pela tabela
+            yield node
+            push(node.right)
+            push(node.left)
+        elif kind is list:
+            stack.extend(reversed(node))
+        else:
+            yield node
+            nested = children.get(kind)
+            if nested is not None:
+                stack.extend(reversed(nested(node)))
+
+
+def iter_statements(statements) -> Iterator[Any]:
+    """Gera os comandos de um bloco e dos blocos aninhados, em pré-ordem"""
+    blocks = _BLOCKS
+    stack = [iter(statements)]
+    while stack:
+        for stmt in stack[-1]:
+            yield stmt
+            nested = blocks.get(type(stmt))
+            if nested is not None:
+                stack.extend(iter(block) for block in reversed(nested(stmt)))
+                break
+        else:
+            stack.pop()
+
+
+# Operadores aceitos em node.py, por extenso ou em símbolo
+OPERATORS = {
+    '+': '+', '-': '-', '*': '*', '/': '/',
+    '==': '==', '!=': '!=', '>': '>', '<': '<', '>=': '>=', '<=': '<=',
+    'plus': '+', 'minus': '-', 'times': '*', 'divided': '/',
+    'equals': '==', 'not_equals': '!=', 'greater': '>', 'less': '<',
+    'greater_equals': '>=', 'less_equals': '<=', 'great': '>', 'minor': '<',
+}
+
+# Nomes de FunctionCallNode que viram Wensleydale
+PRINT_FUNCTIONS = ('Wensleydale', 'print')
+
+# Laços de node.py: 'while' repete enquanto a condição vale; os demais
+# seguem o Cheddar ... Coleraine e param quando ela passa a valer
+UNTIL_LOOPS = ('until', 'Cheddar...Coleraine', 'Cheddar')
+
+
+class _Lowering:
+    """Tradução de uma árvore de node.py para o IR, em pós-ordem"""
+
+    def __init__(self, pool: ConstantPool):
+        self.pool = pool
+
+    def _error(self, node: ASTNode, message: str) -> CheeseSemanticError:
+        position = node.position
+        return CheeseSemanticError(message, position.line if position else None,
+                                   position.column if position else None)
+
+    def _expr(self, node: ASTNode, value):
+        if type(value) not in EXPRESSIONS:
+            raise self._error(node, f"{type(node).__name__} precisa de uma expressão aqui")
+        return value
+
+    def _block(self, value) -> list:
+        return value if type(value) is list else [value]
+
+    def _statements(self, children: list) -> list:
+        # Blocos aninhados não criam escopo no Cheese++: entram no bloco pai
+        result = []
+        for child in children:
+            if type(child) is list:
+                result.extend(child)
+            else:
+                result.append(child)
+        return result
+
+    def lower_ProgramNode(self, node, children):
+        return self._statements(children)
+
+    lower_BlockNode = lower_ProgramNode
+
+    def lower_AssignmentNode(self, node, children):
+        return CheeseAssign(self.pool.name(node.variable), self._expr(node, children[0]))
+
+    def _operator(self, node, operator: str) -> str:
+        op = OPERATORS.get(operator)
+        if op is None:
+            raise self._error(node, f"Operador desconhecido: {operator}")
+        return op
+
+    def lower_BinaryOpNode(self, node, children):
+        op = self._operator(node, node.operator)
+        return self.pool.binop(self._expr(node, children[0]), op, self._expr(node, children[1]))
+
+    def _not(self, operand):
+        """
+        `not operand` com a verdade do runtime: 0 e a string vazia são falsos.
+        O IR não tem operador unário, então vira `(x == 0) != (x == "")`, que
+        vale `not bool(x)` para números, booleanos e strings.
+        """
+        pool = self.pool
+        return pool.binop(pool.binop(operand, '==', pool.number(0)), '!=',
+                          pool.binop(operand, '==', pool.string('')))
+
+    def lower_UnaryOpNode(self, node, children):
+        operand = self._expr(node, children[0])
+        if node.operator in ('-', 'minus'):
+            return self.pool.binop(self.pool.number(0), '-', operand)
+        if node.operator in ('+', 'plus'):
+            return operand
+        if node.operator in ('not', '!'):
+            return self._not(operand)
+        raise self._error(node, f"Operador unário desconhecido: {node.operator}")
+
+    def lower_VariableNode(self, node, children):
+        return self.pool.var(self.pool.name(node.name))
+
+    def lower_LiteralNode(self, node, children):
+        value = node.value
+        if type(value) is bool:
+            return self.pool.number(int(value))
+        if type(value) in (int, float):
+            return self.pool.number(value)
+        if type(value) is str:
+            return self.pool.string(value)
+        raise self._error(node, f"Literal sem equivalente no Cheese++: {value!r}")
+
+    def lower_FunctionCallNode(self, node, children):
+        if node.name in PRINT_FUNCTIONS and len(children) == 1:
+            return CheesePrint(self._expr(node, children[0]))
+        raise self._error(node, f"Função desconhecida: {node.name}")
+
+    def lower_ConditionalNode(self, node, children):
+        condition = self._expr(node, children[0])
+        else_branch = self._block(children[2]) if len(children) > 2 else []
+        return CheeseIf(condition, self._block(children[1]), else_branch)
+
+    def lower_LoopNode(self, node, children):
+        body, condition = self._block(children[0]), self._expr(node, children[1])
+        if node.loop_type == 'while':
+            condition = self._not(condition)
+        elif node.loop_type not in UNTIL_LOOPS:
+            raise self._error(node, f"Tipo de laço desconhecido: {node.loop_type}")
+        return CheeseLoop(body, condition)
+
+    def lower_PrintNode(self, node, children):
+        return CheesePrint(self._expr(node, children[0]))
+
+    def lower_DebugNode(self, node, children):
+        return Belgian()
+
+
+_LOWER: Dict[type, Callable] = {
+    node_class: getattr(_Lowering, 'lower_' + node_class.__name__)
+    for node_class in (ProgramNode, BlockNode, AssignmentNode, BinaryOpNode, UnaryOpNode,
+                       VariableNode, LiteralNode, FunctionCallNode, ConditionalNode,
+                       LoopNode, PrintNode, DebugNode)
+}
+
+
+def lower(tree: ASTNode, pool: Optional[ConstantPool] = None):
+    """
+    Traduz uma árvore de node.py para o IR. Um ProgramNode ou BlockNode vira
+    uma lista de comandos; as expressões passam pelo `pool`, então saem
+    compartilhadas como as do parser.
+
+    Levanta:
+        CheeseSemanticError: Para nós sem equivalente no Cheese++
+    """
+    lowering = _Lowering(pool if pool is not None else ConstantPool())
+    lowered: Dict[int, Any] = {}
+    for node in ASTTraverser.iter_postorder(tree):
+        method = _LOWER.get(type(node))
+        if method is None:
+            raise lowering._error(node, f"Nó sem equivalente no IR: {type(node).__name__}")
+        children = [lowered.pop(id(child)) for child in node.children]
+        lowered[id(node)] = method(lowering, node, children)
+    return lowered[id(tree)]
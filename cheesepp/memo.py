@@ -0,0 +1,234 @@
+"""
+Cache de resultados de programas puros.
+
+Um programa sem Belgian imprime e atribui sempre a mesma coisa para as
+mesmas entradas, então a saída, o ambiente final e o valor de uma execução
+podem ser guardados e devolvidos sem executar de novo. A chave junta o hash
+da AST normalizada (Program.fingerprint) e as entradas em JSON canônico.
+
+Não entram no cache:
+
+- programas impuros (Program.pure falso);
+- entradas que não viram JSON;
+- execuções que falham, inclusive por limite de tempo ou de memória.
+
+Um resultado guardado só atende pedidos cujo limite de tempo cobre o tempo
+da execução original; com limite menor, o programa roda de novo e falha
+como falharia sem o cache.
+
+Os resultados ficam num MemoryStore (LRU em memória) ou num FileStore (um
+arquivo JSON por chave num diretório local, que vários processos podem
+compartilhar). Os dois aceitam tamanho máximo e validade (TTL) em segundos.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from .program import Program, RunResult
+
+DEFAULT_CACHE_SIZE = 1024
+RESULT_VERSION = 1
+
+
+def cache_key(program: Program, inputs: Optional[Dict[str, Any]] = None) -> Optional[str]:
+    """Chave do resultado, ou None se a execução não pode ir para o cache"""
+    if not program.pure:
+        return None
+    try:
+        encoded = json.dumps(inputs or {}, sort_keys=True, separators=(',', ':'))
+    except (TypeError, ValueError):
+        return None
+    return hashlib.sha256(f"{program.fingerprint}\0{encoded}".encode('utf-8')).hexdigest()
+
+
+@dataclass
+class CachedResult:
+    """Resultado guardado e quanto tempo a execução original levou"""
+    output: List[str]
+    env: Dict[str, Any]
+    value: Any
+    seconds: float
+
+    def result(self) -> RunResult:
+        """Cópia como RunResult: quem recebe pode alterar sem mexer no cache"""
+        return RunResult(list(self.output), dict(self.env), self.value)
+
+
+class MemoryStore:
+    """LRU em memória; `ttl` em segundos, None para não expirar"""
+
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE, ttl: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedResult]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            stored, entry = item
+            if self.ttl is not None and time.monotonic() - stored > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, entry: CachedResult) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), entry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class FileStore:
+    """
+    Um arquivo `<chave>.json` por resultado em `directory`. A gravação é
+    atômica (arquivo temporário + rename), então processos que dividem o
+    diretório nunca leem um resultado pela metade. Uma leitura atualiza a
+    data de modificação, que serve de ordem LRU; ao passar de `max_size`
+    arquivos, os mais antigos saem até sobrar 90% do limite.
+    """
+
+    SUFFIX = '.json'
+
+    def __init__(self, directory: str, max_size: int = DEFAULT_CACHE_SIZE,
+                 ttl: Optional[float] = None):
+        self.directory = directory
+        self.max_size = max_size
+        self.ttl = ttl
+        os.makedirs(directory, exist_ok=True)
+        self._count = len(self._files())
+
+    def _files(self) -> List[str]:
+        return [name for name in os.listdir(self.directory) if name.endswith(self.SUFFIX)]
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    def get(self, key: str) -> Optional[CachedResult]:
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = json.loads(f.read())
+        except (OSError, ValueError):
+            return None
+        if data.get('version') != RESULT_VERSION or (
+                self.ttl is not None and time.time() - data['created'] > self.ttl):
+            self._remove(path)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return CachedResult(data['output'], data['env'], data['value'], data['seconds'])
+
+    def put(self, key: str, entry: CachedResult) -> None:
+        data = {
+            'version': RESULT_VERSION,
+            'created': time.time(),
+            'output': entry.output,
+            'env': entry.env,
+            'value': entry.value,
+            'seconds': entry.seconds,
+        }
+        try:
+            raw = json.dumps(data, separators=(',', ':')).encode('utf-8')
+        except (TypeError, ValueError):
+            # Valores que não viram JSON ficam fora do cache em disco
+            return
+        path = self._path(key)
+        temp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp, 'wb') as f:
+            f.write(raw)
+        os.replace(temp, path)
+        self._count += 1
+        if self._count > self.max_size:
+            self._trim()
+
+    def _trim(self) -> None:
+        entries = []
+        for name in self._files():
+            path = os.path.join(self.directory, name)
+            try:
+                entries.append((os.stat(path).st_mtime, path))
+            except OSError:
+                pass
+        entries.sort()
+        keep = int(self.max_size * 0.9)
+        for _, path in entries[:max(len(entries) - keep, 0)]:
+            self._remove(path)
+        self._count = min(len(entries), keep)
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def clear(self) -> None:
+        for name in self._files():
+            self._remove(os.path.join(self.directory, name))
+        self._count = 0
+
+    def __len__(self):
+        return len(self._files())
+
+
+class ResultCache:
+    """
+    Executa Programs reaproveitando resultados de execuções anteriores.
+
+    Sem `store`, usa um FileStore em `path` ou, sem `path`, um MemoryStore.
+    """
+
+    def __init__(self, store=None, max_size: int = DEFAULT_CACHE_SIZE,
+                 ttl: Optional[float] = None, path: Optional[str] = None):
+        if store is None:
+            store = FileStore(path, max_size, ttl) if path else MemoryStore(max_size, ttl)
+        self.store = store
+        # Execuções atendidas pelo cache, executadas e guardadas, e executadas
+        # sem poder entrar no cache (programa impuro ou entradas fora do JSON)
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+
+    def run(self, program: Program, inputs: Optional[Dict[str, Any]] = None,
+            time_limit: Optional[float] = None) -> RunResult:
+        """Mesmo contrato de Program.run"""
+        key = cache_key(program, inputs)
+        if key is None:
+            self.skipped += 1
+            return program.run(inputs, time_limit=time_limit)
+        entry = self.store.get(key)
+        if entry is not None and (time_limit is None or entry.seconds <= time_limit):
+            self.hits += 1
+            return entry.result()
+        start = time.perf_counter()
+        result = program.run(inputs, time_limit=time_limit)
+        seconds = time.perf_counter() - start
+        self.misses += 1
+        self.store.put(key, CachedResult(list(result.output), dict(result.env),
+                                         result.value, seconds))
+        return result
+
+    def clear(self) -> None:
+        self.store.clear()
+
+    def __repr__(self):
+        return f"ResultCache(hits={self.hits}, misses={self.misses}, skipped={self.skipped})"
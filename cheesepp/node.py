@@ -1,5 +1,7 @@
+import copy as pycopy
 from abc import ABC, abstractmethod
-from typing import Any, List, Optional, Dict, Union
+from collections import deque
+from typing import Any, Iterator, List, Optional, Dict, Union
 from dataclasses import dataclass
 from enum import Enum
 
@@ -30,6 +32,65 @@ class Position:
         return f"({self.line}:{self.column})"
 
 
+class NodeIndex:
+    """
+    Nós de uma árvore agrupados por NodeType.
+
+    Todos os nós da mesma árvore apontam para o mesmo índice. Ao ligar duas
+    árvores, os nós do índice menor passam para o maior, então montar uma
+    árvore de n nós custa O(n log n) no total.
+    """
+
+    def __init__(self):
+        # Dicionários como conjuntos: inserção e remoção O(1)
+        self.by_type: Dict[NodeType, Dict['ASTNode', None]] = {}
+        self.size = 0
+        # Posição de cada nó na pré-ordem da árvore; refeita na primeira
+        # busca depois de uma mudança
+        self._order: Optional[Dict['ASTNode', int]] = None
+
+    def add(self, node: 'ASTNode') -> None:
+        nodes = self.by_type.get(node._node_type)
+        if nodes is None:
+            nodes = self.by_type[node._node_type] = {}
+        nodes[node] = None
+        node._index = self
+        self.size += 1
+        self._order = None
+
+    def discard(self, node: 'ASTNode') -> None:
+        nodes = self.by_type.get(node._node_type)
+        if nodes is not None and node in nodes:
+            del nodes[node]
+            self.size -= 1
+            self._order = None
+
+    def retype(self, node: 'ASTNode', old: NodeType, new: NodeType) -> None:
+        nodes = self.by_type.get(old)
+        if nodes is not None:
+            nodes.pop(node, None)
+        self.by_type.setdefault(new, {})[node] = None
+
+    def nodes(self) -> Iterator['ASTNode']:
+        for nodes in self.by_type.values():
+            yield from nodes
+
+    def find(self, node_type: NodeType) -> List['ASTNode']:
+        """Nós do tipo, na ordem em que entraram no índice"""
+        return list(self.by_type.get(node_type, ()))
+
+    def find_in_preorder(self, root: 'ASTNode', node_type: NodeType) -> List['ASTNode']:
+        """Nós do tipo em pré-ordem a partir de `root`, a raiz da árvore"""
+        nodes = self.by_type.get(node_type)
+        if not nodes:
+            return []
+        order = self._order
+        if order is None:
+            order = self._order = {node: position for position, node
+                                   in enumerate(ASTTraverser.iter_preorder(root))}
+        return sorted(nodes, key=order.__getitem__)
+
+
 class ASTNode(ABC):
     """
     Classe base abstrata para todos os nós AST.
@@ -39,28 +100,102 @@ class ASTNode(ABC):
     """
     
     def __init__(self, node_type: NodeType, position: Optional[Position] = None):
+        # Índice por tipo da árvore do nó; criado só quando ele ganha um filho
+        self._index: Optional[NodeIndex] = None
         self.node_type = node_type
         self.position = position
         self.parent: Optional['ASTNode'] = None
         self.children: List['ASTNode'] = []
+
+    @property
+    def node_type(self) -> NodeType:
+        return self._node_type
+
+    @node_type.setter
+    def node_type(self, node_type: NodeType) -> None:
+        # As subclasses trocam o tipo depois do __init__ da base
+        if self._index is not None:
+            self._index.retype(self, self._node_type, node_type)
+        self._node_type = node_type
     
     @abstractmethod
     def accept(self, visitor):
         """Aceita um visitante para o padrão de visitante"""
         pass
-    
+
+    def _tree_index(self) -> NodeIndex:
+        if self._index is None:
+            NodeIndex().add(self)
+        return self._index
+    
+    def _adopt(self, child: Optional['ASTNode']) -> Optional['ASTNode']:
+        """
+        Filho recebido pelo construtor: uma cópia se ele já está em outra
+        árvore, então `BinaryOpNode(x, '+', x)` fica com os dois operandos.
+        """
+        if child and child.parent is not None:
+            child = child.copy()
+        self.add_child(child)
+        return child
+
     def add_child(self, child: 'ASTNode') -> None:
-        """Adiciona um nó filho ao nó atual."""
+        """
+        Adiciona um nó filho ao nó atual. Um nó tem um único pai: se o filho
+        já está em outro nó, ele sai de lá (os dois índices acompanham).
+        """
         if child:
+            if child.parent is not None:
+                child.parent.remove_child(child)
             child.parent = self
             self.children.append(child)
+
+            index = self._index
+            other = child._index
+            if index is None and other is not None:
+                # Nó ainda sem índice entra no índice da subárvore do filho
+                other.add(self)
+            elif other is None:
+                self._tree_index().add(child)
+            elif other is not index:
+                # O índice menor entra no maior
+                if other.size > index.size:
+                    index, other = other, index
+                for node in list(other.nodes()):
+                    index.add(node)
     
     def remove_child(self, child: 'ASTNode') -> None:
         """Remove um nó filho do nó atual."""
         if child in self.children:
             child.parent = None
             self.children.remove(child)
-    
+
+            # A subárvore removida passa a ter um índice só seu
+            index = self._index
+            subtree = NodeIndex()
+            for node in ASTTraverser.iter_preorder(child):
+                if index is not None:
+                    index.discard(node)
+                subtree.add(node)
+    
+    def copy(self) -> 'ASTNode':
+        """Cópia da subárvore do nó, sem pai, com um índice só seu"""
+        copies: Dict[int, ASTNode] = {}
+        for node in ASTTraverser.iter_postorder(self):
+            clone = pycopy.copy(node)
+            clone._index = None
+            clone.parent = None
+            clone.children = []
+            # Atributos que apontam para filhos (left, body, statements...)
+            for name, value in list(vars(clone).items()):
+                if isinstance(value, ASTNode) and id(value) in copies:
+                    setattr(clone, name, copies[id(value)])
+                elif type(value) is list:
+                    setattr(clone, name, [copies.get(id(item), item) for item in value])
+            for child in node.children:
+                clone.add_child(copies.pop(id(child)))
+            copies[id(node)] = clone
+        return copies[id(self)]
+
     def get_children(self) -> List['ASTNode']:
         """Pega uma cópia da lista de nós filhos."""
         return self.children.copy()
@@ -74,9 +209,7 @@ class ProgramNode(ASTNode):
     
     def __init__(self, statements: List[ASTNode], position: Optional[Position] = None):
         super().__init__(NodeType.PROGRAM, position)
-        self.statements = statements
-        for stmt in statements:
-            self.add_child(stmt)
+        self.statements = [self._adopt(stmt) for stmt in statements]
     
     def accept(self, visitor):
         return visitor.visit_program(self)
@@ -102,9 +235,7 @@ class BlockNode(StatementNode):
     def __init__(self, statements: List[StatementNode], position: Optional[Position] = None):
         super().__init__(position)
         self.node_type = NodeType.BLOCK
-        self.statements = statements
-        for stmt in statements:
-            self.add_child(stmt)
+        self.statements = [self._adopt(stmt) for stmt in statements]
     
     def accept(self, visitor):
         return visitor.visit_block(self)
@@ -118,9 +249,8 @@ class AssignmentNode(StatementNode):
         super().__init__(position)
         self.node_type = NodeType.ASSIGNMENT
         self.variable = variable
-        self.value = value
+        self.value = self._adopt(value)
         self.assignment_type = assignment_type  # "=", "Cheddar...Coleraine", etc.
-        self.add_child(value)
     
     def accept(self, visitor):
         return visitor.visit_assignment(self)
@@ -133,11 +263,9 @@ class BinaryOpNode(ExpressionNode):
                  position: Optional[Position] = None):
         super().__init__(position)
         self.node_type = NodeType.BINARY_OP
-        self.left = left
+        self.left = self._adopt(left)
         self.operator = operator
-        self.right = right
-        self.add_child(left)
-        self.add_child(right)
+        self.right = self._adopt(right)
     
     def accept(self, visitor):
         return visitor.visit_binary_op(self)
@@ -151,8 +279,7 @@ class UnaryOpNode(ExpressionNode):
         super().__init__(position)
         self.node_type = NodeType.UNARY_OP
         self.operator = operator
-        self.operand = operand
-        self.add_child(operand)
+        self.operand = self._adopt(operand)
     
     def accept(self, visitor):
         return visitor.visit_unary_op(self)
@@ -191,9 +318,7 @@ class FunctionCallNode(ExpressionNode):
         super().__init__(position)
         self.node_type = NodeType.FUNCTION_CALL
         self.name = name
-        self.arguments = arguments
-        for arg in arguments:
-            self.add_child(arg)
+        self.arguments = [self._adopt(arg) for arg in arguments]
     
     def accept(self, visitor):
         return visitor.visit_function_call(self)
@@ -207,14 +332,9 @@ class ConditionalNode(StatementNode):
                  position: Optional[Position] = None):
         super().__init__(position)
         self.node_type = NodeType.CONDITIONAL
-        self.condition = condition
-        self.then_branch = then_branch
-        self.else_branch = else_branch
-        
-        self.add_child(condition)
-        self.add_child(then_branch)
-        if else_branch:
-            self.add_child(else_branch)
+        self.condition = self._adopt(condition)
+        self.then_branch = self._adopt(then_branch)
+        self.else_branch = self._adopt(else_branch)
     
     def accept(self, visitor):
         return visitor.visit_conditional(self)
@@ -227,12 +347,9 @@ class LoopNode(StatementNode):
                  loop_type: str = "while", position: Optional[Position] = None):
         super().__init__(position)
         self.node_type = NodeType.LOOP
-        self.body = body
-        self.condition = condition
+        self.body = self._adopt(body)
+        self.condition = self._adopt(condition)
         self.loop_type = loop_type 
-        
-        self.add_child(body)
-        self.add_child(condition)
     
     def accept(self, visitor):
         return visitor.visit_loop(self)
@@ -243,8 +360,7 @@ class PrintNode(StatementNode):
     
     def __init__(self, expression: ExpressionNode, position: Optional[Position] = None):
         super().__init__(position)
-        self.expression = expression
-        self.add_child(expression)
+        self.expression = self._adopt(expression)
     
     def accept(self, visitor):
         return visitor.visit_print(self)
@@ -320,43 +436,79 @@ class ASTTraverser:
     """
     Classe utilitária para percorrer nós AST.
     
-    Fornece métodos para diferentes estratégias de passagem.
+    Fornece métodos para diferentes estratégias de passagem. Os percursos
+    usam pilhas explícitas ou uma deque, então árvores profundas não
+    esbarram no limite de recursão do Python.
     """
+
+    @staticmethod
+    def iter_preorder(node: ASTNode) -> Iterator[ASTNode]:
+        """Gera os nós em pré-ordem (pai antes dos filhos)"""
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            yield current
+            stack.extend(reversed(current.children))
+
+    @staticmethod
+    def iter_postorder(node: ASTNode) -> Iterator[ASTNode]:
+        """Gera os nós em pós-ordem (filhos antes do pai)"""
+        stack = [(node, False)]
+        while stack:
+            current, expanded = stack.pop()
+            if expanded or not current.children:
+                yield current
+            else:
+                stack.append((current, True))
+                stack.extend((child, False) for child in reversed(current.children))
+
+    @staticmethod
+    def iter_breadth_first(node: ASTNode) -> Iterator[ASTNode]:
+        """Gera os nós em largura, nível por nível"""
+        queue = deque([node])
+        while queue:
+            current = queue.popleft()
+            yield current
+            queue.extend(current.children)
     
     @staticmethod
     def depth_first_search(node: ASTNode, visitor: NodeVisitor):
         """Performa uma busca em profundidade no AST"""
-        node.accept(visitor)
-        for child in node.children:
-            ASTTraverser.depth_first_search(child, visitor)
+        for current in ASTTraverser.iter_preorder(node):
+            current.accept(visitor)
     
     @staticmethod
     def breadth_first_search(node: ASTNode, visitor: NodeVisitor):
         """Performa uma busca em largura no AST"""
-        queue = [node]
-        while queue:
-            current = queue.pop(0)
+        for current in ASTTraverser.iter_breadth_first(node):
             current.accept(visitor)
-            queue.extend(current.children)
     
     @staticmethod
     def find_nodes_by_type(node: ASTNode, node_type: NodeType) -> List[ASTNode]:
-        """Encontra todos os nós de um tipo específico no AST"""
-        result = []
-        
-        def collector(n):
-            if n.node_type == node_type:
-                result.append(n)
-        
-        ASTTraverser._traverse_with_function(node, collector)
-        return result
+        """
+        Encontra todos os nós de um tipo específico no AST, em pré-ordem.
+        Na raiz da árvore a resposta vem do índice por tipo, ordenada pela
+        pré-ordem guardada no índice (percorrida de novo só depois de mudanças).
+        """
+        if node.parent is None:
+            return node._tree_index().find_in_preorder(node, node_type)
+        return [n for n in ASTTraverser.iter_preorder(node) if n.node_type == node_type]
+
+    @staticmethod
+    def find_nodes_by_type_unordered(node: ASTNode, node_type: NodeType) -> List[ASTNode]:
+        """
+        Como find_nodes_by_type, sem garantia de ordem: na raiz, O(k) para
+        k nós encontrados, direto do índice por tipo.
+        """
+        if node.parent is None:
+            return node._tree_index().find(node_type)
+        return ASTTraverser.find_nodes_by_type(node, node_type)
     
     @staticmethod
     def _traverse_with_function(node: ASTNode, func):
         """Ajuda a percorrer o AST com uma função personalizada"""
-        func(node)
-        for child in node.children:
-            ASTTraverser._traverse_with_function(child, func)
+        for current in ASTTraverser.iter_preorder(node):
+            func(current)
 
 
 class ASTBuilder:
@@ -413,28 +565,28 @@ class ASTBuilder:
 
 def ast_to_dict(node: ASTNode) -> Dict[str, Any]:
     """Converte o nó AST em uma representação de dicionário"""
-    result = {
-        'type': node.node_type.value,
-        'class': node.__class__.__name__,
-        'position': str(node.position) if node.position else None,
-        'children': []
-    }
-    
-    
-    if hasattr(node, 'value'):
-        result['value'] = node.value
-    if hasattr(node, 'name'):
-        result['name'] = node.name
-    if hasattr(node, 'operator'):
-        result['operator'] = node.operator
-    if hasattr(node, 'variable'):
-        result['variable'] = node.variable
-    
-
-    for child in node.children:
-        result['children'].append(ast_to_dict(child))
-    
-    return result
+    converted: Dict[int, Dict[str, Any]] = {}
+    # Pós-ordem: os filhos já estão convertidos quando o pai é visitado
+    for current in ASTTraverser.iter_postorder(node):
+        result = {
+            'type': current.node_type.value,
+            'class': current.__class__.__name__,
+            'position': str(current.position) if current.position else None,
+            'children': [converted.pop(id(child)) for child in current.children]
+        }
+        
+        if hasattr(current, 'value'):
+            result['value'] = current.value
+        if hasattr(current, 'name'):
+            result['name'] = current.name
+        if hasattr(current, 'operator'):
+            result['operator'] = current.operator
+        if hasattr(current, 'variable'):
+            result['variable'] = current.variable
+
+        converted[id(current)] = result
+    
+    return converted[id(node)]
 
 
 def dict_to_ast(data: Dict[str, Any]) -> ASTNode:
@@ -0,0 +1,300 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from .ast import *
+from .ir import dispatch_table, iter_statements
+
+# Temporários criados pelo otimizador; NAME do Cheese++ nunca começa com '$'
+HIDDEN_PREFIX = '$'
+
+# Expressões que dependem de mais variáveis que isso não são reaproveitadas
+MAX_INPUTS = 32
+
+
+def is_hidden(name: str) -> bool:
+    """Indica se a variável é um temporário interno do otimizador"""
+    return name.startswith(HIDDEN_PREFIX)
+
+
+@dataclass
+class CSEStats:
+    """Resumo da eliminação de subexpressões comuns"""
+    temporaries: int = 0
+    # Avaliações de BinOp removidas por execução de cada comando reescrito
+    eliminated: int = 0
+    # Avaliações de BinOp poupadas a cada avaliação de uma expressão do
+    # programa reescrito, por nó (ver Runtime.cse_savings)
+    savings: Dict[Any, int] = field(default_factory=dict)
+
+
+class _Instance:
+    """Uma subexpressão disponível desde a sua primeira ocorrência"""
+    __slots__ = ('expr', 'first', 'scope', 'versions', 'uses', 'temp')
+
+    def __init__(self, expr, first, scope, versions):
+        self.expr = expr
+        self.first = first
+        self.scope = scope
+        self.versions = versions
+        self.uses: List[Tuple[int, int]] = []
+        self.temp: Optional[str] = None
+
+
+class CommonSubexpressionEliminator:
+    """
+    Elimina subexpressões BinOp repetidas guardando-as em temporários.
+
+    Como os nós são compartilhados (hash-consing), duas ocorrências da mesma
+    subexpressão são o mesmo objeto. A primeira ocorrência é calculada num
+    temporário inserido antes do seu comando e as seguintes passam a ler o
+    temporário, enquanto nenhuma variável de entrada for reatribuída. Cada
+    variável tem uma versão, incrementada a cada atribuição; uma ocorrência
+    só reaproveita o temporário se as versões das entradas não mudaram e se
+    o bloco da primeira ocorrência ainda está aberto. Ramos de Stilton e
+    corpos de Cheddar invalidam, ao terminar, tudo o que atribuem; um corpo
+    de Cheddar invalida antes de começar, já que roda várias vezes.
+    """
+
+    def __init__(self):
+        self.stats = CSEStats()
+        self._inputs: Dict[Any, Optional[FrozenSet[str]]] = {}
+        self._sizes: Dict[Any, int] = {}
+        self._assigned: Dict[int, FrozenSet[str]] = {}
+        self._versions: Dict[str, int] = {}
+        self._available: Dict[Any, _Instance] = {}
+        self._active = set()
+        self._instances: List[_Instance] = []
+        self._used: Dict[Tuple[int, int], Dict[Any, Var]] = {}
+        self._defined: Dict[Tuple[int, int], List[_Instance]] = {}
+        self._saved: Dict[Tuple[int, int], int] = {}
+
+    def optimize(self, program) -> list:
+        """Devolve um novo programa; o original não é alterado"""
+        self._analyze_block(program)
+        self._choose()
+        return self._rewrite_block(program)
+
+    # Análise
+
+    def _analyze_block(self, statements) -> None:
+        block = id(statements)
+        self._active.add(block)
+        analyze = _ANALYZE
+        for index, stmt in enumerate(statements):
+            step = analyze.get(type(stmt))
+            if step is not None:
+                step(self, stmt, (block, index), block)
+        self._active.discard(block)
+
+    def _analyze_assign(self, stmt, key, block) -> None:
+        self._scan(key, stmt.value, block)
+        self._kill((stmt.name,))
+
+    def _analyze_print(self, stmt, key, block) -> None:
+        self._scan(key, stmt.expr, block)
+
+    def _analyze_if(self, stmt, key, block) -> None:
+        self._scan(key, stmt.condition, block)
+        self._analyze_block(stmt.then_branch)
+        self._analyze_block(stmt.else_branch)
+        self._kill(self._assigned_in(stmt.then_branch) | self._assigned_in(stmt.else_branch))
+
+    def _analyze_loop(self, stmt, key, block) -> None:
+        # O corpo roda várias vezes: o que ele atribui não vale nem na condição
+        self._kill(self._assigned_in(stmt.body))
+        self._scan(key, stmt.condition, None)
+        self._analyze_block(stmt.body)
+
+    def _analyze_binop(self, stmt, key, block) -> None:
+        # Expressão usada como comando
+        self._scan(key, stmt, block)
+
+    _analyze_number = _analyze_string = _analyze_var = _analyze_binop
+
+    def _scan(self, key, expr, block) -> None:
+        """Registra as ocorrências de uma expressão; sem `block`, só reaproveita"""
+        stack = [expr]
+        while stack:
+            node = stack.pop()
+            if type(node) is not BinOp:
+                continue
+            instance = self._available.get(node)
+            if instance is not None and self._valid(instance):
+                # Reaproveitada: os filhos também não são recalculados
+                instance.uses.append(key)
+                continue
+            inputs = self._inputs_of(node)
+            if block is not None and inputs is not None:
+                versions = tuple((name, self._versions.get(name, 0)) for name in inputs)
+                instance = _Instance(node, key, block, versions)
+                self._available[node] = instance
+                self._instances.append(instance)
+            stack.append(node.right)
+            stack.append(node.left)
+
+    def _valid(self, instance: _Instance) -> bool:
+        if instance.scope not in self._active:
+            return False
+        versions = self._versions
+        for name, version in instance.versions:
+            if versions.get(name, 0) != version:
+                return False
+        return True
+
+    def _kill(self, names) -> None:
+        for name in names:
+            self._versions[name] = self._versions.get(name, 0) + 1
+
+    def _assigned_in(self, statements) -> FrozenSet[str]:
+        """Variáveis atribuídas em qualquer ponto de um bloco"""
+        cached = self._assigned.get(id(statements))
+        if cached is not None:
+            return cached
+        names = set(stmt.name for stmt in iter_statements(statements) if type(stmt) is CheeseAssign)
+        result = self._assigned[id(statements)] = frozenset(names)
+        return result
+
+    def _inputs_of(self, expr) -> Optional[FrozenSet[str]]:
+        """Variáveis lidas pela expressão (None se forem muitas)"""
+        if expr in self._inputs:
+            return self._inputs[expr]
+        stack = [(expr, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if node in self._inputs:
+                continue
+            kind = type(node)
+            if kind is BinOp:
+                if not expanded:
+                    stack.append((node, True))
+                    stack.append((node.right, False))
+                    stack.append((node.left, False))
+                    continue
+                left = self._inputs[node.left]
+                right = self._inputs[node.right]
+                if left is None or right is None:
+                    inputs = None
+                else:
+                    inputs = left | right
+                    if len(inputs) > MAX_INPUTS:
+                        inputs = None
+                self._inputs[node] = inputs
+                self._sizes[node] = self._sizes.get(node.left, 0) + self._sizes.get(node.right, 0) + 1
+            elif kind is Var:
+                self._inputs[node] = frozenset((node.name,))
+            else:
+                self._inputs[node] = frozenset()
+        return self._inputs[expr]
+
+    def _choose(self) -> None:
+        """Cria temporários só quando compensam o custo da atribuição extra"""
+        for instance in self._instances:
+            saved = len(instance.uses) * self._sizes[instance.expr]
+            if saved < 2:
+                continue
+            instance.temp = f"{HIDDEN_PREFIX}cse{self.stats.temporaries}"
+            self.stats.temporaries += 1
+            self.stats.eliminated += saved
+            self._defined.setdefault(instance.first, []).append(instance)
+            for key in instance.uses:
+                self._saved[key] = self._saved.get(key, 0) + self._sizes[instance.expr]
+            var = Var(instance.temp)
+            for key in [instance.first] + instance.uses:
+                self._used.setdefault(key, {})[instance.expr] = var
+
+    # Reescrita
+
+    def _rewrite_block(self, statements) -> list:
+        block = id(statements)
+        result = []
+        for index, stmt in enumerate(statements):
+            key = (block, index)
+            used = self._used.get(key)
+            defined = self._defined.get(key)
+            if defined:
+                # Menores primeiro: um temporário pode usar outro
+                for instance in sorted(defined, key=lambda i: self._sizes[i.expr]):
+                    others = {expr: var for expr, var in used.items() if expr is not instance.expr}
+                    result.append(CheeseAssign(instance.temp, self._substitute(instance.expr, others)))
+
+            rewrite = _REWRITE.get(type(stmt))
+            if rewrite is not None:
+                stmt = rewrite(self, stmt, key, used)
+            result.append(stmt)
+        return result
+
+    def _rewrite_assign(self, stmt, key, used):
+        return CheeseAssign(stmt.name, self._expression(stmt.value, key, used))
+
+    def _rewrite_print(self, stmt, key, used):
+        return CheesePrint(self._expression(stmt.expr, key, used))
+
+    def _rewrite_if(self, stmt, key, used):
+        return CheeseIf(self._expression(stmt.condition, key, used),
+                        self._rewrite_block(stmt.then_branch),
+                        self._rewrite_block(stmt.else_branch))
+
+    def _rewrite_loop(self, stmt, key, used):
+        return CheeseLoop(self._rewrite_block(stmt.body),
+                          self._expression(stmt.condition, key, used))
+
+    def _rewrite_binop(self, stmt, key, used):
+        return self._expression(stmt, key, used)
+
+    _rewrite_number = _rewrite_string = _rewrite_var = _rewrite_binop
+
+    def _expression(self, expr, key, used):
+        """
+        Expressão de um comando reescrito. As que poupam avaliações entram em
+        `stats.savings`; cada comando avalia a sua uma vez (condições de
+        Cheddar, a cada teste), então o nó precisa ser só dele.
+        """
+        result = self._substitute(expr, used)
+        saved = self._saved.get(key)
+        if saved:
+            if type(result) is Var:
+                # O mesmo temporário aparece inteiro em vários comandos
+                result = Var(result.name)
+            self.stats.savings[result] = saved
+        return result
+
+    def _substitute(self, expr, replacements):
+        """Troca subexpressões por temporários, sem recursão"""
+        if not replacements:
+            return expr
+        if expr in replacements:
+            return replacements[expr]
+        values = []
+        stack = [(expr, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if not expanded:
+                binop = type(node) is BinOp
+                replacement = replacements.get(node) if binop else None
+                if replacement is not None:
+                    values.append(replacement)
+                elif binop:
+                    stack.append((node, True))
+                    stack.append((node.right, False))
+                    stack.append((node.left, False))
+                else:
+                    values.append(node)
+                continue
+            right = values.pop()
+            left = values.pop()
+            if left is node.left and right is node.right:
+                values.append(node)
+            else:
+                values.append(BinOp(left, node.op, right))
+        return values[-1]
+
+
+# Passos de cada comando na análise e na reescrita
+_ANALYZE = dispatch_table(CommonSubexpressionEliminator, '_analyze_')
+_REWRITE = dispatch_table(CommonSubexpressionEliminator, '_rewrite_')
+
+
+def eliminate_common_subexpressions(program) -> Tuple[list, CSEStats]:
+    """Aplica a eliminação de subexpressões comuns a um programa"""
+    eliminator = CommonSubexpressionEliminator()
+    return eliminator.optimize(program), eliminator.stats
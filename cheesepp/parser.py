@@ -1,6 +1,11 @@
 from lark import Lark
-from cheesepp.transformer import CheeseTransformer
+from lark.exceptions import UnexpectedCharacters, UnexpectedInput
+from lark.lexer import Token
+from cheesepp.errors import ERROR_MESSAGES, SUGGESTIONS, ErrorReporter
+from cheesepp.transformer import CheeseTransformer, ConstantPool
 import os
+import re
+import threading
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 grammar_path = os.path.join(current_dir, "grammar.lark")
@@ -8,7 +13,213 @@ grammar_path = os.path.join(current_dir, "grammar.lark")
 with open(grammar_path) as f:
     grammar = f.read()
 
-parser = Lark(grammar, start='start', parser='lalr', transformer=CheeseTransformer())
+transformer = CheeseTransformer()
+parser = Lark(grammar, start='start', parser='lalr', transformer=transformer)
 
-def parse(code):
-    return parser.parse(code)
+# O transformer é compartilhado: um parse por vez para não misturar pools
+_lock = threading.Lock()
+
+# Como cada terminal aparece nas mensagens: o texto fixo ou o nome
+_DISPLAY = {t.name: repr(t.pattern.value) if t.pattern.type == 'str' else t.name
+            for t in parser.terminals}
+
+# Pontos de ressincronização, pulando strings Swiss...Swiss: ';' e Brie
+# terminam o comando com erro; as demais palavras fecham um bloco aberto
+_SYNC = re.compile(r"(?s:Swiss.*?Swiss)|(;)|\b(Brie|Coleraine|White|Blue|NoCheese)\b")
+_CLOSERS = {'Coleraine': 'COLERAINE', 'White': 'WHITE', 'Blue': 'BLUE', 'NoCheese': 'NOCHEESE'}
+
+# Primeiro token do trecho com erro. O lexer de reserva do Lark devolve um
+# SWISS_CONTENT com o resto do texto; sem nenhum terminal no começo dele, o
+# erro é de caractere
+_TOKEN = re.compile("|".join(
+    "(?:%s)" % t.pattern.to_regexp()
+    for t in sorted(parser.terminals, key=lambda t: (t.pattern.type != 'str', -len(t.pattern.value)))
+    if t.name not in ('SWISS_CONTENT', 'WS')))
+
+
+def _seek(lexer_state, pos):
+    """Avança o lexer até `pos` mantendo linha e coluna"""
+    line_ctr = lexer_state.line_ctr
+    line_ctr.feed(lexer_state.text.text[line_ctr.char_pos:pos])
+
+
+def _rewind(lexer_state, token):
+    """Volta o lexer para o começo de `token`"""
+    line_ctr = lexer_state.line_ctr
+    line_ctr.char_pos = token.start_pos
+    line_ctr.line = token.line
+    line_ctr.column = token.column
+    line_ctr.line_start_pos = token.start_pos - token.column + 1
+
+
+class _Recovery:
+    """
+    Tratamento de erros do parser LALR (on_error do Lark), em modo pânico:
+    registra o erro, descarta o comando com erro até o próximo ';'/Brie ou
+    até uma palavra que feche um bloco aberto (Coleraine, White, Blue,
+    NoCheese) e continua do estado em que um comando pode começar. O custo
+    é o do trecho descartado, então o parse com erros custa o mesmo que um
+    parse correto.
+
+    `span` é o trecho do código escrito pelo usuário quando há um envoltório
+    em volta (parse_statements): as posições relatadas são as do trecho, e
+    um erro no envoltório é um erro no fim da entrada.
+    """
+
+    def __init__(self, code, reporter, span=None):
+        self.code = code
+        self.reporter = reporter
+        self.retried = None
+        self.start, self.end = span or (0, len(code))
+        self.lines = code.count('\n', 0, self.start)
+
+    def _context(self, pos):
+        start = self.code.rfind('\n', 0, pos) + 1
+        end = self.code.find('\n', pos)
+        return self.code[start:end if end >= 0 else len(self.code)].strip()
+
+    def _end(self):
+        """Linha, coluna e contexto do fim do trecho do usuário"""
+        line_start = self.code.rfind('\n', self.start, self.end) + 1 or self.start
+        line = self.code.count('\n', self.start, self.end) + 1
+        return line, self.end - line_start + 1, self._context(max(self.end - 1, self.start))
+
+    def _report(self, error):
+        if isinstance(error, UnexpectedCharacters):
+            self.reporter.report_lexical_error(
+                ERROR_MESSAGES["invalid_character"].format(char=error.char),
+                error.line - self.lines, error.column, self._context(error.pos_in_stream))
+            return
+        token = error.token
+        expected = error.expected
+        shown = None
+        if self.end < len(self.code) and (token.type == '$END' or token.start_pos >= self.end):
+            # Erro no envoltório: a entrada acabou no meio de um comando
+            line, column, context = self._end()
+            self.reporter.report_syntax_error(ERROR_MESSAGES["incomplete_statement"], line, column,
+                                              context, SUGGESTIONS["incomplete_statement"])
+            return
+        if token.type == '$END':
+            key = "missing_nocheese" if 'NOCHEESE' in expected else None
+        else:
+            shown = _TOKEN.match(token.value)
+            if shown is None:
+                self.reporter.report_lexical_error(
+                    ERROR_MESSAGES["invalid_character"].format(char=token.value[0]),
+                    token.line - self.lines, token.column, self._context(token.start_pos))
+                return
+            key = "missing_cheese" if expected == {'CHEESE'} else None
+        if key is not None:
+            message, suggestions = ERROR_MESSAGES[key], SUGGESTIONS[key]
+        else:
+            message = ERROR_MESSAGES["invalid_syntax"].format(
+                token=shown.group() if shown else "end of input")
+            suggestions = ["Expected one of: " + ", ".join(sorted(_DISPLAY.get(name, name) for name in expected))]
+        pos = token.start_pos if token.start_pos is not None else len(self.code)
+        self.reporter.report_syntax_error(message, token.line - self.lines, token.column,
+                                          self._context(pos), suggestions)
+
+    def __call__(self, error):
+        token = getattr(error, 'token', None)
+        repeated = token is not None and token.start_pos == self.retried
+        if not repeated:
+            self._report(error)
+        if self.reporter.should_stop_compilation() or (token is not None and token.type == '$END'):
+            return False
+
+        interactive = error.interactive_parser
+        state = interactive.parser_state
+        lexer_state = interactive.lexer_thread.state
+        states = state.parse_conf.states
+        stack = state.state_stack
+        end = len(self.code)
+
+        if isinstance(error, UnexpectedCharacters):
+            start = error.pos_in_stream + 1
+        else:
+            # O lexer já passou do token (às vezes bem além dele)
+            _rewind(lexer_state, token)
+            start = token.start_pos
+        if repeated:
+            # A palavra de fechamento já foi tentada neste ponto: descarta
+            start = token.end_pos
+        elif token is not None:
+            if '$END' in states[stack[-1]]:
+                # Texto depois do NoCheese: não há mais o que analisar
+                _seek(lexer_state, end)
+                return True
+            if len(stack) == 1 and 'CHEESE' in states[stack[0]]:
+                # Programa sem Cheese: segue como se ele estivesse lá
+                interactive.feed_token(Token.new_borrow_pos('CHEESE', 'Cheese', token))
+                _rewind(lexer_state, token)
+                return True
+
+        for match in _SYNC.finditer(self.code, start):
+            if match.group(1) or match.group(2) == 'Brie':
+                _seek(lexer_state, match.end())
+                self._to_statement_start(state)
+                return True
+            terminal = _CLOSERS.get(match.group(2))
+            if terminal is None:
+                continue
+            for depth in range(len(stack) - 1, -1, -1):
+                if terminal in states[stack[depth]]:
+                    # O bloco que a palavra fecha continua dali
+                    del stack[depth + 1:]
+                    del state.value_stack[depth:]
+                    _seek(lexer_state, match.start())
+                    self.retried = match.start()
+                    return True
+        _seek(lexer_state, end)
+        return True
+
+    def _to_statement_start(self, state):
+        """Desempilha até o estado mais alto em que começa um comando"""
+        states = state.parse_conf.states
+        stack = state.state_stack
+        for depth in range(len(stack) - 1, -1, -1):
+            if 'stmt' in states[stack[depth]]:
+                del stack[depth + 1:]
+                del state.value_stack[depth:]
+                return
+
+
+def parse(code, pool=None, reporter=None, span=None):
+    """
+    Analisa o código; `pool` recebe os nomes e literais do programa.
+
+    Sem `reporter`, o primeiro erro levanta a exceção do Lark. Com um
+    ErrorReporter, os erros de sintaxe (CheeseSyntaxError) e de caracteres
+    (CheeseLexicalError) vão para ele numa só passada, até `max_errors`, e
+    o resultado é o programa sem os comandos com erro (None se a análise
+    não chegou ao fim). Não execute o resultado se `reporter.has_errors()`.
+    """
+    with _lock:
+        transformer.pool = pool if pool is not None else ConstantPool()
+        try:
+            if reporter is None:
+                return parser.parse(code)
+            try:
+                return parser.parse(code, on_error=_Recovery(code, reporter, span))
+            except UnexpectedInput:
+                return None
+        finally:
+            transformer.pool = None
+
+
+def parse_statements(code, pool=None, reporter=None):
+    """
+    Analisa comandos soltos, sem o Cheese ... NoCheese em volta. As linhas
+    dos erros são as de `code`. Sem `reporter`, o primeiro erro levanta
+    CheeseSyntaxError (ou CheeseLexicalError).
+    """
+    # Linhas próprias para o envoltório, descontadas nas posições dos erros
+    wrapped = "Cheese\n" + code + "\nNoCheese"
+    start = len("Cheese\n")
+    if reporter is not None:
+        return parse(wrapped, pool, reporter, (start, start + len(code)))
+    reporter = ErrorReporter()
+    program = parse(wrapped, pool, reporter, (start, start + len(code)))
+    if reporter.has_errors():
+        raise reporter.errors[0]
+    return program
@@ -0,0 +1,331 @@
+"""
+Avaliação parcial do programa inteiro.
+
+Um programa que não recebe entradas imprime sempre a mesma coisa: o que ele
+calcula pode ser calculado uma vez, na compilação. O avaliador executa os
+comandos do nível do programa, na ordem, com as regras do runtime
+(inclusive Stilton com condição conhecida e Cheddar até a condição de
+saída), e devolve um programa residual com:
+
+- um Wensleydale de literal para cada linha impressa;
+- as atribuições finais das variáveis, com literais;
+- os comandos que não puderam ser avaliados, sem alteração.
+
+Um comando fica no residual quando lê uma variável desconhecida (uma
+entrada, ou uma variável atribuída por outro comando residual), usa Belgian,
+falha (a falha volta a acontecer na execução, no mesmo ponto) ou monta um
+valor grande demais para virar literal. Antes de cada comando residual vêm
+as atribuições de que ele pode depender, então a saída, o ambiente final e
+o resultado do residual são os do programa original.
+
+O combustível (`fuel`) conta comandos executados e testes de condição; ao
+acabar, o resto do programa fica no residual como estava, então a
+compilação termina mesmo para laços infinitos.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from .ast import *
+from .inference import GENERIC_HANDLERS, CheeseType, infer_types
+from .ir import iter_statements
+from .runtime import CONST, LOAD, postfix
+from .strings import StrBuilder
+
+DEFAULT_FUEL = 100_000
+
+# Maiores valores que viram literais no residual
+MAX_STRING = 64 * 1024
+MAX_INT_BITS = 4096
+
+
+@dataclass
+class PartialStats:
+    """Resumo da avaliação parcial"""
+    # Comandos do nível do programa avaliados na compilação
+    folded: int = 0
+    # Comandos do programa residual
+    residual: int = 0
+    # Combustível gasto e se ele acabou antes do fim do programa
+    fuel_used: int = 0
+    exhausted: bool = False
+
+
+# Tipos dos literais do Cheese++; operações entre eles só produzem estes
+# tipos, StrBuilder e bool, que também viram literais (ver `literal`)
+_VALUES = frozenset((int, float, str))
+_MISSING = object()
+
+
+class _Dynamic(Exception):
+    """O comando depende de algo que só se conhece na execução"""
+
+
+class _OutOfFuel(Exception):
+    """O combustível acabou no meio de um comando"""
+
+
+def literal(value) -> Optional[Any]:
+    """Expressão que vale `value` no runtime, ou None se não há uma"""
+    kind = type(value)
+    if kind is bool:
+        # O Cheese++ não tem literal booleano: uma comparação de constantes
+        return BinOp(Number(0), '==' if value else '!=', Number(0))
+    if kind is int or kind is float:
+        return Number(value)
+    if kind is str or kind is StrBuilder:
+        return String(str(value))
+    return None
+
+
+def _too_large(op, left, right) -> bool:
+    """Se `left op right` montaria um valor grande demais para um literal"""
+    texts = (str, StrBuilder)
+    if op == '*':
+        if isinstance(left, texts) and type(right) is int:
+            return len(left) * right > MAX_STRING
+        if isinstance(right, texts) and type(left) is int:
+            return len(right) * left > MAX_STRING
+        if type(left) is int and type(right) is int:
+            return left.bit_length() + right.bit_length() > MAX_INT_BITS
+    elif op == '+':
+        if isinstance(left, texts) and isinstance(right, texts):
+            return len(left) + len(right) > MAX_STRING
+        if type(left) is int and type(right) is int:
+            return max(left.bit_length(), right.bit_length()) >= MAX_INT_BITS
+    return False
+
+
+class PartialEvaluator:
+    """
+    Executa na compilação os comandos que não dependem da execução.
+
+    Com `closed`, o programa começa com o ambiente vazio e ler uma variável
+    nunca atribuída vale 0, como no runtime; sem `closed` (Program, que
+    recebe entradas em run), essas variáveis são desconhecidas.
+    """
+
+    def __init__(self, fuel: int = DEFAULT_FUEL, closed: bool = True):
+        self.fuel = fuel
+        self.closed = closed
+        self.stats = PartialStats()
+        # Valores conhecidos e nomes atribuídos por comandos residuais
+        self._known: Dict[str, Any] = {}
+        self._dynamic = set()
+        # Atribuições do comando em avaliação, descartadas se ele não termina
+        self._local: Dict[str, Any] = {}
+        self._code = {}
+
+    def evaluate(self, program) -> list:
+        """Devolve o programa residual; o original não é alterado"""
+        # A inferência do runtime recusa o programa antes do primeiro comando
+        # quando acha uma operação que certamente falha. Com literais no lugar
+        # das variáveis ela vê mais, então o residual precisa passar por ela
+        # do mesmo jeito que o original; senão o original fica como está
+        default = CheeseType.INT if self.closed else CheeseType.UNKNOWN
+        if infer_types(program, default=default).errors:
+            return self._finish(list(program))
+        residual = self._residual(program)
+        if infer_types(residual, default=default).errors:
+            self.stats.folded = 0
+            return self._finish(list(program))
+        return self._finish(residual)
+
+    def _residual(self, program) -> list:
+        residual: List[Any] = []
+        # Desde o último comando residual: linhas impressas e atribuições
+        # ainda não escritas, na ordem da última atribuição de cada nome
+        prints: List[Tuple[Any, Any]] = []
+        pending: Dict[str, Any] = {}
+        result = None
+        # Se o programa termina com comandos avaliados
+        ended = False
+        for index, stmt in enumerate(program):
+            if stmt is None:
+                # Comandos vazios no nível do programa não mudam o resultado
+                continue
+            try:
+                lines, result = self._run(stmt)
+            except _Dynamic:
+                self._flush(residual, prints, pending)
+                residual.append(stmt)
+                for inner in iter_statements([stmt]):
+                    if type(inner) is CheeseAssign:
+                        self._known.pop(inner.name, None)
+                        self._dynamic.add(inner.name)
+                ended = False
+                continue
+            except Exception as error:
+                # Sem combustível, ou uma falha que acontece de novo na
+                # execução, no mesmo ponto: o resto fica como está
+                self.stats.exhausted = type(error) is _OutOfFuel
+                self._flush(residual, prints, pending)
+                residual.extend(s for s in program[index:] if s is not None)
+                return residual
+            self.stats.folded += 1
+            for value in lines:
+                prints.append((CheesePrint(literal(value)), value))
+            for name, value in self._local.items():
+                self._known[name] = value
+                self._dynamic.discard(name)
+                pending.pop(name, None)
+                pending[name] = value
+            ended = True
+        if ended:
+            self._tail(residual, prints, pending, result)
+        return residual
+
+    def _finish(self, residual) -> list:
+        self.stats.residual = len(residual)
+        return residual
+
+    def _flush(self, residual, prints, pending) -> None:
+        """Escreve as linhas e as atribuições pendentes antes de um comando residual"""
+        residual.extend(stmt for stmt, _ in prints)
+        residual.extend(CheeseAssign(name, literal(value)) for name, value in pending.items())
+        prints.clear()
+        pending.clear()
+
+    def _tail(self, residual, prints, pending, result) -> None:
+        """
+        Fim do residual. Linhas e atribuições de literais podem trocar de
+        ordem entre si; das duas ordens, fica a que deixa por último um
+        comando cujo valor é o resultado do programa original.
+        """
+        if type(result) is StrBuilder:
+            result = str(result)
+        assigns = [(CheeseAssign(name, literal(value)), value) for name, value in pending.items()]
+        orders = (prints + assigns, assigns + prints)
+        for tail in orders:
+            if self._yields(tail, residual, result):
+                residual.extend(stmt for stmt, _ in tail)
+                return
+        residual.extend(stmt for stmt, _ in orders[0])
+        if result is None:
+            # Stilton vazio: deixa o resultado vazio, como o laço ou o
+            # Stilton em que o programa original terminou
+            residual.append(CheeseIf(Number(0), [], []))
+        else:
+            residual.append(literal(result))
+
+    @staticmethod
+    def _yields(tail, residual, result) -> bool:
+        """Se o residual seguido de `tail` termina com o resultado `result`"""
+        if not tail:
+            return result is None and not residual
+        value = tail[-1][1]
+        if type(value) is StrBuilder:
+            value = str(value)
+        return type(value) is type(result) and value == result
+
+    # Execução
+
+    def _run(self, stmt):
+        """
+        Executa um comando do nível do programa com uma pilha de blocos,
+        como Runtime.resume. Devolve os valores impressos e o resultado.
+        """
+        self._local = {}
+        evaluate = self._eval
+        lines = []
+        result = None
+        fuel = self.fuel
+        frames = [[[stmt], 0, None]]
+        try:
+            while frames:
+                frame = frames[-1]
+                statements, pc, loop = frame
+                fuel -= 1
+                if fuel < 0:
+                    raise _OutOfFuel()
+                if pc >= len(statements):
+                    if loop is not None:
+                        # Teste de condição na volta do laço
+                        if not evaluate(loop.condition):
+                            frame[1] = 0
+                            continue
+                        result = None
+                    else:
+                        # Fim de bloco não gasta combustível
+                        fuel += 1
+                    frames.pop()
+                    continue
+                current = statements[pc]
+                frame[1] = pc + 1
+                kind = type(current)
+                if kind is CheeseAssign:
+                    result = evaluate(current.value)
+                    self._local[current.name] = result
+                elif kind is CheesePrint:
+                    result = evaluate(current.expr)
+                    lines.append(result)
+                elif kind is CheeseIf:
+                    result = None
+                    branch = current.then_branch if evaluate(current.condition) else current.else_branch
+                    frames.append([branch, 0, None])
+                elif kind is CheeseLoop:
+                    result = None
+                    if not evaluate(current.condition):
+                        frames.append([current.body, 0, current])
+                elif kind is BinOp or kind is Var or kind is Number or kind is String:
+                    result = evaluate(current)
+                elif current is None:
+                    result = None
+                else:
+                    # Belgian imprime o código-fonte; outros nós ficam como estão
+                    raise _Dynamic()
+        finally:
+            self.stats.fuel_used += self.fuel - max(fuel, -1)
+            self.fuel = fuel
+        return lines, result
+
+    def _read(self, name: str):
+        value = self._local.get(name, _MISSING)
+        if value is not _MISSING:
+            return value
+        if name in self._dynamic:
+            raise _Dynamic()
+        value = self._known.get(name, _MISSING)
+        if value is not _MISSING:
+            return value
+        if self.closed:
+            return 0
+        raise _Dynamic()
+
+    def _eval(self, node):
+        """Valor de uma expressão; só aparecem valores que têm literal"""
+        kind = type(node)
+        if kind is Var:
+            return self._read(node.name)
+        if kind is Number or kind is String:
+            return node.value
+        if kind is not BinOp:
+            raise _Dynamic()
+        code = self._code.get(node)
+        if code is None:
+            code = self._code[node] = postfix(node)
+        read = self._read
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        for op, arg in code:
+            if op == LOAD:
+                push(read(arg))
+            elif op == CONST:
+                if type(arg) not in _VALUES:
+                    raise _Dynamic()
+                push(arg)
+            else:
+                right = pop()
+                left = stack[-1]
+                symbol = arg.op
+                if (symbol == '*' or symbol == '+') and _too_large(symbol, left, right):
+                    raise _Dynamic()
+                stack[-1] = GENERIC_HANDLERS[symbol](left, right)
+        return stack[-1]
+
+
+def partially_evaluate(program, fuel: int = DEFAULT_FUEL,
+                       closed: bool = True) -> Tuple[list, PartialStats]:
+    """Aplica a avaliação parcial a um programa"""
+    evaluator = PartialEvaluator(fuel, closed)
+    return evaluator.evaluate(program), evaluator.stats
@@ -0,0 +1,126 @@
+import hashlib
+import time
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Any, Dict, List, Optional
+
+from .parser import parse
+from .optimizer import eliminate_common_subexpressions
+from .partial import DEFAULT_FUEL, partially_evaluate
+from .transformer import ConstantPool
+from .runtime import Runtime
+from .serialize import dumps, loads
+from .inference import CheeseType, TypeInfo, infer_types
+from .ir import iter_statements
+from .ast import Belgian
+
+
+@dataclass
+class RunResult:
+    """Resultado de uma execução de um Program"""
+    output: List[str]
+    env: Dict[str, Any]
+    value: Any = None
+
+    @property
+    def text(self) -> str:
+        """Saída impressa como um único texto"""
+        return '\n'.join(self.output)
+
+
+class Program:
+    """
+    Programa Cheese++ compilado uma única vez.
+
+    O código-fonte é analisado e tipado no construtor; cada chamada de
+    `run` cria o seu próprio ambiente, então o mesmo Program pode ser
+    executado por várias threads ao mesmo tempo.
+    """
+
+    def __init__(self, source: str, optimize: bool = True, partial: bool = False,
+                 fuel: int = DEFAULT_FUEL):
+        self.source = source
+        self.timings: Dict[str, float] = {}
+        self.stats: Dict[str, int] = {}
+
+        # Nomes internados e literais compartilhados deste programa
+        self.pool = ConstantPool()
+
+        start = time.perf_counter()
+        self.ast = parse(source, self.pool)
+        self.timings['parse'] = time.perf_counter() - start
+        # Programa que de fato roda: a AST depois das otimizações
+        self.code = self.ast
+        if partial:
+            start = time.perf_counter()
+            # Variáveis nunca atribuídas podem vir das entradas de run()
+            self.code, folded = partially_evaluate(self.code, fuel, closed=False)
+            self.stats['partial_folded'] = folded.folded
+            self.stats['partial_residual'] = folded.residual
+            self.stats['partial_fuel'] = folded.fuel_used
+            self.timings['partial'] = time.perf_counter() - start
+        if optimize:
+            start = time.perf_counter()
+            self.code, cse = eliminate_common_subexpressions(self.code)
+            self.stats['cse_temporaries'] = cse.temporaries
+            self.stats['cse_eliminated'] = cse.eliminated
+            self.timings['cse'] = time.perf_counter() - start
+        self._infer()
+
+    def _infer(self) -> None:
+        start = time.perf_counter()
+        # Qualquer variável não atribuída pode vir das entradas de run()
+        self.types: TypeInfo = infer_types(self.code, default=CheeseType.UNKNOWN)
+        self.timings['infer'] = time.perf_counter() - start
+        if self.types.errors:
+            raise self.types.errors[0]
+
+    @cached_property
+    def fingerprint(self) -> str:
+        """
+        Hash da AST normalizada: espaços, quebras de linha e a forma de
+        escrever as atribuições não mudam o valor, só a estrutura do programa
+        """
+        return hashlib.sha256(dumps(self.ast)).hexdigest()
+
+    @cached_property
+    def pure(self) -> bool:
+        """Se a saída depende só da AST e das entradas (sem Belgian, que imprime o código)"""
+        return not any(type(stmt) is Belgian for stmt in iter_statements(self.ast))
+
+    def to_bytes(self) -> bytes:
+        """Código-fonte, AST e AST otimizada no formato binário de serialize.py"""
+        code = self.code if self.code is not self.ast else None
+        return dumps(self.source, self.ast, code)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Program":
+        """Recria um Program gravado por `to_bytes` sem analisar o código de novo"""
+        program = cls.__new__(cls)
+        program.timings = {}
+        program.stats = {}
+        program.pool = ConstantPool()
+
+        start = time.perf_counter()
+        program.source, program.ast, code = loads(data, program.pool)
+        program.code = code if code is not None else program.ast
+        program.timings['load'] = time.perf_counter() - start
+        program._infer()
+        return program
+
+    def __reduce__(self):
+        # Enviado a outros processos no formato binário, não como objetos
+        return (Program.from_bytes, (self.to_bytes(),))
+
+    def run(self, inputs: Optional[Dict[str, Any]] = None,
+            time_limit: Optional[float] = None) -> RunResult:
+        """Executa o programa com o ambiente inicial preenchido por `inputs`"""
+        output: List[str] = []
+        runtime = Runtime(output=output.append, time_limit=time_limit)
+        if inputs:
+            runtime.env.update(inputs)
+        value = runtime.run(self.code, self.source, types=self.types)
+        return RunResult(output, runtime.env, value)
+
+    def __repr__(self):
+        return f"Program(statements={len(self.ast)}, source={len(self.source)} chars)"
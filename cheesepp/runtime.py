@@ -1,84 +1,447 @@
+import asyncio
+import inspect
+import math
+import sys
+import time
+
 from cheesepp.ast import *
+from cheesepp.errors import ERROR_MESSAGES, CheeseRuntimeError
+from cheesepp.inference import GENERIC_HANDLERS, TypeInfo, infer_types, type_of
+from cheesepp.ir import dispatch_table, iter_nodes, iter_statements, lower
+from cheesepp.node import ASTNode
+from cheesepp.optimizer import is_hidden
+from cheesepp.semantic import SemanticChecker
+from cheesepp.strings import Env, StrBuilder
+
+# Comandos executados entre duas devoluções de controle em run_async
+DEFAULT_SLICE = 1000
+
+# Instruções da forma pós-fixa das expressões
+CONST, LOAD, APPLY = 0, 1, 2
+
+
+def display(value) -> str:
+    """
+    Texto de um valor como Wensleydale imprime. O CPython recusa converter
+    para texto inteiros com mais de sys.get_int_max_str_digits() dígitos (a
+    conversão é quadrática); eles viram CheeseRuntimeError.
+    """
+    try:
+        return str(value)
+    except ValueError:
+        if type(value) is not int:
+            raise
+        digits = int(value.bit_length() * math.log10(2)) + 1
+        raise CheeseRuntimeError(
+            ERROR_MESSAGES["integer_too_large"].format(digits=digits, limit=sys.get_int_max_str_digits()),
+            suggestions=["Print a smaller value, e.g. divide it or compare it first"])
+
+
+def postfix(node):
+    """
+    Lineariza uma expressão em instruções pós-fixas (CONST valor, LOAD nome,
+    APPLY BinOp). Percorre a árvore sem recursão, então cadeias com milhares
+    de operadores (a espinha esquerda de `a plus b plus c ...`) não estouram
+    o limite de recursão do Python.
+    """
+    code = []
+    stack = [(node, False)]
+    while stack:
+        current, expanded = stack.pop()
+        kind = type(current)
+        if kind is BinOp:
+            if expanded:
+                code.append((APPLY, current))
+            else:
+                stack.append((current, True))
+                stack.append((current.right, False))
+                stack.append((current.left, False))
+        elif kind is Var:
+            code.append((LOAD, current.name))
+        elif kind is Number or kind is String:
+            code.append((CONST, current.value))
+        else:
+            code.append((CONST, current))
+    return code
+
+
+class Frame:
+    """Bloco de comandos em execução: posição atual e o loop dono do bloco"""
+    __slots__ = ('statements', 'pc', 'loop')
+
+    def __init__(self, statements, loop=None):
+        self.statements = statements
+        self.pc = 0
+        self.loop = loop
+
+    def __repr__(self):
+        return f"Frame(pc={self.pc}/{len(self.statements)}, loop={self.loop is not None})"
+
 
 class Runtime:
-    def __init__(self):
-        self.env = {}
+    def __init__(self, output=None, time_limit=None, context=None, strict=False):
+        self._env = Env()
+        # Modo estrito: não executa programas com erros da verificação semântica
+        self.strict = strict
         self.last_source = None
+        self.handlers = {}
+        # CheeseContext que recebe a saída, as variáveis e as estatísticas
+        self.context = context
+        if output is None:
+            output = context.execution_context.add_output if context is not None else print
+        # Destino das linhas impressas (Wensleydale e Belgian)
+        self.output = output
+        # Limite de tempo em segundos, verificado a cada volta de loop
+        self.time_limit = time_limit
+        self.deadline = None
+        # Forma pós-fixa das expressões aninhadas, por nó
+        self.code = {}
+        # Pilha explícita de blocos: o topo é o bloco em execução
+        self.frames = []
+        self.result = None
+        # Contadores: comandos executados, testes de condição na volta de um
+        # loop, Wensleydale/Belgian chamados e comandos sem expressão
+        self.steps = 0
+        self.condition_tests = 0
+        self.calls = 0
+        self._silent = 0
+        self._recorded = (0, 0, 0, 0)
+        self._pending = []
+        # Variáveis que o programa atual pode atribuir (ver _finish)
+        self._assigned = ()
+        # Avaliações de BinOp que cada expressão poupa graças aos temporários
+        # da eliminação de subexpressões (CSEStats.savings) e o total poupado
+        self.cse_savings = None
+        self.cse_saved = 0
+
+    @property
+    def env(self):
+        """Variáveis do programa; strings em construção aparecem já achatadas"""
+        return self._env
+
+    @env.setter
+    def env(self, values):
+        self._env = values if isinstance(values, Env) else Env(values)
 
     def eval(self, node):
-        if isinstance(node, CheeseAssign):
-            value = self.eval(node.value)
-            self.env[node.name] = value
-            return value
+        """Executa um comando avulso e devolve o seu valor"""
+        return _EVAL.get(type(node), Runtime._eval_other)(self, node)
 
-        elif isinstance(node, Number):
-            return node.value
+    def _eval_assign(self, node):
+        value = self.evaluate(node.value)
+        self._env[node.name] = value
+        return value
+
+    def _eval_binop(self, node):
+        return self.evaluate(node)
+
+    _eval_number = _eval_string = _eval_var = _eval_binop
+
+    def _eval_print(self, node):
+        value = self.evaluate(node.expr)
+        self.calls += 1
+        self._emit(display(value))
+        return value
+
+    def _eval_if(self, node):
+        # Comando composto avulso: roda numa pilha própria até o fim
+        outer, self.frames = self.frames, [Frame([node])]
+        outer_result = self.result
+        try:
+            self.resume(None)
+            return self.result
+        finally:
+            self.frames, self.result = outer, outer_result
+
+    _eval_loop = _eval_if
+
+    def _eval_belgian(self, node):
+        self.calls += 1
+        self._silent += 1
+        if self.last_source:
+            self._emit("=== Belgian Mode ===")
+            self._emit(self.last_source)
+        else:
+            self._emit("No source available.")
+        return None
+
+    def _eval_other(self, node):
+        self._silent += 1
+        return node
+
+    def _step_if(self, stmt):
+        branch = stmt.then_branch if self.evaluate(stmt.condition) else stmt.else_branch
+        self.frames.append(Frame(branch))
+        return None
+
+    def _step_loop(self, stmt):
+        if not self.evaluate(stmt.condition):
+            self.frames.append(Frame(stmt.body, stmt))
+        return None
+
+    def evaluate(self, node):
+        """Valor de uma expressão, sem recursão"""
+        if type(node) is BinOp:
+            left = node.left
+            right = node.right
+            if type(left) is BinOp or type(right) is BinOp:
+                return self._run_postfix(node)
+            # Caso mais comum: operandos folha, sem montar a forma pós-fixa
+            handler = self.handlers.get(node)
+            if handler is None:
+                handler = GENERIC_HANDLERS[node.op]
+            return handler(self._leaf(left), self._leaf(right))
+        return self._leaf(node)
+
+    def _evaluate_saving(self, node):
+        """evaluate que também soma as avaliações poupadas pela CSE"""
+        self.cse_saved += self.cse_savings.get(node, 0)
+        return Runtime.evaluate(self, node)
 
-        elif isinstance(node, String):
+    def _leaf(self, node):
+        kind = type(node)
+        if kind is Var:
+            # Leitura crua: StrBuilder continua sendo estendido sem cópias
+            return dict.get(self._env, node.name, 0)
+        elif kind is Number or kind is String:
             return node.value
+        return node
 
-        elif isinstance(node, Var):
-            return self.env.get(node.name, 0)
-
-        elif isinstance(node, BinOp):
-            left = self.eval(node.left)
-            right = self.eval(node.right)
-            if node.op == '+':
-                return left + right
-            elif node.op == '-':
-                return left - right
-            elif node.op == '*':
-                return left * right
-            elif node.op == '/':
-                return left / right
-            elif node.op == '==':
-                return left == right
-            elif node.op == '!=':
-                return left != right
-            elif node.op == '>':
-                return left > right
-            elif node.op == '<':
-                return left < right
-            elif node.op == '>=':
-                return left >= right
-            elif node.op == '<=':
-                return left <= right
-
-        elif isinstance(node, CheesePrint):
-            value = self.eval(node.expr)
-            print(value)
-            return value
-
-        elif isinstance(node, CheeseIf):
-            cond = self.eval(node.condition)
-            branch = node.then_branch if cond else node.else_branch
-            result = None
-            for stmt in branch:
-                result = self.eval(stmt)
-            return result
-
-        elif isinstance(node, CheeseLoop):
-            while not self.eval(node.condition):
-                for stmt in node.body:
-                    self.eval(stmt)
-
-        elif isinstance(node, Belgian):
-            if self.last_source:
-                print("=== Belgian Mode ===")
-                print(self.last_source)
+    def _run_postfix(self, node):
+        code = self.code.get(node)
+        if code is None:
+            code = self.code[node] = postfix(node)
+        env = self._env
+        get = dict.get
+        handlers = self.handlers
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        for kind, arg in code:
+            if kind == LOAD:
+                push(get(env, arg, 0))
+            elif kind == CONST:
+                push(arg)
             else:
-                print("No source available.")
-            return None
+                right = pop()
+                handler = handlers.get(arg)
+                if handler is None:
+                    handler = GENERIC_HANDLERS[arg.op]
+                stack[-1] = handler(stack[-1], right)
+        return stack[-1]
 
-        else:
-            return node
+    def _emit(self, text):
+        """Envia uma linha para a saída; saídas assíncronas ficam pendentes"""
+        sent = self.output(text)
+        if inspect.isawaitable(sent):
+            self._pending.append(sent)
+
+    def resume(self, budget=None):
+        """
+        Executa comandos da pilha de blocos até ela esvaziar ou até `budget`
+        comandos. Retorna True quando o programa terminou.
+        """
+        frames = self.frames
+        step = _STEP.get
+        other = Runtime._eval_other
+        executed = 0
+        tests = 0
+        while frames:
+            frame = frames[-1]
+            if frame.pc >= len(frame.statements):
+                loop = frame.loop
+                if loop is not None:
+                    # Volta do loop: a condição é testada antes de cada iteração
+                    if self.deadline is not None and time.monotonic() > self.deadline:
+                        raise CheeseRuntimeError(
+                            f"Tempo limite de execução excedido ({self.time_limit}s)")
+                    tests += 1
+                    if not self.evaluate(loop.condition):
+                        frame.pc = 0
+                        continue
+                    self.result = None
+                frames.pop()
+                continue
+
+            stmt = frame.statements[frame.pc]
+            frame.pc += 1
+            if stmt is None and len(frames) == 1:
+                # Comandos vazios no nível do programa não mudam o resultado
+                continue
+            # Stilton e Cheddar abrem um bloco na pilha e deixam o resultado vazio
+            self.result = step(type(stmt), other)(self, stmt)
+
+            executed += 1
+            if self._pending or (budget is not None and executed >= budget):
+                self.steps += executed
+                self.condition_tests += tests
+                return not frames and self._finish()
+        self.steps += executed
+        self.condition_tests += tests
+        return self._finish()
+
+    def _finish(self):
+        """Fim da execução: strings em construção viram str e temporários somem"""
+        # Só o que o programa atribui: o resto do ambiente já estava pronto,
+        # então o custo não cresce com as variáveis de execuções anteriores
+        env = self._env
+        for name in self._assigned:
+            if is_hidden(name):
+                env.pop(name, None)
+            else:
+                value = dict.get(env, name)
+                if type(value) is StrBuilder:
+                    dict.__setitem__(env, name, str(value))
+        if type(self.result) is StrBuilder:
+            self.result = str(self.result)
+        if self.context is not None:
+            self._record()
+        return True
 
-    def run(self, program, source_code=None):
+    def counters(self):
+        """(comandos, testes de condição, chamadas, comandos sem expressão) até agora"""
+        return (self.steps, self.condition_tests, self.calls, self._silent)
+
+    def _record(self):
+        """
+        Entrega ao contexto as variáveis que o programa atribui e os
+        contadores desde a última entrega
+        """
+        counters = self.counters()
+        steps, tests, calls, silent = (now - before for now, before in zip(counters, self._recorded))
+        self._recorded = counters
+        self.context.record_run(self._env, statements=steps,
+                                expressions=steps + tests - silent, calls=calls,
+                                names=self._assigned)
+
+    def analyze(self, program) -> TypeInfo:
+        """
+        Infere os tipos do programa a partir do ambiente atual.
+        Levanta CheeseTypeError para conflitos em comandos que certamente
+        executam; os demais falham só se forem alcançados (TypeInfo.warnings).
+        """
+        # Só as variáveis lidas pelo programa: o custo não cresce com o ambiente
+        env = self._env
+        read = {node.name for node in iter_nodes(program) if type(node) is Var}
+        info = infer_types(program, {name: type_of(env[name]) for name in read if name in env})
+        if info.errors:
+            raise info.errors[0]
+        return info
+
+    def frame_path(self):
+        """
+        Posição atual como lista de (bloco, pc), do programa até o bloco do topo.
+        O bloco é 'program', 'then', 'else' ou 'body' do comando que o abriu.
+        """
+        path = []
+        parent = None
+        for frame in self.frames:
+            if parent is None:
+                kind = 'program'
+            else:
+                node = parent.statements[parent.pc - 1]
+                if frame.loop is not None:
+                    kind = 'body'
+                elif frame.statements is node.then_branch:
+                    kind = 'then'
+                else:
+                    kind = 'else'
+            path.append((kind, frame.pc))
+            parent = frame
+        return path
+
+    def restore_frames(self, program, path):
+        """Reconstrói a pilha de blocos a partir de frame_path()"""
+        frames = []
+        for kind, pc in path:
+            if not frames:
+                if kind != 'program':
+                    raise CheeseRuntimeError(f"Posição inválida: bloco inicial '{kind}'")
+                frame = Frame(program)
+            else:
+                parent = frames[-1]
+                node = parent.statements[parent.pc - 1] if 0 < parent.pc <= len(parent.statements) else None
+                if kind == 'body' and type(node) is CheeseLoop:
+                    frame = Frame(node.body, node)
+                elif kind in ('then', 'else') and type(node) is CheeseIf:
+                    frame = Frame(node.then_branch if kind == 'then' else node.else_branch)
+                else:
+                    raise CheeseRuntimeError(f"Posição inválida: bloco '{kind}' não corresponde ao programa")
+            if not 0 <= pc <= len(frame.statements):
+                raise CheeseRuntimeError(f"Posição inválida: comando {pc} em '{kind}'")
+            frame.pc = pc
+            frames.append(frame)
+        self.frames = frames
+
+    def start(self, program, source_code=None, types: TypeInfo = None):
+        """
+        Prepara a execução de um programa sem executar nenhum comando.
+        Árvores de node.py são traduzidas para o IR antes (ver ir.lower).
+        """
+        if isinstance(program, ASTNode):
+            program = lower(program)
         self.last_source = source_code
-        results = []
+        if self.time_limit is not None:
+            self.deadline = time.monotonic() + self.time_limit
+        if self.context is not None:
+            # Variáveis definidas pelo contexto entre uma execução e outra;
+            # só as que o programa lê, então o custo é o do programa e não o
+            # de todos os símbolos do contexto
+            read = {node.name for node in iter_nodes(program) if type(node) is Var}
+            self.context.execution_context.load_variables(self._env, read)
+            self._recorded = self.counters()
+        # Programas já analisados (ex.: Program) não repetem a inferência
+        if types is None:
+            types = self.analyze(program)
+        if self.strict:
+            # Variáveis do ambiente (entradas, execuções anteriores) já existem;
+            # conflitos de tipo em ramos que podem não executar também contam
+            errors = SemanticChecker(self._env).check(program) + types.warnings
+            if errors:
+                raise errors[0]
+        self.handlers = types.handlers
+        # Sem temporários da CSE, evaluate fica sem contagem nenhuma
+        if self.cse_savings:
+            self.evaluate = self._evaluate_saving
+        else:
+            self.__dict__.pop('evaluate', None)
+        self._assigned = {stmt.name for stmt in iter_statements(program) if type(stmt) is CheeseAssign}
+        self.frames = [Frame(program)]
+        self.result = None
+        self._pending = []
+
+    def run(self, program, source_code=None, types: TypeInfo = None):
+        self.start(program, source_code, types)
+        if not self.resume(None) or self._pending:
+            for sent in self._pending:
+                if inspect.iscoroutine(sent):
+                    sent.close()
+            self._pending = []
+            raise CheeseRuntimeError("Saída assíncrona exige run_async",
+                                     suggestions=["await runtime.run_async(program)"])
+        return self.result
+
+    async def run_async(self, program, source_code=None, types: TypeInfo = None,
+                        slice_steps: int = DEFAULT_SLICE):
+        """
+        Executa o programa devolvendo o controle ao event loop a cada
+        `slice_steps` comandos. Saídas assíncronas são aguardadas em ordem.
+        Cancelar a tarefa interrompe a execução entre dois comandos.
+        """
+        self.start(program, source_code, types)
+        while True:
+            done = self.resume(slice_steps)
+            pending, self._pending = self._pending, []
+            for sent in pending:
+                await sent
+            if done:
+                return self.result
+            if not pending:
+                await asyncio.sleep(0)
+
 
-        for stmt in program:
-            if stmt is not None: 
-                result = self.eval(stmt)
-                results.append(result)
-        return results[-1] if results else None
\ No newline at end of file
+# Comandos avulsos (eval) e comandos dentro da pilha de blocos (resume)
+_EVAL = dispatch_table(Runtime, '_eval_', Runtime._eval_other)
+_STEP = dict(_EVAL)
+_STEP[CheeseIf] = Runtime._step_if
+_STEP[CheeseLoop] = Runtime._step_loop
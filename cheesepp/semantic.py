@@ -0,0 +1,129 @@
+"""
+Verificação semântica antes da execução.
+
+No runtime, ler uma variável nunca atribuída vale 0 em silêncio, então um
+erro de digitação no nome só aparece na saída, depois de a execução
+inteira rodar. A verificação aponta, sem executar nada:
+
+- leituras de variáveis que o programa nunca atribui (CheeseSemanticError,
+  com o nome mais parecido como sugestão);
+- leituras que podem acontecer antes da atribuição em algum caminho
+  (CheeseSemanticError);
+- conflitos de tipo da inferência (CheeseTypeError), inclusive os de ramos
+  que podem não executar, que o runtime só recusa no modo estrito.
+
+As variáveis certamente atribuídas ficam numa SymbolTable: cada ramo de
+Stilton e cada corpo de Cheddar abre um escopo, e ao fechar um Stilton
+sobem para o escopo de fora só os nomes atribuídos nos dois ramos. Como
+sair de um escopo custa o que ele definiu, a verificação é linear no
+tamanho do programa.
+"""
+from difflib import get_close_matches
+from typing import Container, List, Optional
+
+from .ast import CheeseAssign, Var
+from .ctx import SymbolTable, SymbolType
+from .errors import ERROR_MESSAGES, SUGGESTIONS, CheeseError, CheeseSemanticError
+from .inference import TypeInfo, infer_types
+from .ir import IRVisitor, iter_nodes, iter_statements
+
+# Nomes desconhecidos que recebem sugestão de nome parecido; cada sugestão
+# compara com todos os nomes do programa
+MAX_SUGGESTIONS = 10
+
+
+class SemanticChecker(IRVisitor):
+    """
+    Atribuição definida sobre o IR. `defined` são os nomes que já existem
+    antes do programa (entradas, variáveis de execuções anteriores); basta
+    aceitar `in`, então um ambiente grande é usado sem cópia.
+    """
+
+    def __init__(self, defined: Optional[Container[str]] = None):
+        self.defined = defined if defined is not None else ()
+        self.symbols = SymbolTable()
+        self.errors: List[CheeseError] = []
+        self._assigned = set()
+        self._reported = set()
+
+    def check(self, program) -> List[CheeseError]:
+        """Verifica o programa e devolve os erros, um por nome"""
+        self._assigned = {stmt.name for stmt in iter_statements(program) if type(stmt) is CheeseAssign}
+        self.visit_block(program)
+        return self.errors
+
+    def _assign(self, name: str) -> None:
+        if self.symbols.lookup(name) is None:
+            self.symbols.define(name, SymbolType.VARIABLE, None)
+
+    def read(self, expression) -> None:
+        """Confere cada variável lida pela expressão"""
+        symbols = self.symbols.symbols
+        for node in iter_nodes(expression):
+            if type(node) is Var:
+                name = node.name
+                if name not in symbols and name not in self._reported and name not in self.defined:
+                    self._report(name)
+
+    def _report(self, name: str) -> None:
+        self._reported.add(name)
+        if name in self._assigned:
+            self.errors.append(CheeseSemanticError(
+                ERROR_MESSAGES["used_before_assignment"].format(var_name=name),
+                suggestions=SUGGESTIONS["used_before_assignment"]))
+            return
+        suggestions = list(SUGGESTIONS["undefined_variable"])
+        if len(self._reported) <= MAX_SUGGESTIONS:
+            close = get_close_matches(name, self._assigned, n=1)
+            if close:
+                suggestions.insert(0, f"Did you mean '{close[0]}'?")
+        self.errors.append(CheeseSemanticError(
+            ERROR_MESSAGES["undefined_variable"].format(var_name=name), suggestions=suggestions))
+
+    def visit_assign(self, node) -> None:
+        self.read(node.value)
+        self._assign(node.name)
+
+    def visit_print(self, node) -> None:
+        self.read(node.expr)
+
+    def visit_if(self, node) -> None:
+        self.read(node.condition)
+        symbols = self.symbols
+        symbols.enter_scope()
+        self.visit_block(node.then_branch)
+        then_names = symbols.scope_names()
+        symbols.exit_scope()
+        symbols.enter_scope()
+        self.visit_block(node.else_branch)
+        else_names = set(symbols.scope_names())
+        symbols.exit_scope()
+        for name in then_names:
+            if name in else_names:
+                self._assign(name)
+
+    def visit_loop(self, node) -> None:
+        # A condição é testada antes de cada volta: o corpo pode não rodar,
+        # então o que ele atribui não vale depois do laço
+        self.read(node.condition)
+        self.symbols.enter_scope()
+        self.visit_block(node.body)
+        self.symbols.exit_scope()
+
+    def visit_binop(self, node) -> None:
+        # Expressão usada como comando
+        self.read(node)
+
+    visit_var = visit_binop
+
+
+def check_semantics(program, defined: Optional[Container[str]] = None,
+                    types: Optional[TypeInfo] = None) -> List[CheeseError]:
+    """
+    Erros semânticos e de tipo do programa, sem executá-lo. `types` evita
+    repetir a inferência quando o chamador já a fez.
+    """
+    errors = SemanticChecker(defined).check(program)
+    if types is None:
+        types = infer_types(program)
+    return errors + types.errors + types.warnings
@@ -0,0 +1,503 @@
+"""
+Formato binário compacto da AST.
+
+Um arquivo é um cabeçalho (MAGIC, versão do formato e tipo de árvore), a
+tabela de strings (nomes, operadores e textos, cada um guardado uma vez) e
+um fluxo de opcodes em pré-ordem: cada nó é um byte de opcode seguido dos
+seus operandos em varint (LEB128) e, logo depois, dos seus filhos.
+
+`dumps`/`loads` tratam a AST do runtime (ast.py). Como as expressões são
+compartilhadas (hash-consing), a segunda ocorrência de uma expressão é só
+uma referência à primeira, e `loads` reconstrói os nós pelo ConstantPool.
+`dump_tree`/`load_tree` tratam a hierarquia de node.py, com posições.
+
+As duas leituras usam uma pilha explícita, então cadeias longas de
+operações não esbarram no limite de recursão.
+"""
+import struct
+import sys
+from typing import Any, List, Optional
+
+from .ast import *
+from .errors import CheeseRuntimeError
+from .node import *
+from .transformer import ConstantPool
+
+MAGIC = b'CHB'
+FORMAT_VERSION = 1
+
+KIND_PROGRAM = 0
+KIND_TREE = 1
+
+# Opcodes da AST do runtime
+OP_LIST = 0       # n, e n itens (lista de comandos)
+OP_NONE = 1       # comando vazio (';' ou Brie)
+OP_ASSIGN = 2     # nome, expressão
+OP_PRINT = 3      # expressão
+OP_IF = 4         # condição, lista então, lista senão
+OP_LOOP = 5       # lista corpo, condição
+OP_BELGIAN = 6
+OP_BINOP = 7      # operador, esquerda, direita
+OP_INT = 8        # inteiro em zigzag
+OP_FLOAT = 9      # double de 8 bytes
+OP_STRING = 10    # string
+OP_VAR = 11       # nome
+OP_REF = 12       # índice de uma expressão já lida
+OP_TEXT = 13      # texto solto (por exemplo, o código-fonte de um Program)
+
+# Opcodes de node.py; o bit alto indica que linha e coluna vêm em seguida
+N_PROGRAM = 0     # n filhos
+N_BLOCK = 1       # n filhos
+N_ASSIGN = 2      # variável, tipo de atribuição, valor
+N_BINARY = 3      # operador, esquerda, direita
+N_UNARY = 4       # operador, operando
+N_VARIABLE = 5    # nome
+N_LITERAL = 6     # tipo do literal, valor marcado
+N_CALL = 7        # nome, n argumentos
+N_CONDITIONAL = 8 # tem senão, condição, então[, senão]
+N_LOOP = 9        # tipo do laço, corpo, condição
+N_PRINT = 10      # expressão
+N_DEBUG = 11
+HAS_POSITION = 0x80
+
+# Marcas dos valores de LiteralNode
+V_NONE, V_FALSE, V_TRUE, V_INT, V_FLOAT, V_STRING = range(6)
+
+_double = struct.Struct('<d')
+
+
+class _Writer:
+    """Fluxo de opcodes com a tabela de strings que ele usa"""
+
+    def __init__(self):
+        self.out = bytearray()
+        self.strings = {}
+
+    def uint(self, n: int) -> None:
+        out = self.out
+        while n >= 0x80:
+            out.append((n & 0x7F) | 0x80)
+            n >>= 7
+        out.append(n)
+
+    def int(self, n: int) -> None:
+        self.uint(n << 1 if n >= 0 else ((-n) << 1) - 1)
+
+    def string(self, text: str) -> None:
+        index = self.strings.get(text)
+        if index is None:
+            index = self.strings[text] = len(self.strings)
+        self.uint(index)
+
+    def finish(self, kind: int) -> bytes:
+        table = _Writer()
+        table.uint(len(self.strings))
+        for text in self.strings:
+            raw = text.encode('utf-8')
+            table.uint(len(raw))
+            table.out += raw
+        return MAGIC + bytes((FORMAT_VERSION, kind)) + table.out + self.out
+
+
+def _uint(data: bytes, pos: int):
+    n = data[pos]
+    pos += 1
+    if n < 0x80:
+        return n, pos
+    n &= 0x7F
+    shift = 7
+    while True:
+        byte = data[pos]
+        pos += 1
+        n |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return n, pos
+        shift += 7
+
+
+def _int(data: bytes, pos: int):
+    n, pos = _uint(data, pos)
+    return (n >> 1) if not n & 1 else -((n + 1) >> 1), pos
+
+
+def _header(data: bytes, kind: int):
+    """Confere o cabeçalho e lê a tabela de strings"""
+    if data[:3] != MAGIC:
+        raise CheeseRuntimeError("Não é uma AST binária do Cheese++")
+    if data[3] != FORMAT_VERSION:
+        raise CheeseRuntimeError(f"Versão de AST binária não suportada: {data[3]}")
+    if data[4] != kind:
+        raise CheeseRuntimeError("A AST binária é de outro tipo de árvore")
+    count, pos = _uint(data, 5)
+    strings = []
+    for _ in range(count):
+        size, pos = _uint(data, pos)
+        end = pos + size
+        if end > len(data):
+            raise IndexError("tabela de strings truncada")
+        # Nomes internados, como os do parser
+        strings.append(sys.intern(data[pos:end].decode('utf-8')))
+        pos = end
+    return strings, pos
+
+
+def _corrupted(error: Exception) -> CheeseRuntimeError:
+    return CheeseRuntimeError(f"AST binária corrompida: {error}",
+                              suggestions=["Gere o arquivo de novo a partir do código-fonte"])
+
+
+def dumps(*roots) -> bytes:
+    """
+    Codifica listas de comandos, comandos, expressões ou textos da AST do
+    runtime. Expressões compartilhadas são escritas uma única vez.
+    """
+    writer = _Writer()
+    out = writer.out
+    refs = {}
+    writer.uint(len(roots))
+    stack = list(reversed(roots))
+    while stack:
+        item = stack.pop()
+        kind = type(item)
+        if kind is BinOp or kind is Var or kind is Number or kind is String:
+            ref = refs.get(item)
+            if ref is not None:
+                out.append(OP_REF)
+                writer.uint(ref)
+                continue
+            refs[item] = len(refs)
+            if kind is BinOp:
+                out.append(OP_BINOP)
+                writer.string(item.op)
+                stack.append(item.right)
+                stack.append(item.left)
+            elif kind is Var:
+                out.append(OP_VAR)
+                writer.string(item.name)
+            elif kind is String:
+                out.append(OP_STRING)
+                writer.string(item.value)
+            elif type(item.value) is int:
+                out.append(OP_INT)
+                writer.int(item.value)
+            elif type(item.value) is float:
+                out.append(OP_FLOAT)
+                out += _double.pack(item.value)
+            else:
+                raise TypeError(f"Número não serializável: {item.value!r}")
+        elif kind is list:
+            out.append(OP_LIST)
+            writer.uint(len(item))
+            stack.extend(reversed(item))
+        elif item is None:
+            out.append(OP_NONE)
+        elif kind is CheeseAssign:
+            out.append(OP_ASSIGN)
+            writer.string(item.name)
+            stack.append(item.value)
+        elif kind is CheesePrint:
+            out.append(OP_PRINT)
+            stack.append(item.expr)
+        elif kind is CheeseIf:
+            out.append(OP_IF)
+            stack.append(item.else_branch)
+            stack.append(item.then_branch)
+            stack.append(item.condition)
+        elif kind is CheeseLoop:
+            out.append(OP_LOOP)
+            stack.append(item.condition)
+            stack.append(item.body)
+        elif kind is Belgian:
+            out.append(OP_BELGIAN)
+        elif kind is str:
+            out.append(OP_TEXT)
+            writer.string(item)
+        else:
+            raise TypeError(f"Nó não serializável: {kind.__name__}")
+    return writer.finish(KIND_PROGRAM)
+
+
+# Quantos itens cada opcode composto espera
+_ARITY = {OP_ASSIGN: 1, OP_PRINT: 1, OP_IF: 3, OP_LOOP: 2, OP_BINOP: 2}
+
+
+def loads(data: bytes, pool: Optional[ConstantPool] = None) -> List[Any]:
+    """
+    Decodifica o que `dumps` gravou e devolve a lista das raízes. As
+    expressões passam por `pool`, então voltam compartilhadas.
+    """
+    try:
+        return _loads(data, pool if pool is not None else ConstantPool())
+    except (IndexError, KeyError, UnicodeDecodeError, struct.error) as e:
+        raise _corrupted(e)
+
+
+def _loads(data: bytes, pool: ConstantPool) -> List[Any]:
+    strings, pos = _header(data, KIND_PROGRAM)
+    count, pos = _uint(data, pos)
+    number, var, string, binop = pool.number, pool.var, pool.string, pool.binop
+    unpack = _double.unpack_from
+    exprs = []
+    roots = []
+    # Cada quadro: [opcode, itens esperados, itens lidos, operando, posição em exprs]
+    frames = [[OP_LIST, count, roots, None, None]]
+    items = roots
+    while True:
+        frame = frames[-1]
+        if len(frame[2]) == frame[1]:
+            frames.pop()
+            op, _, done, operand, slot = frame
+            if op == OP_BINOP:
+                value = exprs[slot] = binop(done[0], operand, done[1])
+            elif op == OP_LIST:
+                value = done
+            elif op == OP_ASSIGN:
+                value = CheeseAssign(operand, done[0])
+            elif op == OP_PRINT:
+                value = CheesePrint(done[0])
+            elif op == OP_IF:
+                value = CheeseIf(done[0], done[1], done[2])
+            else:
+                value = CheeseLoop(done[0], done[1])
+            if not frames:
+                break
+            items = frames[-1][2]
+            items.append(value)
+            continue
+
+        op = data[pos]
+        pos += 1
+        if op == OP_REF:
+            index, pos = _uint(data, pos)
+            value = exprs[index]
+        elif op == OP_VAR:
+            index, pos = _uint(data, pos)
+            value = var(strings[index])
+            exprs.append(value)
+        elif op == OP_INT:
+            n, pos = _int(data, pos)
+            value = number(n)
+            exprs.append(value)
+        elif op == OP_BINOP:
+            index, pos = _uint(data, pos)
+            frames.append([OP_BINOP, 2, [], strings[index], len(exprs)])
+            exprs.append(None)
+            items = frames[-1][2]
+            continue
+        elif op == OP_LIST:
+            n, pos = _uint(data, pos)
+            frames.append([OP_LIST, n, [], None, None])
+            items = frames[-1][2]
+            continue
+        elif op == OP_ASSIGN:
+            index, pos = _uint(data, pos)
+            frames.append([OP_ASSIGN, 1, [], strings[index], None])
+            items = frames[-1][2]
+            continue
+        elif op in _ARITY:
+            frames.append([op, _ARITY[op], [], None, None])
+            items = frames[-1][2]
+            continue
+        elif op == OP_NONE:
+            value = None
+        elif op == OP_STRING:
+            index, pos = _uint(data, pos)
+            value = string(strings[index])
+            exprs.append(value)
+        elif op == OP_FLOAT:
+            value = number(unpack(data, pos)[0])
+            pos += 8
+            exprs.append(value)
+        elif op == OP_BELGIAN:
+            value = Belgian()
+        elif op == OP_TEXT:
+            index, pos = _uint(data, pos)
+            value = strings[index]
+        else:
+            raise KeyError(f"opcode desconhecido {op}")
+        items.append(value)
+
+    if pos != len(data):
+        raise _corrupted(ValueError(f"{len(data) - pos} bytes sobrando"))
+    return roots
+
+
+_NODE_OPS = {
+    ProgramNode: N_PROGRAM, BlockNode: N_BLOCK, AssignmentNode: N_ASSIGN,
+    BinaryOpNode: N_BINARY, UnaryOpNode: N_UNARY, VariableNode: N_VARIABLE,
+    LiteralNode: N_LITERAL, FunctionCallNode: N_CALL, ConditionalNode: N_CONDITIONAL,
+    LoopNode: N_LOOP, PrintNode: N_PRINT, DebugNode: N_DEBUG,
+}
+
+
+def _write_value(writer: _Writer, value: Any) -> None:
+    out = writer.out
+    if value is None:
+        out.append(V_NONE)
+    elif value is False or value is True:
+        out.append(V_TRUE if value else V_FALSE)
+    elif type(value) is int:
+        out.append(V_INT)
+        writer.int(value)
+    elif type(value) is float:
+        out.append(V_FLOAT)
+        out += _double.pack(value)
+    elif type(value) is str:
+        out.append(V_STRING)
+        writer.string(value)
+    else:
+        raise TypeError(f"Literal não serializável: {value!r}")
+
+
+def dump_tree(node: ASTNode) -> bytes:
+    """Codifica uma árvore de node.py, com posições e atributos de cada nó"""
+    writer = _Writer()
+    out = writer.out
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        op = _NODE_OPS.get(type(current))
+        if op is None:
+            raise TypeError(f"Nó não serializável: {type(current).__name__}")
+        position = current.position
+        out.append(op | HAS_POSITION if position is not None else op)
+        if position is not None:
+            writer.int(position.line)
+            writer.int(position.column)
+
+        if op == N_ASSIGN:
+            writer.string(current.variable)
+            writer.string(current.assignment_type)
+        elif op == N_BINARY or op == N_UNARY:
+            writer.string(current.operator)
+        elif op == N_VARIABLE:
+            writer.string(current.name)
+        elif op == N_LITERAL:
+            writer.string(current.literal_type)
+            _write_value(writer, current.value)
+        elif op == N_CALL:
+            writer.string(current.name)
+            writer.uint(len(current.arguments))
+        elif op == N_CONDITIONAL:
+            out.append(current.else_branch is not None)
+        elif op == N_LOOP:
+            writer.string(current.loop_type)
+        elif op == N_PROGRAM or op == N_BLOCK:
+            writer.uint(len(current.children))
+        stack.extend(reversed(current.children))
+    return writer.finish(KIND_TREE)
+
+
+def load_tree(data: bytes) -> ASTNode:
+    """Decodifica o que `dump_tree` gravou"""
+    try:
+        return _load_tree(data)
+    except (IndexError, KeyError, UnicodeDecodeError, struct.error) as e:
+        raise _corrupted(e)
+
+
+def _read_value(data: bytes, pos: int, strings: List[str]):
+    tag = data[pos]
+    pos += 1
+    if tag == V_INT:
+        return _int(data, pos)
+    if tag == V_STRING:
+        index, pos = _uint(data, pos)
+        return strings[index], pos
+    if tag == V_FLOAT:
+        return _double.unpack_from(data, pos)[0], pos + 8
+    if tag in (V_NONE, V_FALSE, V_TRUE):
+        return (None, False, True)[tag], pos
+    raise KeyError(f"marca de literal desconhecida {tag}")
+
+
+def _build(op: int, children: List[ASTNode], operands: tuple, position) -> ASTNode:
+    if op == N_BINARY:
+        return BinaryOpNode(children[0], operands[0], children[1], position)
+    if op == N_PROGRAM:
+        return ProgramNode(children, position)
+    if op == N_BLOCK:
+        return BlockNode(children, position)
+    if op == N_ASSIGN:
+        return AssignmentNode(operands[0], children[0], operands[1], position)
+    if op == N_UNARY:
+        return UnaryOpNode(operands[0], children[0], position)
+    if op == N_CALL:
+        return FunctionCallNode(operands[0], children, position)
+    if op == N_CONDITIONAL:
+        return ConditionalNode(children[0], children[1], children[2] if len(children) > 2 else None,
+                               position)
+    if op == N_LOOP:
+        return LoopNode(children[0], children[1], operands[0], position)
+    return PrintNode(children[0], position)
+
+
+def _load_tree(data: bytes) -> ASTNode:
+    strings, pos = _header(data, KIND_TREE)
+    root: List[ASTNode] = []
+    # Cada quadro: [opcode, filhos esperados, filhos lidos, operandos, posição]
+    frames = [[None, 1, root, None, None]]
+    while True:
+        frame = frames[-1]
+        if len(frame[2]) == frame[1]:
+            frames.pop()
+            if not frames:
+                break
+            op, _, children, operands, position = frame
+            frames[-1][2].append(_build(op, children, operands, position))
+            continue
+
+        byte = data[pos]
+        pos += 1
+        op = byte & ~HAS_POSITION
+        position = None
+        if byte & HAS_POSITION:
+            line, pos = _int(data, pos)
+            column, pos = _int(data, pos)
+            position = Position(line, column)
+
+        if op == N_VARIABLE:
+            index, pos = _uint(data, pos)
+            frame[2].append(VariableNode(strings[index], position))
+            continue
+        if op == N_LITERAL:
+            index, pos = _uint(data, pos)
+            value, pos = _read_value(data, pos, strings)
+            frame[2].append(LiteralNode(value, strings[index], position))
+            continue
+        if op == N_DEBUG:
+            frame[2].append(DebugNode(position))
+            continue
+
+        operands = ()
+        if op == N_BINARY or op == N_UNARY:
+            index, pos = _uint(data, pos)
+            operands = (strings[index],)
+            arity = 2 if op == N_BINARY else 1
+        elif op == N_ASSIGN:
+            variable, pos = _uint(data, pos)
+            assignment_type, pos = _uint(data, pos)
+            operands = (strings[variable], strings[assignment_type])
+            arity = 1
+        elif op == N_CALL:
+            index, pos = _uint(data, pos)
+            operands = (strings[index],)
+            arity, pos = _uint(data, pos)
+        elif op == N_CONDITIONAL:
+            arity = 3 if data[pos] else 2
+            pos += 1
+        elif op == N_LOOP:
+            index, pos = _uint(data, pos)
+            operands = (strings[index],)
+            arity = 2
+        elif op == N_PRINT:
+            arity = 1
+        elif op == N_PROGRAM or op == N_BLOCK:
+            arity, pos = _uint(data, pos)
+        else:
+            raise KeyError(f"opcode desconhecido {op}")
+        frames.append([op, arity, [], operands, position])
+
+    if pos != len(data):
+        raise _corrupted(ValueError(f"{len(data) - pos} bytes sobrando"))
+    return root[0]
@@ -0,0 +1,367 @@
+import asyncio
+import hashlib
+import json
+import math
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+from .errors import CheeseError
+from .memo import ResultCache
+from .program import Program
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+
+DEFAULT_TIME_LIMIT = 5.0
+DEFAULT_MEMORY_LIMIT = 256  # MB além do que o processo já usa
+DEFAULT_CACHE_SIZE = 128
+DEFAULT_RESULT_CACHE_SIZE = 1024
+
+# Programas já compilados em cada processo de trabalho, por hash do código
+_programs: "OrderedDict[str, Program]" = OrderedDict()
+_cache_size = DEFAULT_CACHE_SIZE
+# Resultados de programas puros (ver memo.py); None desliga
+_results: Optional[ResultCache] = ResultCache(max_size=DEFAULT_RESULT_CACHE_SIZE)
+
+
+def source_hash(source: str) -> str:
+    """Chave do cache de programas compilados"""
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+
+def _init_worker(cache_size: int, result_cache_size: int = DEFAULT_RESULT_CACHE_SIZE,
+                 result_ttl: Optional[float] = None, result_cache_dir: Optional[str] = None) -> None:
+    """Aquece o processo: importa o parser e compila um programa vazio"""
+    global _cache_size, _results
+    _cache_size = cache_size
+    _results = None
+    if result_cache_size > 0:
+        _results = ResultCache(max_size=result_cache_size, ttl=result_ttl, path=result_cache_dir)
+    Program("Cheese NoCheese")
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _virtual_memory() -> int:
+    """Memória virtual atual do processo em bytes (0 se desconhecida)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+@contextmanager
+def memory_limit(megabytes: Optional[float]):
+    """
+    Limita a memória que o processo pode alocar durante o bloco.
+    O limite é somado ao uso atual, já que o interpretador e o parser ocupam
+    espaço antes da requisição começar.
+    """
+    if resource is None or not megabytes:
+        yield
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_AS)
+    limit = _virtual_memory() + int(megabytes * 1024 * 1024)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+    try:
+        yield
+    finally:
+        resource.setrlimit(resource.RLIMIT_AS, (soft, hard))
+
+
+def _compiled(source: str):
+    """Program do cache do processo, compilando se necessário"""
+    key = source_hash(source)
+    program = _programs.get(key)
+    if program is not None:
+        _programs.move_to_end(key)
+        return program, True
+    program = Program(source)
+    _programs[key] = program
+    if len(_programs) > _cache_size:
+        _programs.popitem(last=False)
+    return program, False
+
+
+def _error(error: BaseException) -> Dict[str, Any]:
+    if isinstance(error, CheeseError):
+        kind = error.error_info.error_type.value
+        message = error.error_info.message
+    else:
+        kind = type(error).__name__
+        message = str(error) or kind
+    return {'ok': False, 'error': {'type': kind, 'message': message}}
+
+
+def encode_response(response: Dict[str, Any]) -> bytes:
+    """
+    Linha JSON da resposta. Valores sem JSON válido (inteiros longos demais
+    para virar texto, NaN e infinitos) viram uma resposta de erro.
+    """
+    try:
+        text = json.dumps(response, allow_nan=False)
+    except (TypeError, ValueError) as e:
+        error = _error(ValueError(f"Resultado não pode virar JSON: {e}"))
+        if 'timing' in response:
+            error['timing'] = response['timing']
+        text = json.dumps(error)
+    return text.encode('utf-8') + b'\n'
+
+
+def request_limit(request: Dict[str, Any], key: str, default: Optional[float]) -> Optional[float]:
+    """
+    Limite pedido em `key`, no máximo `default` (o do servidor). Ausente ou
+    null vale `default`; qualquer outra coisa precisa ser um número positivo.
+    """
+    value = request.get(key)
+    if value is None:
+        return default
+    if type(value) not in (int, float) or not math.isfinite(value) or value <= 0:
+        raise ValueError(f"Campo '{key}' deve ser um número positivo")
+    if default and value > default:
+        return default
+    return value
+
+
+def _terminate(pool: ProcessPoolExecutor) -> None:
+    """Encerra o pool sem esperar: os processos são terminados na hora"""
+    # ProcessPoolExecutor não expõe os processos nem um jeito de matá-los
+    processes = list((getattr(pool, '_processes', None) or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+
+
+def execute_request(source: str, inputs: Optional[Dict[str, Any]] = None,
+                    time_limit: Optional[float] = DEFAULT_TIME_LIMIT,
+                    memory: Optional[float] = DEFAULT_MEMORY_LIMIT) -> Dict[str, Any]:
+    """
+    Compila (ou reaproveita) e executa um programa dentro de um processo de trabalho.
+
+    Retorna:
+        Dicionário pronto para virar a resposta JSON
+    """
+    start = time.perf_counter()
+    try:
+        with memory_limit(memory):
+            program, cached = _compiled(source)
+            compiled = time.perf_counter()
+            if _results is None:
+                result = program.run(inputs, time_limit=time_limit)
+                memoized = False
+            else:
+                hits = _results.hits
+                result = _results.run(program, inputs, time_limit=time_limit)
+                memoized = _results.hits > hits
+    except MemoryError:
+        return _error(MemoryError(f"Limite de memória excedido ({memory} MB)"))
+    except Exception as e:
+        return _error(e)
+    finished = time.perf_counter()
+    return {
+        'ok': True,
+        'output': result.output,
+        'env': result.env,
+        'value': result.value if isinstance(result.value, (int, float, str, bool)) else None,
+        'timing': {
+            'cached': cached,
+            'memoized': memoized,
+            'compile': compiled - start,
+            'run': finished - compiled,
+        },
+    }
+
+
+class CheeseServer:
+    """
+    Servidor de execução do Cheese++.
+
+    Recebe uma requisição JSON por linha ({"source": ..., "inputs": {...}}) em
+    um socket local e responde com a saída, o ambiente final e os tempos. Os
+    programas rodam em um pool de processos já aquecidos, cada um com o seu
+    cache de programas compilados e limites de tempo e memória por requisição.
+    Programas puros repetidos com as mesmas entradas são respondidos pelo
+    cache de resultados (memo.py): em memória em cada processo ou, com
+    `result_cache_dir`, num diretório dividido por todos eles.
+
+    O limite de tempo do runtime só é verificado entre comandos; um comando
+    que trava (uma multiplicação enorme, por exemplo) passa do prazo com o
+    processo ainda ocupado. Nesse caso o pool é trocado por um novo, e o
+    antigo é terminado assim que as outras requisições dele acabam.
+    """
+
+    def __init__(self, workers: Optional[int] = None,
+                 time_limit: Optional[float] = DEFAULT_TIME_LIMIT,
+                 memory_limit: Optional[float] = DEFAULT_MEMORY_LIMIT,
+                 cache_size: int = DEFAULT_CACHE_SIZE,
+                 result_cache_size: int = DEFAULT_RESULT_CACHE_SIZE,
+                 result_ttl: Optional[float] = None,
+                 result_cache_dir: Optional[str] = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.time_limit = time_limit
+        self.memory_limit = memory_limit
+        self.cache_size = cache_size
+        self.result_cache_size = result_cache_size
+        self.result_ttl = result_ttl
+        self.result_cache_dir = result_cache_dir
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.requests = 0
+        # Pools trocados por estouro de prazo e requisições em andamento por pool
+        self.recycled = 0
+        self._running: Dict[ProcessPoolExecutor, int] = {}
+        self._retired = set()
+
+    def _create_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                   initargs=(self.cache_size, self.result_cache_size,
+                                             self.result_ttl, self.result_cache_dir))
+
+    def _recycle(self, pool: ProcessPoolExecutor) -> None:
+        """Troca o pool de um processo que passou do prazo por um novo"""
+        if pool is not self.pool:
+            return
+        self.pool = self._create_pool()
+        self.recycled += 1
+        self._retired.add(pool)
+
+    def _release(self, pool: ProcessPoolExecutor) -> None:
+        """Fim de uma requisição; um pool trocado e sem requisições é terminado"""
+        self._running[pool] -= 1
+        if not self._running[pool]:
+            del self._running[pool]
+            if pool in self._retired:
+                self._retired.discard(pool)
+                _terminate(pool)
+
+    async def start(self, socket_path: Optional[str] = None,
+                    host: str = '127.0.0.1', port: int = 0) -> asyncio.AbstractServer:
+        """Sobe o pool de processos e começa a aceitar conexões"""
+        self.pool = self._create_pool()
+        loop = asyncio.get_running_loop()
+        # Força a criação de todos os processos antes da primeira requisição
+        await asyncio.gather(*(loop.run_in_executor(self.pool, _ping)
+                               for _ in range(self.workers)))
+        if socket_path:
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+            self.server = await asyncio.start_unix_server(self.handle, path=socket_path)
+        else:
+            self.server = await asyncio.start_server(self.handle, host, port)
+        return self.server
+
+    async def close(self) -> None:
+        """Para de aceitar conexões e encerra os processos de trabalho"""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+        for pool in self._retired:
+            _terminate(pool)
+        self._retired.clear()
+
+    async def serve_forever(self) -> None:
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Atende uma conexão: uma requisição por linha até o cliente fechar"""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except ValueError as e:
+                    response = _error(ValueError(f"JSON inválido: {e}"))
+                else:
+                    try:
+                        response = await self.execute(request)
+                    except Exception as e:
+                        response = _error(e)
+                writer.write(encode_response(response))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def execute(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Executa uma requisição já decodificada no pool de processos"""
+        start = time.perf_counter()
+        source = request.get('source') if isinstance(request, dict) else None
+        if not isinstance(source, str):
+            return _error(ValueError("Campo 'source' ausente"))
+        inputs = request.get('inputs') or {}
+        if not isinstance(inputs, dict):
+            return _error(ValueError("Campo 'inputs' deve ser um objeto"))
+        try:
+            time_limit = request_limit(request, 'time_limit', self.time_limit)
+            memory = request_limit(request, 'memory_limit', self.memory_limit)
+        except ValueError as e:
+            return _error(e)
+
+        self.requests += 1
+        pool = self.pool
+        self._running[pool] = self._running.get(pool, 0) + 1
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(pool, execute_request,
+                                      source, inputs, time_limit, memory)
+        try:
+            # Margem para o caso de o programa travar fora de um loop
+            timeout = time_limit + 1.0 if time_limit is not None else None
+            response = await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            # O processo continua preso no comando: o pool é trocado
+            self._recycle(pool)
+            response = _error(TimeoutError(f"Tempo limite excedido ({time_limit}s)"))
+        except Exception as e:
+            response = _error(e)
+        finally:
+            self._release(pool)
+        response.setdefault('timing', {})['total'] = time.perf_counter() - start
+        return response
+
+    def __repr__(self):
+        return (f"CheeseServer(workers={self.workers}, requests={self.requests}, "
+                f"recycled={self.recycled})")
+
+
+async def request(payload: Dict[str, Any], socket_path: Optional[str] = None,
+                  host: str = '127.0.0.1', port: int = 0) -> Dict[str, Any]:
+    """Cliente simples: envia uma requisição em uma conexão nova e espera a resposta"""
+    if socket_path:
+        reader, writer = await asyncio.open_unix_connection(socket_path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(json.dumps(payload).encode('utf-8') + b'\n')
+        await writer.drain()
+        return json.loads(await reader.readline())
+    finally:
+        writer.close()
+
+
+async def serve(socket_path: Optional[str] = None, host: str = '127.0.0.1', port: int = 7878,
+                **options) -> None:
+    """Sobe um CheeseServer e atende até ser interrompido"""
+    server = CheeseServer(**options)
+    await server.start(socket_path, host, port)
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
@@ -0,0 +1,124 @@
+"""
+Sessão interativa do Cheese++.
+
+Uma Session guarda o estado entre entradas do REPL: o ambiente do runtime,
+o pool de constantes, a forma pós-fixa das expressões já compiladas e um
+cache texto → programa. Cada entrada pode ser um programa completo
+(Cheese ... NoCheese) ou comandos soltos, e custa proporcional a ela mesma,
+não ao número de variáveis que a sessão já acumulou.
+"""
+import re
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Any, Mapping, Optional, Tuple
+
+from .ast import CheeseAssign
+from .ctx import CheeseContext
+from .errors import CheeseError, ErrorReporter
+from .ir import iter_statements
+from .parser import parse, parse_statements
+from .runtime import Runtime
+from .transformer import ConstantPool
+
+# Quantas entradas diferentes ficam compiladas
+DEFAULT_CACHE_SIZE = 256
+
+_PROGRAM = re.compile(r'Cheese\b')
+
+
+class Session:
+    """
+    Estado persistente de uma sessão interativa.
+
+    O runtime é o mesmo de uma entrada para a outra, então as variáveis e o
+    cache de código pós-fixo continuam quentes; o pool compartilhado faz uma
+    expressão repetida em outra entrada ser o mesmo nó e reaproveitar o
+    código já compilado. O contexto recebe, por entrada, só as variáveis que
+    ela atribui e os contadores dela.
+    """
+
+    def __init__(self, context: Optional[CheeseContext] = None,
+                 cache_size: int = DEFAULT_CACHE_SIZE):
+        self.context = context if context is not None else CheeseContext()
+        self.pool = ConstantPool()
+        self.cache_size = cache_size
+        self._compiled: "OrderedDict[str, Tuple[list, tuple]]" = OrderedDict()
+        # Entradas que não precisaram ser analisadas de novo
+        self.hits = 0
+        self.runtime = self._new_runtime()
+
+    def _new_runtime(self, code=None) -> Runtime:
+        # Sem o contexto no runtime: _record entrega as variáveis e os
+        # contadores de cada entrada, com os nomes já guardados no cache
+        runtime = Runtime(output=self.context.execution_context.add_output)
+        if code is not None:
+            runtime.code = code
+        return runtime
+
+    @property
+    def variables(self) -> Mapping[str, Any]:
+        """Visão só de leitura das variáveis da sessão, sem cópia"""
+        return MappingProxyType(self.runtime.env)
+
+    def compile(self, code: str) -> Tuple[list, tuple]:
+        """
+        Programa da entrada e os nomes que ela atribui, do cache se a mesma
+        entrada já foi vista.
+        """
+        entry = self._compiled.get(code)
+        if entry is not None:
+            self._compiled.move_to_end(code)
+            self.hits += 1
+            return entry
+        program = self._parse(code)
+        names = tuple(dict.fromkeys(stmt.name for stmt in iter_statements(program)
+                                    if type(stmt) is CheeseAssign))
+        entry = (program, names)
+        self._compiled[code] = entry
+        if len(self._compiled) > self.cache_size:
+            self._compiled.popitem(last=False)
+        return entry
+
+    def _parse(self, code: str) -> list:
+        """
+        Programa da entrada; erros de sintaxe viram CheeseSyntaxError (ou
+        CheeseLexicalError) com a linha e a coluna na própria entrada
+        """
+        text = code.strip()
+        if _PROGRAM.match(text):
+            reporter = ErrorReporter()
+            program = parse(text, self.pool, reporter)
+            if reporter.has_errors():
+                raise reporter.errors[0]
+            return program
+        try:
+            return parse_statements(text, self.pool)
+        except CheeseError as error:
+            # Comando digitado sem o ';' final
+            try:
+                return parse_statements(text + ';', self.pool)
+            except CheeseError:
+                raise error
+
+    def execute(self, code: str) -> Any:
+        """Compila (ou pega do cache) e executa uma entrada"""
+        program, names = self.compile(code)
+        runtime = self.runtime
+        before = runtime.counters()
+        self.context.execution_context.set_source_code(code)
+        try:
+            return runtime.run(program, code)
+        finally:
+            self._record(before, names)
+
+    def _record(self, before: tuple, names: tuple) -> None:
+        steps, tests, calls, silent = (now - then for now, then in zip(self.runtime.counters(), before))
+        env = self.runtime.env
+        changed = {name: env[name] for name in names if name in env}
+        self.context.record_run(changed, statements=steps,
+                                expressions=steps + tests - silent, calls=calls)
+
+    def reset(self) -> None:
+        """Apaga variáveis e estatísticas; o código compilado continua valendo"""
+        self.context.reset()
+        self.runtime = self._new_runtime(self.runtime.code)
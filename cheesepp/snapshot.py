@@ -0,0 +1,193 @@
+import hashlib
+import json
+import os
+import signal
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .errors import CheeseRuntimeError
+from .runtime import Runtime
+
+SNAPSHOT_VERSION = 1
+
+# Comandos executados entre duas verificações de sinal
+POLL_STEPS = 1000
+
+
+def _source_hash(source: Optional[str]) -> Optional[str]:
+    if source is None:
+        return None
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+
+@dataclass
+class Snapshot:
+    """
+    Estado de uma execução interrompida: ambiente, posição em cada bloco
+    aberto (programa, ramos de Stilton e corpos de Cheddar), resultado parcial
+    e as linhas impressas que ainda não foram entregues.
+    """
+    env: Dict[str, Any]
+    frames: List[Tuple[str, int]]
+    result: Any = None
+    steps: int = 0
+    output: List[str] = field(default_factory=list)
+    source_hash: Optional[str] = None
+
+    @classmethod
+    def capture(cls, runtime: Runtime, pending_output=()) -> "Snapshot":
+        """Copia o estado atual do runtime"""
+        return cls(env=runtime.env.copy(), frames=runtime.frame_path(), result=runtime.result,
+                   steps=runtime.steps, output=list(pending_output),
+                   source_hash=_source_hash(runtime.last_source))
+
+    def restore(self, runtime: Runtime, program, source_code=None, types=None) -> None:
+        """Prepara `runtime` para continuar a execução a partir deste snapshot"""
+        if self.source_hash is not None and source_code is not None \
+                and _source_hash(source_code) != self.source_hash:
+            raise CheeseRuntimeError("O snapshot foi gerado por outro programa",
+                                     suggestions=["Apague o arquivo de checkpoint"])
+        runtime.env = dict(self.env)
+        runtime.start(program, source_code, types)
+        runtime.restore_frames(program, self.frames)
+        runtime.result = self.result
+        runtime.steps = self.steps
+
+    def to_bytes(self) -> bytes:
+        data = {
+            'version': SNAPSHOT_VERSION,
+            'env': self.env,
+            'frames': self.frames,
+            'result': self.result if isinstance(self.result, (int, float, str, bool)) else None,
+            'steps': self.steps,
+            'output': self.output,
+            'source': self.source_hash,
+        }
+        return zlib.compress(json.dumps(data, separators=(',', ':')).encode('utf-8'))
+
+    @classmethod
+    def from_bytes(cls, raw: bytes) -> "Snapshot":
+        try:
+            data = json.loads(zlib.decompress(raw))
+        except (zlib.error, ValueError) as e:
+            raise CheeseRuntimeError(f"Snapshot corrompido: {e}")
+        if data.get('version') != SNAPSHOT_VERSION:
+            raise CheeseRuntimeError(f"Versão de snapshot não suportada: {data.get('version')}")
+        return cls(env=data['env'], frames=[tuple(f) for f in data['frames']],
+                   result=data['result'], steps=data['steps'], output=data['output'],
+                   source_hash=data['source'])
+
+    def save(self, path: str) -> None:
+        """Grava o snapshot de forma atômica (arquivo temporário + rename)"""
+        temp = f"{path}.tmp"
+        with open(temp, 'wb') as f:
+            f.write(self.to_bytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "Snapshot":
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+
+class Checkpointer:
+    """
+    Executa um programa gravando snapshots em `path`.
+
+    Um snapshot é gravado a cada `every` comandos e sempre que chega um dos
+    `signals`; SIGTERM e SIGINT gravam e interrompem a execução. As linhas
+    impressas ficam num buffer: nos snapshots periódicos o buffer é entregue
+    antes de gravar, e na interrupção ele vai dentro do snapshot para ser
+    entregue na retomada. Se `path` já existe, a execução continua de onde
+    parou; ao terminar, o arquivo é apagado. Sem `every`, a saída fica no
+    buffer até o próximo sinal ou até o fim.
+    """
+
+    STOP_SIGNALS = (signal.SIGTERM, signal.SIGINT)
+
+    def __init__(self, path: str, every: Optional[int] = None,
+                 output: Optional[Callable[[str], Any]] = None,
+                 signals=None):
+        self.path = path
+        self.every = every
+        self.output = output if output is not None else print
+        if signals is None:
+            signals = self.STOP_SIGNALS + ((signal.SIGUSR1,) if hasattr(signal, 'SIGUSR1') else ())
+        self.signals = tuple(signals)
+        self.buffer: List[str] = []
+        self.saved = 0
+        self.resumed = False
+        self.interrupted = False
+        self._requested = None
+
+    def _on_signal(self, signum, frame) -> None:
+        self._requested = signum
+
+    def _flush(self) -> None:
+        lines = list(self.buffer)
+        # Limpa no lugar: o runtime continua escrevendo na mesma lista
+        self.buffer.clear()
+        for line in lines:
+            self.output(line)
+
+    def checkpoint(self, runtime: Runtime, stop: bool = False) -> None:
+        """
+        Grava o estado atual. Ao parar, a saída pendente vai no snapshot;
+        caso contrário é entregue antes da gravação.
+        """
+        if not stop:
+            self._flush()
+        Snapshot.capture(runtime, self.buffer).save(self.path)
+        self.saved += 1
+
+    def run(self, program, source_code=None, runtime: Optional[Runtime] = None):
+        """
+        Executa (ou retoma) o programa.
+
+        Retorna:
+            O resultado do programa, ou None se foi interrompido por sinal
+        """
+        runtime = runtime or Runtime()
+        runtime.output = self.buffer.append
+        if os.path.exists(self.path):
+            snapshot = Snapshot.load(self.path)
+            snapshot.restore(runtime, program, source_code)
+            self.resumed = True
+            # Saída que já estava pendente quando o snapshot foi gravado
+            for line in snapshot.output:
+                self.output(line)
+        else:
+            runtime.start(program, source_code)
+
+        previous = {}
+        for signum in self.signals:
+            try:
+                previous[signum] = signal.signal(signum, self._on_signal)
+            except ValueError:  # fora da thread principal
+                pass
+        try:
+            while True:
+                budget = POLL_STEPS
+                if self.every:
+                    budget = min(budget, self.every - runtime.steps % self.every)
+                done = runtime.resume(budget)
+                if done:
+                    break
+                signum, self._requested = self._requested, None
+                stop = signum in self.STOP_SIGNALS
+                if signum is not None or (self.every and runtime.steps % self.every == 0):
+                    self.checkpoint(runtime, stop)
+                if stop:
+                    self.interrupted = True
+                    return None
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+
+        self._flush()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        return runtime.result
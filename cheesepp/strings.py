@@ -0,0 +1,152 @@
+from typing import Any, List, Optional
+
+# Tamanho a partir do qual `str plus str` passa a usar um StrBuilder
+BUILDER_THRESHOLD = 256
+
+
+def _flat(value: Any) -> Any:
+    return str(value) if type(value) is StrBuilder else value
+
+
+class StrBuilder:
+    """
+    String em construção para concatenações repetidas do Cheese++.
+
+    Guarda os pedaços numa lista compartilhada e quantos deles pertencem a
+    este valor: `append` devolve um novo StrBuilder que estende a mesma lista
+    quando ninguém a estendeu antes, então `s plus x` num loop custa O(len(x))
+    em vez de copiar a string inteira. Valores antigos continuam válidos,
+    porque só enxergam os seus primeiros `count` pedaços. A string final é
+    montada (e guardada) na primeira vez que é pedida.
+    """
+    __slots__ = ('_parts', '_count', '_length', '_flat')
+
+    def __init__(self, parts: List[str], count: Optional[int] = None, length: Optional[int] = None):
+        self._parts = parts
+        self._count = len(parts) if count is None else count
+        self._length = sum(map(len, parts)) if length is None else length
+        self._flat = None
+
+    def append(self, text: str) -> "StrBuilder":
+        """Novo valor com `text` no fim; este continua igual"""
+        parts = self._parts
+        if self._count != len(parts):
+            # Outro valor já estendeu a lista a partir deste ponto
+            parts = parts[:self._count]
+        elif self._flat is not None and self._count > 1:
+            parts = [self._flat]
+        parts.append(text)
+        return StrBuilder(parts, len(parts), self._length + len(text))
+
+    def __str__(self) -> str:
+        if self._flat is None:
+            parts = self._parts
+            self._flat = ''.join(parts if self._count == len(parts) else parts[:self._count])
+        return self._flat
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __bool__(self) -> bool:
+        return self._length > 0
+
+    def __add__(self, other):
+        return concat(self, other)
+
+    def __radd__(self, other):
+        return other + str(self)
+
+    def __mul__(self, other):
+        return str(self) * other
+
+    __rmul__ = __mul__
+
+    def __eq__(self, other):
+        return str(self) == _flat(other)
+
+    def __ne__(self, other):
+        return str(self) != _flat(other)
+
+    def __lt__(self, other):
+        return str(self) < _flat(other)
+
+    def __le__(self, other):
+        return str(self) <= _flat(other)
+
+    def __gt__(self, other):
+        return str(self) > _flat(other)
+
+    def __ge__(self, other):
+        return str(self) >= _flat(other)
+
+    def __hash__(self):
+        return hash(str(self))
+
+    def __repr__(self):
+        return repr(str(self))
+
+
+def concat(left, right):
+    """`left + right` que acumula strings longas num StrBuilder"""
+    if type(left) is StrBuilder:
+        if type(right) is str:
+            return left.append(right)
+        if type(right) is StrBuilder:
+            return left.append(str(right))
+        return str(left) + right
+    if type(left) is str:
+        if type(right) is StrBuilder:
+            right = str(right)
+        if type(right) is str and len(left) + len(right) >= BUILDER_THRESHOLD:
+            return StrBuilder([left, right])
+    return left + right
+
+
+class Env(dict):
+    """
+    Ambiente de variáveis do runtime.
+
+    O runtime lê e escreve os valores crus (com `dict.get`/`dict.__setitem__`);
+    quem acessa o ambiente por fora recebe strings já achatadas.
+    """
+
+    def _flatten_item(self, name, value):
+        if type(value) is StrBuilder:
+            value = str(value)
+            dict.__setitem__(self, name, value)
+        return value
+
+    def flatten(self) -> "Env":
+        """Troca todos os StrBuilder do ambiente por strings"""
+        for name, value in dict.items(self):
+            if type(value) is StrBuilder:
+                dict.__setitem__(self, name, str(value))
+        return self
+
+    def __getitem__(self, name):
+        return self._flatten_item(name, dict.__getitem__(self, name))
+
+    def get(self, name, default=None):
+        if name in self:
+            return self[name]
+        return default
+
+    def items(self):
+        return dict.items(self.flatten())
+
+    def values(self):
+        return dict.values(self.flatten())
+
+    def copy(self):
+        return dict(self.flatten())
+
+    def __eq__(self, other):
+        return dict.__eq__(self.flatten(), other)
+
+    def __ne__(self, other):
+        return dict.__ne__(self.flatten(), other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return dict.__repr__(self.flatten())
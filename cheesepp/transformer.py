@@ -1,7 +1,72 @@
+import sys
+
 from lark import Transformer
 from cheesepp.ast import *
 
+
+class ConstantPool:
+    """
+    Constantes de um programa compilado: nomes internados e um único nó
+    compartilhado para cada literal, variável ou subexpressão repetida.
+
+    Como os filhos de um BinOp já são únicos, a chave de um BinOp é a tupla
+    (left, op, right) comparada por identidade (hash-consing).
+    """
+
+    def __init__(self):
+        # Um dicionário por tipo de literal: 1, 1.0 e True não se misturam
+        self.ints = {}
+        self.floats = {}
+        self.strings = {}
+        self.vars = {}
+        self.binops = {}
+        self.hits = 0
+
+    def name(self, token) -> str:
+        """Nome de variável internado (o mesmo objeto em todos os programas)"""
+        return sys.intern(str(token))
+
+    def _shared(self, table, key, factory):
+        node = table.get(key)
+        if node is None:
+            node = table[key] = factory(key)
+        else:
+            self.hits += 1
+        return node
+
+    def number(self, value) -> Number:
+        table = self.ints if type(value) is int else self.floats
+        return self._shared(table, value, Number)
+
+    def string(self, value: str) -> String:
+        return self._shared(self.strings, value, String)
+
+    def var(self, name: str) -> Var:
+        return self._shared(self.vars, name, Var)
+
+    def binop(self, left, op: str, right) -> BinOp:
+        key = (left, op, right)
+        node = self.binops.get(key)
+        if node is None:
+            node = self.binops[key] = BinOp(left, op, right)
+        else:
+            self.hits += 1
+        return node
+
+    def __len__(self):
+        return (len(self.ints) + len(self.floats) + len(self.strings) + len(self.vars)
+                + len(self.binops))
+
+    def __repr__(self):
+        return f"ConstantPool(nodes={len(self)}, hits={self.hits})"
+
+
 class CheeseTransformer(Transformer):
+    def __init__(self):
+        super().__init__()
+        # Trocado a cada parse (ver parser.parse)
+        self.pool = ConstantPool()
+
     def start(self, items):
         return items[0]  
     
@@ -15,17 +80,17 @@ class CheeseTransformer(Transformer):
             return None  
         
     def assignment(self, items):
-        name = str(items[0])
+        name = self.pool.name(items[0])
         expr = items[1]
         return CheeseAssign(name, expr)
     
     def assignment2(self, items):
-        name = str(items[0])
+        name = self.pool.name(items[0])
         expr = items[1]
         return CheeseAssign(name, expr)
     
     def assignment3(self, items):
-        name = str(items[0])
+        name = self.pool.name(items[0])
         expr = items[1]
         return CheeseAssign(name, expr)
 
@@ -53,13 +118,17 @@ class CheeseTransformer(Transformer):
         return Belgian()
 
     def number(self, items):
-        return Number(float(items[0]))
+        text = str(items[0])
+        # Literais sem ponto ou expoente continuam inteiros exatos
+        if '.' in text or 'e' in text or 'E' in text:
+            return self.pool.number(float(text))
+        return self.pool.number(int(text))
 
     def var_access(self, items):
-        return Var(str(items[0]))
+        return self.pool.var(self.pool.name(items[0]))
 
     def var_access_simple(self, items):
-        return Var(str(items[0]))
+        return self.pool.var(self.pool.name(items[0]))
 
     def string(self, items):
         return items[0]  
@@ -69,15 +138,15 @@ class CheeseTransformer(Transformer):
             content = str(items[0])
         else:
             content = ""
-        return String(content)
-
-    def add(self, items): return BinOp(items[0], '+', items[1])
-    def sub(self, items): return BinOp(items[0], '-', items[1])
-    def mul(self, items): return BinOp(items[0], '*', items[1])
-    def div(self, items): return BinOp(items[0], '/', items[1])
-    def eq(self, items): return BinOp(items[0], '==', items[1])
-    def ne(self, items): return BinOp(items[0], '!=', items[1])
-    def gt(self, items): return BinOp(items[0], '>', items[1])
-    def lt(self, items): return BinOp(items[0], '<', items[1])
-    def ge(self, items): return BinOp(items[0], '>=', items[1])
-    def le(self, items): return BinOp(items[0], '<=', items[1])
\ No newline at end of file
+        return self.pool.string(content)
+
+    def add(self, items): return self.pool.binop(items[0], '+', items[1])
+    def sub(self, items): return self.pool.binop(items[0], '-', items[1])
+    def mul(self, items): return self.pool.binop(items[0], '*', items[1])
+    def div(self, items): return self.pool.binop(items[0], '/', items[1])
+    def eq(self, items): return self.pool.binop(items[0], '==', items[1])
+    def ne(self, items): return self.pool.binop(items[0], '!=', items[1])
+    def gt(self, items): return self.pool.binop(items[0], '>', items[1])
+    def lt(self, items): return self.pool.binop(items[0], '<', items[1])
+    def ge(self, items): return self.pool.binop(items[0], '>=', items[1])
+    def le(self, items): return self.pool.binop(items[0], '<=', items[1])
\ No newline at end of file
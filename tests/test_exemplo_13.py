@@ -0,0 +1,112 @@
+import pytest
+from cheesepp.parser import parse
+from cheesepp.runtime import Runtime
+from cheesepp.errors import CheeseTypeError
+from cheesepp.inference import CheeseType, infer_types, OPERATORS, GENERIC_HANDLERS
+
+def test_rotulos_basicos():
+    """Testa os rótulos num, str e bool inferidos para as atribuições"""
+    code = """Cheese
+Glyn(x) = 10;
+Glyn(nome) = SwissQueijoSwiss;
+Glyn(maior) = x greater 5;
+Glyn(frase) = nome plus SwissBrieSwiss;
+NoCheese"""
+    info = infer_types(parse(code))
+
+    assert info.env["x"] == CheeseType.INT
+    assert info.env["nome"] == CheeseType.STR
+    assert info.env["maior"] == CheeseType.BOOL
+    assert info.env["frase"] == CheeseType.STR
+    assert not info.errors
+
+def test_ramos_diferentes_viram_unknown():
+    """Testa a junção de tipos diferentes vindos dos dois ramos do Stilton"""
+    code = """Cheese
+Glyn(x) = 1;
+Stilton x greater 0 Blue
+    Glyn(y) = SwissaSwiss;
+White
+    Glyn(y) = 2;
+NoCheese"""
+    info = infer_types(parse(code))
+
+    assert info.env["y"] == CheeseType.UNKNOWN
+
+def test_handlers_sem_guarda():
+    """Testa que operandos conhecidos usam o operador direto e desconhecidos o genérico"""
+    program = parse("""Cheese
+Glyn(a) = 2 plus 3;
+Glyn(b) = c plus 1;
+NoCheese""")
+    info = infer_types(program, default=CheeseType.UNKNOWN)
+
+    assert info.handlers[program[0].value] is OPERATORS['+']
+    assert info.handlers[program[1].value] is GENERIC_HANDLERS['+']
+
+def test_conflito_reportado_antes_da_execucao(capsys):
+    """Testa que Swiss a Swiss minus 1 falha antes de qualquer saída"""
+    code = """Cheese
+Wensleydale(SwissinícioSwiss);
+Glyn(i) = 0;
+Cheddar
+    Glyn(i) = i plus 1;
+Coleraine i equals 1000
+Glyn(x) = Swiss a Swiss minus 1;
+NoCheese"""
+    rt = Runtime()
+    with pytest.raises(CheeseTypeError):
+        rt.run(parse(code), code)
+    captured = capsys.readouterr()
+
+    assert captured.out == ""
+    assert "i" not in rt.env
+
+def test_conflito_no_loop_com_tipo_variavel():
+    """Testa erro de tipo em runtime quando o tipo só é conhecido na execução"""
+    code = """Cheese
+Glyn(x) = 1;
+Cheddar
+    Glyn(y) = x minus 1;
+    Glyn(x) = SwissqueijoSwiss;
+Coleraine y equals 5
+NoCheese"""
+    rt = Runtime()
+    with pytest.raises(CheeseTypeError):
+        rt.run(parse(code), code)
+
+    assert rt.env["x"] == "queijo"
+
+def test_loop_pode_nao_executar():
+    """Testa que o tipo após o loop junta a entrada com o corpo"""
+    code = """Cheese
+Glyn(x) = 1;
+Cheddar
+    Glyn(x) = SwissqueijoSwiss;
+Coleraine 1
+NoCheese"""
+    info = infer_types(parse(code))
+
+    assert info.env["x"] == CheeseType.UNKNOWN
+
+def test_conflito_em_ramo_nao_executado():
+    """Testa que um conflito num ramo que não executa não recusa o programa"""
+    code = """Cheese
+Glyn(a) = 1;
+Stilton a greater 5 Blue
+    Glyn(b) = SwissaSwiss minus 1;
+White
+    Wensleydale(a);
+NoCheese"""
+    info = infer_types(parse(code))
+    assert not info.errors and len(info.warnings) == 1
+
+    saida = []
+    Runtime(output=saida.append).run(parse(code), code)
+    assert saida == ["1"]
+
+    # Alcançado, o ramo falha com o handler com guarda; no modo estrito nem começa
+    with pytest.raises(CheeseTypeError):
+        Runtime(output=saida.append).run(parse(code.replace("greater 5", "less 5")), code)
+    with pytest.raises(CheeseTypeError):
+        Runtime(strict=True).run(parse(code), code)
@@ -0,0 +1,98 @@
+import pytest
+from cheesepp.errors import CheeseRuntimeError
+from cheesepp.parser import parse
+from cheesepp.runtime import Runtime
+from cheesepp.inference import CheeseType, infer_types
+
+def test_literais_inteiros_continuam_int():
+    """Testa que literais sem ponto decimal viram int e com ponto viram float"""
+    code = """Cheese
+Glyn(a) = 7;
+Glyn(b) = 7.0;
+Glyn(c) = a plus 1;
+Glyn(d) = a plus b;
+NoCheese"""
+    rt = Runtime()
+    rt.run(parse(code), code)
+
+    assert type(rt.env["a"]) is int
+    assert type(rt.env["b"]) is float
+    assert type(rt.env["c"]) is int
+    assert type(rt.env["d"]) is float
+
+def test_divisao_continua_verdadeira():
+    """Testa que / entre inteiros mantém a divisão com ponto flutuante"""
+    code = """Cheese
+Glyn(x) = 7 / 2;
+Glyn(y) = 10 divided 5;
+NoCheese"""
+    rt = Runtime()
+    rt.run(parse(code), code)
+
+    assert rt.env["x"] == 3.5
+    assert type(rt.env["y"]) is float
+
+def test_contador_grande_exato():
+    """Testa que contadores grandes não perdem exatidão"""
+    code = """Cheese
+Glyn(n) = 9007199254740992;
+Glyn(n) = n plus 1;
+NoCheese"""
+    rt = Runtime()
+    rt.run(parse(code), code)
+
+    assert rt.env["n"] == 9007199254740993
+
+def test_impressao_de_inteiros(capsys):
+    """Testa que inteiros são impressos sem .0"""
+    code = """Cheese
+Glyn(i) = 0;
+Cheddar
+    Wensleydale(Glyn(i));
+    Glyn(i) = i plus 1;
+Coleraine i equals 3
+NoCheese"""
+    rt = Runtime()
+    rt.run(parse(code), code)
+    captured = capsys.readouterr()
+
+    assert captured.out == "0\n1\n2\n"
+
+def test_inteiro_grande_demais_para_imprimir():
+    """Testa que inteiros acima do limite de dígitos do CPython viram CheeseRuntimeError"""
+    code = """Cheese
+Glyn(x) = 1;
+Glyn(i) = 0;
+Cheddar
+    Glyn(x) = x times 2;
+    Glyn(i) = i plus 1;
+Coleraine i equals {n}
+Wensleydale(SwissprontoSwiss);
+Wensleydale(x);
+NoCheese"""
+    saida = []
+    Runtime(output=saida.append).run(parse(code.format(n=10000)))
+    assert saida[1] == str(2 ** 10000)
+
+    saida = []
+    with pytest.raises(CheeseRuntimeError, match="Integer with about 6021 digits is too large to print"):
+        Runtime(output=saida.append).run(parse(code.format(n=20000)))
+    assert saida == ["pronto"]
+
+def test_rotulos_int_float():
+    """Testa os rótulos int, float e num da inferência"""
+    code = """Cheese
+Glyn(i) = 1;
+Glyn(f) = 1.5;
+Glyn(q) = i / 1;
+Stilton i greater 0 Blue
+    Glyn(m) = 1;
+White
+    Glyn(m) = 1.5;
+NoCheese"""
+    info = infer_types(parse(code))
+
+    assert info.env["i"] == CheeseType.INT
+    assert info.env["f"] == CheeseType.FLOAT
+    assert info.env["q"] == CheeseType.FLOAT
+    assert info.env["m"] == CheeseType.NUM
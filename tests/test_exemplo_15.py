@@ -0,0 +1,125 @@
+import io
+import contextlib
+import pytest
+from cheesepp.parser import parse
+from cheesepp.runtime import Runtime
+
+np = pytest.importorskip("numpy")
+from cheesepp.batch import BatchRuntime
+
+def test_formula_elemento_a_elemento():
+    """Testa aritmética e comparações aplicadas a todos os registros"""
+    code = """Cheese
+Glyn(z) = x times 2 plus y;
+Glyn(maior) = z greater 10;
+NoCheese"""
+    rt = BatchRuntime(4)
+    rt.run(parse(code), code, inputs={"x": [1, 2, 3, 4], "y": [10, 0, 5, 1]})
+
+    assert list(rt.env["z"]) == [12, 4, 11, 9]
+    assert list(rt.env["maior"]) == [True, False, True, False]
+
+def test_stilton_mascarado():
+    """Testa que cada registro segue o seu próprio ramo do Stilton"""
+    code = """Cheese
+Stilton x greater 2 Blue
+    Glyn(r) = SwissaltoSwiss;
+White
+    Glyn(r) = SwissbaixoSwiss;
+NoCheese"""
+    rt = BatchRuntime(4)
+    rt.run(parse(code), code, inputs={"x": [1, 2, 3, 4]})
+
+    assert list(rt.env["r"]) == ["baixo", "baixo", "alto", "alto"]
+
+def test_loop_com_contagens_diferentes():
+    """Testa loops com número de iterações diferente por registro"""
+    code = """Cheese
+Glyn(i) = 0;
+Glyn(soma) = 0;
+Cheddar
+    Glyn(i) = i plus 1;
+    Glyn(soma) = soma plus i;
+Coleraine i greater_equals n
+NoCheese"""
+    rt = BatchRuntime(3)
+    rt.run(parse(code), code, inputs={"n": [1, 3, 5]})
+
+    assert list(rt.env["i"]) == [1, 3, 5]
+    assert list(rt.env["soma"]) == [1, 6, 15]
+
+def test_mesmo_resultado_do_runtime():
+    """Testa que cada registro bate com uma execução separada do Runtime"""
+    code = """Cheese
+Glyn(i) = 0;
+Cheddar
+    Glyn(i) = i plus 1;
+    Stilton i minor x Blue
+        Wensleydale(Glyn(i));
+    White
+        Wensleydale(SwissfimSwiss);
+Coleraine i greater 2
+NoCheese"""
+    xs = [0, 1, 2, 3]
+    rt = BatchRuntime(len(xs))
+    rt.run(parse(code), code, inputs={"x": xs})
+    outputs = rt.outputs()
+
+    for index, x in enumerate(xs):
+        single = Runtime()
+        single.env["x"] = x
+        buffer = io.StringIO()
+        with contextlib.redirect_stdout(buffer):
+            single.run(parse(code), code)
+        assert outputs[index] == buffer.getvalue().splitlines()
+        assert rt.record(index)["i"] == single.env["i"]
+
+def test_divisao_por_zero_em_registro_ativo():
+    """Testa que divisão por zero só falha em registros ativos"""
+    code = """Cheese
+Stilton y not_equals 0 Blue
+    Glyn(q) = x / y;
+White
+    Glyn(q) = 0;
+NoCheese"""
+    rt = BatchRuntime(2)
+    rt.run(parse(code), code, inputs={"x": [1, 2], "y": [0, 4]})
+    assert rt.record(1)["q"] == 0.5
+
+    rt = BatchRuntime(2)
+    with pytest.raises(ZeroDivisionError):
+        rt.run(parse("Cheese Glyn(q) = x / y; NoCheese"), inputs={"x": [1, 2], "y": [0, 4]})
+
+def test_inteiros_alem_do_int64():
+    """Testa que somas e produtos que passam do int64 ficam exatos, como no Runtime"""
+    code = """Cheese
+Glyn(y) = x times x times x;
+Glyn(s) = x plus 9223372036854775807;
+Glyn(d) = 0 minus x minus 9223372036854775807;
+Glyn(p) = x times 2;
+NoCheese"""
+    xs = [3000000, -3000000, 7]
+    rt = BatchRuntime(len(xs))
+    rt.run(parse(code), code, inputs={"x": xs})
+
+    for index, x in enumerate(xs):
+        single = Runtime()
+        single.env["x"] = x
+        single.run(parse(code), code)
+        assert rt.record(index) == dict(single.env)
+    assert rt.record(0)["y"] == 27000000000000000000
+    # Colunas que cabem continuam int64
+    assert rt.env["p"].dtype == np.int64
+
+def test_loop_que_nao_executa():
+    """Testa que registros com a condição já verdadeira não entram no loop"""
+    code = """Cheese
+Glyn(i) = 0;
+Cheddar
+    Glyn(i) = i plus 1;
+Coleraine i greater_equals n
+NoCheese"""
+    rt = BatchRuntime(3)
+    rt.run(parse(code), code, inputs={"n": [0, 2, -1]})
+
+    assert list(rt.env["i"]) == [0, 2, 0]
@@ -0,0 +1,88 @@
+import csv
+import pytest
+
+np = pytest.importorskip("numpy")
+from cheesepp.columnar import map_csv
+from cheesepp.errors import CheeseRuntimeError
+
+PROGRAMA = """Cheese
+Glyn(total) = preco times quantidade;
+Stilton total greater 100 Blue
+    Glyn(faixa) = SwissaltaSwiss;
+White
+    Glyn(faixa) = SwissbaixaSwiss;
+NoCheese"""
+
+def escrever_csv(caminho, linhas):
+    with open(caminho, "w", newline="") as f:
+        csv.writer(f).writerows(linhas)
+
+def ler_csv(caminho):
+    with open(caminho, newline="") as f:
+        return list(csv.reader(f))
+
+def test_map_linha_a_linha(tmp_path):
+    """Testa que cada linha do CSV vira um ambiente inicial e uma linha de saída"""
+    entrada = tmp_path / "entrada.csv"
+    saida = tmp_path / "saida.csv"
+    escrever_csv(entrada, [["preco", "quantidade"], ["10", "5"], ["2.5", "100"], ["7", "1"]])
+
+    linhas = map_csv(PROGRAMA, str(entrada), str(saida), workers=1)
+
+    assert linhas == 3
+    assert ler_csv(saida) == [
+        ["total", "faixa"],
+        ["50.0", "baixa"],
+        ["250.0", "alta"],
+        ["7.0", "baixa"],
+    ]
+
+def test_map_colunas_escolhidas(tmp_path):
+    """Testa a escolha das variáveis escritas na saída"""
+    entrada = tmp_path / "entrada.csv"
+    saida = tmp_path / "saida.csv"
+    escrever_csv(entrada, [["preco", "quantidade"], ["1", "2"], ["3", "4"]])
+
+    map_csv(PROGRAMA, str(entrada), str(saida), columns=["faixa"], workers=1)
+
+    assert ler_csv(saida) == [["faixa"], ["baixa"], ["baixa"]]
+
+def test_map_paralelo_mantem_ordem(tmp_path):
+    """Testa que blocos processados em paralelo saem na ordem original"""
+    entrada = tmp_path / "entrada.csv"
+    sequencial = tmp_path / "sequencial.csv"
+    paralelo = tmp_path / "paralelo.csv"
+    escrever_csv(entrada, [["preco", "quantidade"]] + [[str(i), str(i % 7)] for i in range(500)])
+
+    map_csv(PROGRAMA, str(entrada), str(sequencial), chunk_size=64, workers=1)
+    map_csv(PROGRAMA, str(entrada), str(paralelo), chunk_size=64, workers=2)
+
+    assert ler_csv(sequencial) == ler_csv(paralelo)
+    assert len(ler_csv(paralelo)) == 501
+
+def test_map_tipo_decidido_uma_vez(tmp_path):
+    """Testa que o tipo da coluna não muda entre blocos e que célula vazia vale 0"""
+    entrada = tmp_path / "entrada.csv"
+    escrever_csv(entrada, [["preco", "quantidade"], ["1", "2"], ["", "3"], ["4", ""], ["5", "6"]])
+    saidas = []
+    for chunk_size in (1, 2, 100):
+        saida = tmp_path / f"saida{chunk_size}.csv"
+        map_csv(PROGRAMA, str(entrada), str(saida), columns=["total"], chunk_size=chunk_size, workers=1)
+        saidas.append(ler_csv(saida))
+    assert saidas[0] == saidas[1] == saidas[2] == [["total"], ["2"], ["0"], ["0"], ["30"]]
+
+    saida = tmp_path / "float.csv"
+    map_csv(PROGRAMA, str(entrada), str(saida), columns=["total"], workers=1, schema={"preco": "float"})
+    assert ler_csv(saida)[1:] == [["2.0"], ["0.0"], ["0.0"], ["30.0"]]
+
+def test_map_erros_por_linha(tmp_path):
+    """Testa células fora do tipo, inteiros grandes demais e linhas incompletas"""
+    entrada = tmp_path / "entrada.csv"
+    saida = tmp_path / "saida.csv"
+    escrever_csv(entrada, [["preco", "quantidade"], ["1", "2"], ["99999999999999999999", "1"]])
+    with pytest.raises(CheeseRuntimeError, match="Line 3, column 'preco'"):
+        map_csv(PROGRAMA, str(entrada), str(saida), chunk_size=1, workers=2)
+
+    escrever_csv(entrada, [["preco", "quantidade"], ["1", "2"], ["3"]])
+    with pytest.raises(CheeseRuntimeError, match="Line 3 has 1 fields, expected 2"):
+        map_csv(PROGRAMA, str(entrada), str(saida), workers=1)
@@ -0,0 +1,64 @@
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from cheesepp.program import Program
+from cheesepp.errors import CheeseTypeError
+import cheesepp.program as program_module
+
+FATORIAL = """Cheese
+Glyn(resultado) = 1;
+Glyn(i) = 1;
+Cheddar
+    Glyn(resultado) = resultado times i;
+    Glyn(i) = i plus 1;
+Coleraine i greater n
+Wensleydale(Glyn(resultado));
+NoCheese"""
+
+def test_run_com_entradas():
+    """Testa que run preenche o ambiente inicial com as entradas"""
+    programa = Program(FATORIAL)
+
+    resultado = programa.run(inputs={"n": 5})
+
+    assert resultado.env["resultado"] == 120
+    assert resultado.output == ["120"]
+
+def test_run_nao_reanalisa(monkeypatch):
+    """Testa que execuções repetidas não chamam o parser de novo"""
+    programa = Program(FATORIAL)
+
+    def parse_proibido(code):
+        raise AssertionError("parse chamado novamente")
+    monkeypatch.setattr(program_module, "parse", parse_proibido)
+
+    assert [programa.run({"n": n}).env["resultado"] for n in (1, 3, 4)] == [1, 6, 24]
+
+def test_execucoes_isoladas():
+    """Testa que uma execução não vaza variáveis para a próxima"""
+    programa = Program("""Cheese
+Glyn(x) = x plus 1;
+NoCheese""")
+
+    assert programa.run({"x": 10}).env["x"] == 11
+    assert programa.run().env["x"] == 1
+
+def test_run_em_varias_threads():
+    """Testa o mesmo Program executado em paralelo por várias threads"""
+    programa = Program(FATORIAL)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        resultados = list(pool.map(lambda n: programa.run({"n": n}).env["resultado"], range(1, 30)))
+
+    esperado = []
+    fatorial = 1
+    for n in range(1, 30):
+        fatorial *= n
+        esperado.append(fatorial)
+    assert resultados == esperado
+
+def test_conflito_de_tipo_na_compilacao():
+    """Testa que conflitos certos são reportados ao compilar"""
+    with pytest.raises(CheeseTypeError):
+        Program("""Cheese
+Glyn(x) = y minus SwissqueijoSwiss;
+NoCheese""")
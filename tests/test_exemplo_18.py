@@ -0,0 +1,137 @@
+import asyncio
+import pytest
+from cheesepp.server import CheeseServer, execute_request, request
+
+pytestmark = pytest.mark.skipif(not hasattr(asyncio, "start_unix_server"),
+                                reason="precisa de sockets Unix")
+
+
+def _conversa(tmp_path, payloads, **options):
+    """Sobe um servidor com um processo, envia as requisições e devolve as respostas"""
+    socket_path = str(tmp_path / "cheesepp.sock")
+
+    async def main():
+        server = CheeseServer(workers=1, **options)
+        await server.start(socket_path)
+        try:
+            return [await request(p, socket_path) for p in payloads]
+        finally:
+            await server.close()
+
+    return asyncio.run(main())
+
+def test_resposta_com_saida_ambiente_e_tempos(tmp_path):
+    """Testa que a resposta traz a saída, o ambiente final e os tempos"""
+    code = "Cheese Glyn(y) = x times 2; Wensleydale(Glyn(y)); NoCheese"
+    [response] = _conversa(tmp_path, [{"source": code, "inputs": {"x": 21}}])
+
+    assert response["ok"]
+    assert response["output"] == ["42"]
+    assert response["env"] == {"x": 21, "y": 42}
+    assert set(response["timing"]) >= {"compile", "run", "total", "cached"}
+
+def test_programa_reaproveitado_do_cache(tmp_path):
+    """Testa que o mesmo código-fonte só é compilado uma vez por processo"""
+    code = "Cheese Glyn(y) = x plus 1; NoCheese"
+    first, second = _conversa(tmp_path, [{"source": code, "inputs": {"x": 1}},
+                                         {"source": code, "inputs": {"x": 5}}])
+
+    assert not first["timing"]["cached"]
+    assert second["timing"]["cached"]
+    assert second["env"]["y"] == 6
+
+def test_limite_de_tempo(tmp_path):
+    """Testa que um loop infinito é interrompido pelo limite de tempo"""
+    code = """Cheese
+Glyn(i) = 0;
+Cheddar
+    Glyn(i) = i plus 1;
+Coleraine i less 0
+NoCheese"""
+    [response] = _conversa(tmp_path, [{"source": code, "time_limit": 0.2}])
+
+    assert not response["ok"]
+    assert response["error"]["type"] == "runtime"
+    assert "Tempo limite" in response["error"]["message"]
+
+def test_erros_viram_respostas(tmp_path):
+    """Testa que erros de sintaxe e JSON sem código não derrubam o servidor"""
+    bad, missing, good = _conversa(tmp_path, [
+        {"source": "Cheese Glyn(x) = ; NoCheese"},
+        {"inputs": {}},
+        {"source": "Cheese Glyn(x) = 1; NoCheese"},
+    ])
+
+    assert not bad["ok"]
+    assert not missing["ok"]
+    assert good["ok"] and good["env"] == {"x": 1}
+
+def test_limite_de_memoria():
+    """Testa que uma requisição que passa do limite de memória falha sozinha"""
+    pytest.importorskip("resource")
+    code = "Cheese Glyn(s) = SwissaSwiss times n; NoCheese"
+    response = execute_request(code, {"n": 200 * 1024 * 1024}, memory=50)
+    assert not response["ok"]
+    assert response["error"]["type"] == "MemoryError"
+
+    response = execute_request(code, {"n": 10}, memory=50)
+    assert response["ok"] and response["env"]["s"] == "a" * 10
+
+def test_resultado_sem_json(tmp_path):
+    """Testa que inteiros enormes e infinitos viram erro e a conexão continua"""
+    grande = """Cheese
+Glyn(x) = 2;
+Glyn(i) = 0;
+Cheddar
+    Glyn(x) = x times x;
+    Glyn(i) = i plus 1;
+Coleraine i greater 14
+NoCheese"""
+    infinito = "Cheese Glyn(y) = 10.0 times 1e308; NoCheese"
+    big, inf, good = _conversa(tmp_path, [{"source": grande}, {"source": infinito},
+                                          {"source": "Cheese Glyn(z) = 1; NoCheese"}])
+
+    assert not big["ok"] and "JSON" in big["error"]["message"]
+    assert "total" in big["timing"]
+    assert not inf["ok"] and "JSON" in inf["error"]["message"]
+    assert good["ok"] and good["env"] == {"z": 1}
+
+def test_limites_invalidos(tmp_path):
+    """Testa que limites que não são números positivos viram respostas de erro"""
+    code = "Cheese Glyn(x) = 1; NoCheese"
+    respostas = _conversa(tmp_path, [
+        {"source": code, "time_limit": "abc"},
+        {"source": code, "memory_limit": -1},
+        {"source": code, "time_limit": True},
+        {"source": code, "inputs": [1]},
+        {"source": code, "time_limit": 0.5, "memory_limit": None},
+    ])
+
+    assert [r["ok"] for r in respostas] == [False, False, False, False, True]
+    assert respostas[0]["error"]["message"] == "Campo 'time_limit' deve ser um número positivo"
+    assert "memory_limit" in respostas[1]["error"]["message"]
+
+def test_processo_travado_e_trocado(tmp_path):
+    """Testa que um comando que passa do prazo não prende o processo do pool"""
+    socket_path = str(tmp_path / "cheesepp.sock")
+    # Cada volta eleva x à 16ª potência: a volta que começa antes do prazo
+    # leva segundos, sem passar pela verificação do limite
+    quadrados = " ".join(["Glyn(x) = x times x;"] * 4)
+    travado = f"Cheese Glyn(x) = 3; Cheddar {quadrados} Coleraine 1 equals 0 NoCheese"
+
+    async def main():
+        server = CheeseServer(workers=1, memory_limit=None)
+        await server.start(socket_path)
+        try:
+            first = await request({"source": travado, "time_limit": 1.0}, socket_path)
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            second = await request({"source": "Cheese Glyn(y) = 2; NoCheese"}, socket_path)
+            return first, second, loop.time() - start, server.recycled
+        finally:
+            await server.close()
+
+    first, second, seconds, recycled = asyncio.run(main())
+    assert not first["ok"] and "Tempo limite" in first["error"]["message"]
+    assert second["ok"] and second["env"] == {"y": 2}
+    assert recycled == 1 and seconds < 2.0
@@ -0,0 +1,93 @@
+import asyncio
+import pytest
+from cheesepp.parser import parse
+from cheesepp.runtime import Runtime
+from cheesepp.errors import CheeseRuntimeError
+
+CONTADOR = """Cheese
+Glyn(i) = 0;
+Cheddar
+    Glyn(i) = i plus 1;
+    Wensleydale(Glyn(i));
+Coleraine i greater_equals n
+NoCheese"""
+
+def test_run_async_mesmo_resultado():
+    """Testa que run_async produz a mesma saída e ambiente que run"""
+    code = """Cheese
+Glyn(x) = 0;
+Cheddar
+    Glyn(x) = x plus 1;
+    Stilton x greater 2 Blue
+        Wensleydale(SwissgrandeSwiss);
+    White
+        Wensleydale(Glyn(x));
+Coleraine x greater_equals 4
+Glyn(y) = x times 10;
+NoCheese"""
+    sync_lines = []
+    rt = Runtime(output=sync_lines.append)
+    sync_result = rt.run(parse(code), code)
+
+    async_lines = []
+    art = Runtime(output=async_lines.append)
+    async_result = asyncio.run(art.run_async(parse(code), code, slice_steps=1))
+
+    assert async_lines == sync_lines == ["1", "2", "grande", "grande"]
+    assert art.env == rt.env
+    assert async_result == sync_result == 40
+
+def test_programas_intercalados():
+    """Testa que dois programas longos se revezam no mesmo event loop"""
+    events = []
+
+    async def rodar(nome):
+        rt = Runtime(output=lambda line: events.append(nome))
+        rt.env["n"] = 50
+        await rt.run_async(parse(CONTADOR), slice_steps=10)
+
+    async def main():
+        await asyncio.gather(rodar("a"), rodar("b"))
+
+    asyncio.run(main())
+    assert events.count("a") == events.count("b") == 50
+    # Nenhum dos dois roda até o fim antes de o outro começar
+    assert events.index("b") < len(events) - events[::-1].index("a") - 1
+
+def test_saida_assincrona():
+    """Testa que saídas assíncronas são aguardadas na ordem"""
+    lines = []
+
+    async def sink(line):
+        await asyncio.sleep(0)
+        lines.append(line)
+
+    rt = Runtime(output=sink)
+    rt.env["n"] = 3
+    asyncio.run(rt.run_async(parse(CONTADOR)))
+    assert lines == ["1", "2", "3"]
+
+    rt = Runtime(output=sink)
+    rt.env["n"] = 3
+    with pytest.raises(CheeseRuntimeError):
+        rt.run(parse(CONTADOR))
+
+def test_cancelamento():
+    """Testa que cancelar a tarefa interrompe um loop infinito"""
+    code = """Cheese
+Glyn(i) = 0;
+Cheddar
+    Glyn(i) = i plus 1;
+Coleraine i less 0
+NoCheese"""
+    rt = Runtime()
+
+    async def main():
+        task = asyncio.create_task(rt.run_async(parse(code), slice_steps=100))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert rt.env["i"] > 0
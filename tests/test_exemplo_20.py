@@ -0,0 +1,104 @@
+import os
+import signal
+import threading
+import pytest
+from cheesepp.parser import parse
+from cheesepp.runtime import Runtime
+from cheesepp.snapshot import Checkpointer, Snapshot
+
+ANINHADO = """Cheese
+Glyn(i) = 0;
+Glyn(total) = 0;
+Cheddar
+    Glyn(i) = i plus 1;
+    Glyn(j) = 0;
+    Stilton i greater 1 Blue
+        Cheddar
+            Glyn(j) = j plus 1;
+            Glyn(total) = total plus j;
+        Coleraine j greater_equals m
+    White
+        Glyn(total) = total plus 100;
+    Wensleydale(Glyn(total));
+Coleraine i greater_equals n
+NoCheese"""
+
+def _completo(code, **env):
+    lines = []
+    rt = Runtime(output=lines.append)
+    rt.env.update(env)
+    rt.run(parse(code), code)
+    return lines, rt.env
+
+def test_snapshot_em_loops_aninhados():
+    """Testa que restaurar de qualquer ponto dá a mesma saída e ambiente"""
+    expected_lines, expected_env = _completo(ANINHADO, n=4, m=3)
+    program = parse(ANINHADO)
+
+    for cut in range(1, 40, 3):
+        lines = []
+        rt = Runtime(output=lines.append)
+        rt.env.update(n=4, m=3)
+        rt.start(program, ANINHADO)
+        if rt.resume(cut):
+            break
+        snapshot = Snapshot.from_bytes(Snapshot.capture(rt).to_bytes())
+
+        rest = []
+        restored = Runtime(output=rest.append)
+        snapshot.restore(restored, parse(ANINHADO), ANINHADO)
+        assert restored.resume()
+        assert lines + rest == expected_lines
+        assert restored.env == expected_env
+
+def test_snapshot_de_outro_programa():
+    """Testa que um snapshot não é aplicado a um programa diferente"""
+    rt = Runtime()
+    rt.start(parse(ANINHADO), ANINHADO)
+    rt.resume(2)
+    snapshot = Snapshot.capture(rt)
+    other = "Cheese Glyn(x) = 1; NoCheese"
+    with pytest.raises(Exception):
+        snapshot.restore(Runtime(), parse(other), other)
+
+def test_checkpoint_a_cada_n_passos(tmp_path):
+    """Testa que a execução completa grava snapshots e apaga o arquivo no fim"""
+    path = str(tmp_path / "estado.ckpt")
+    lines = []
+    checkpointer = Checkpointer(path, every=5, output=lines.append)
+    rt = Runtime()
+    rt.env.update(n=4, m=3)
+    checkpointer.run(parse(ANINHADO), ANINHADO, rt)
+
+    expected_lines, expected_env = _completo(ANINHADO, n=4, m=3)
+    assert checkpointer.saved > 0
+    assert lines == expected_lines
+    assert rt.env == expected_env
+    assert not os.path.exists(path)
+
+@pytest.mark.skipif(not hasattr(signal, "SIGUSR1"), reason="precisa de sinais POSIX")
+def test_interrompido_por_sinal_e_retomado(tmp_path):
+    """Testa que SIGTERM grava o estado e a próxima execução continua dele"""
+    path = str(tmp_path / "estado.ckpt")
+    program = parse(ANINHADO)
+
+    lines = []
+    first = Checkpointer(path, output=lines.append)
+    rt = Runtime()
+    rt.env.update(n=300, m=1000)
+    timer = threading.Timer(0.05, os.kill, (os.getpid(), signal.SIGTERM))
+    timer.start()
+    first.run(program, ANINHADO, rt)
+    timer.join()
+
+    assert first.interrupted
+    assert os.path.exists(path)
+
+    second = Checkpointer(path, output=lines.append)
+    rt = Runtime()
+    second.run(program, ANINHADO, rt)
+
+    assert second.resumed and not second.interrupted
+    assert lines == ["100"]
+    assert rt.env["i"] == 300
+    assert rt.env["total"] == 100 + 299 * 500500
@@ -0,0 +1,43 @@
+import sys
+import pytest
+from cheesepp.parser import parse
+from cheesepp.runtime import Runtime, postfix, APPLY, CONST, LOAD
+
+TERMOS = 20000
+
+def test_cadeia_longa_sem_recursao():
+    """Testa uma soma com mais termos que o limite de recursão do Python"""
+    assert TERMOS > sys.getrecursionlimit()
+    code = "Cheese Glyn(x) = " + " plus ".join(["1"] * TERMOS) + "; NoCheese"
+    rt = Runtime()
+    rt.run(parse(code), code)
+    assert rt.env["x"] == TERMOS
+
+def test_precedencia_preservada():
+    """Testa que a forma pós-fixa respeita precedência e parênteses"""
+    code = """Cheese
+Glyn(a) = 2;
+Glyn(b) = 3;
+Glyn(x) = a plus b times 4 minus (a plus b) divided 5;
+Glyn(y) = (a plus b) times (a minus b) greater 0;
+NoCheese"""
+    rt = Runtime()
+    rt.run(parse(code), code)
+    assert rt.env["x"] == 2 + 3 * 4 - (2 + 3) / 5
+    assert rt.env["y"] is False
+
+def test_forma_posfixa():
+    """Testa as instruções geradas para uma expressão"""
+    [assign] = parse("Cheese Glyn(x) = a plus 2 times b; NoCheese")
+    code = postfix(assign.value)
+    assert [kind for kind, _ in code] == [LOAD, CONST, LOAD, APPLY, APPLY]
+    assert [arg.op for kind, arg in code if kind == APPLY] == ['*', '+']
+
+def test_cadeia_longa_em_lote():
+    """Testa que o modo em lote também avalia cadeias longas sem recursão"""
+    pytest.importorskip("numpy")
+    from cheesepp.batch import BatchRuntime
+    code = "Cheese Glyn(y) = x" + " plus x" * (TERMOS - 1) + "; NoCheese"
+    rt = BatchRuntime(3)
+    rt.run(parse(code), code, inputs={"x": [0, 1, 2]})
+    assert list(rt.env["y"]) == [0, TERMOS, 2 * TERMOS]
@@ -0,0 +1,57 @@
+from cheesepp.parser import parse
+from cheesepp.runtime import Runtime
+from cheesepp.strings import StrBuilder, concat
+
+PEDACO = "x" * 300
+
+def _run(code, **env):
+    lines = []
+    rt = Runtime(output=lines.append)
+    rt.env.update(env)
+    result = rt.run(parse(code), code)
+    return rt, lines, result
+
+def test_concatenacao_em_loop():
+    """Testa que a string montada num loop sai igual à concatenação comum"""
+    code = f"""Cheese
+Glyn(i) = 0;
+Glyn(s) = Swiss>Swiss;
+Cheddar
+    Glyn(s) = s plus Swiss{PEDACO}Swiss plus Swiss;Swiss;
+    Glyn(i) = i plus 1;
+Coleraine i greater_equals 50
+Wensleydale(s);
+NoCheese"""
+    rt, lines, _ = _run(code)
+    expected = ">" + (PEDACO + ";") * 50
+    assert lines == [expected]
+    assert rt.env["s"] == expected
+    assert type(dict.get(rt.env, "s")) is str
+
+def test_valores_antigos_nao_mudam():
+    """Testa que estender uma cópia não altera o valor original"""
+    base = concat("a" * 300, "b")
+    first = base.append("1")
+    second = base.append("2")
+    assert str(base) == "a" * 300 + "b"
+    assert str(first) == "a" * 300 + "b1"
+    assert str(second) == "a" * 300 + "b2"
+    assert str(first.append("!")) == "a" * 300 + "b1!"
+
+def test_comparacoes_e_ambiente():
+    """Testa comparações com strings em construção e o ambiente achatado"""
+    code = f"""Cheese
+Glyn(s) = Swiss{PEDACO}Swiss plus Swissfim Swiss;
+Glyn(t) = s;
+Glyn(t) = t plus Swiss!Swiss;
+Glyn(igual) = s equals Swiss{PEDACO}fim Swiss;
+Glyn(menor) = s less t;
+s plus SwissultimoSwiss;
+NoCheese"""
+    rt, _, result = _run(code)
+    assert rt.env["igual"] is True
+    assert rt.env["menor"] is True
+    assert rt.env["s"] == PEDACO + "fim "
+    assert rt.env["t"] == PEDACO + "fim !"
+    assert result == PEDACO + "fim ultimo"
+    assert all(type(value) is not StrBuilder for value in rt.env.values())
@@ -0,0 +1,51 @@
+import threading
+from cheesepp.parser import parse
+from cheesepp.program import Program
+from cheesepp.transformer import ConstantPool
+
+def test_nomes_internados_entre_programas():
+    """Testa que o mesmo nome vira o mesmo objeto em programas diferentes"""
+    first = parse("Cheese Glyn(contador) = 1; NoCheese")
+    second = parse("Cheese Glyn(x) = contador plus 1; NoCheese")
+    assert first[0].name is second[0].value.left.name
+
+def test_literais_compartilhados():
+    """Testa que literais e variáveis repetidos são um único nó"""
+    pool = ConstantPool()
+    program = parse("""Cheese
+Glyn(a) = x plus 1;
+Glyn(b) = x plus 1;
+Glyn(c) = 1.0;
+Wensleydale(SwissoiSwiss);
+Wensleydale(SwissoiSwiss);
+NoCheese""", pool)
+    a, b, c, p1, p2 = program
+    assert a.value.left is b.value.left
+    assert a.value.right is b.value.right
+    assert c.value is not a.value.right
+    assert p1.expr is p2.expr
+    assert len(pool) == 5
+    assert pool.hits == 4
+
+def test_programa_guarda_o_pool():
+    """Testa que o Program mantém o pool e continua executando igual"""
+    program = Program("Cheese Glyn(y) = x times x plus x; NoCheese")
+    assert len(program.pool.vars) == 1
+    assert program.run({"x": 3}).env["y"] == 12
+
+def test_parse_em_varias_threads():
+    """Testa que parses simultâneos não misturam os pools"""
+    results = {}
+
+    def worker(n):
+        code = f"Cheese Glyn(v{n}) = {n} plus {n}; NoCheese"
+        results[n] = parse(code)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for n, program in results.items():
+        assert program[0].name == f"v{n}"
+        assert program[0].value.left.value == n
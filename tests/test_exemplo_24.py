@@ -0,0 +1,45 @@
+import pickle
+import pytest
+from cheesepp.ast import BinOp, Number
+from cheesepp.parser import parse
+from cheesepp.runtime import Runtime
+
+def test_subarvores_iguais_sao_o_mesmo_no():
+    """Testa que subexpressões estruturalmente iguais viram um único nó"""
+    a, b, c = parse("""Cheese
+Glyn(a) = (x plus 1) times (x plus 1);
+Glyn(b) = y minus (x plus 1) times (x plus 1);
+Glyn(c) = x plus 2;
+NoCheese""")
+    assert a.value.left is a.value.right
+    assert b.value.right is a.value
+    assert c.value is not a.value.left
+
+def test_nos_imutaveis():
+    """Testa que nós de expressão não podem ser alterados"""
+    [stmt] = parse("Cheese Glyn(a) = x plus 1; NoCheese")
+    with pytest.raises(AttributeError):
+        stmt.value.op = '-'
+    with pytest.raises(AttributeError):
+        Number(1).value = 2
+
+def test_pickle_preserva_a_arvore():
+    """Testa que a AST compartilhada sobrevive a pickle"""
+    program = parse("Cheese Glyn(a) = (x plus 1) times (x plus 1); NoCheese")
+    [stmt] = pickle.loads(pickle.dumps(program))
+    assert isinstance(stmt.value, BinOp)
+    assert stmt.value.left is stmt.value.right
+    assert stmt.value.left.right.value == 1
+
+def test_no_compartilhado_com_tipos_diferentes():
+    """Testa que o mesmo nó usado com tipos diferentes continua correto"""
+    code = """Cheese
+Glyn(x) = 1;
+Glyn(a) = x plus x;
+Glyn(x) = SwissabSwiss;
+Glyn(b) = x plus x;
+NoCheese"""
+    rt = Runtime()
+    rt.run(parse(code), code)
+    assert rt.env["a"] == 2
+    assert rt.env["b"] == "abab"
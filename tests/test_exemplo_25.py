@@ -0,0 +1,126 @@
+from cheesepp.ast import CheeseAssign, Var
+from cheesepp.cli import execute_file
+from cheesepp.parser import parse
+from cheesepp.program import Program
+from cheesepp.runtime import Runtime
+from cheesepp.optimizer import eliminate_common_subexpressions
+
+def _temporarios(program):
+    return [stmt for stmt in program if isinstance(stmt, CheeseAssign) and stmt.name.startswith('$')]
+
+def test_subexpressao_calculada_uma_vez():
+    """Testa que `x times y` repetido vira um único temporário"""
+    program = parse("""Cheese
+Glyn(a) = x times y plus 1;
+Glyn(b) = x times y minus 1;
+Glyn(c) = x times y times 2;
+NoCheese""")
+    optimized, stats = eliminate_common_subexpressions(program)
+
+    [temp] = _temporarios(optimized)
+    assert temp.value is program[0].value.left
+    assert all(isinstance(stmt.value.left, Var) for stmt in optimized[1:])
+    assert stats.temporaries == 1
+    assert stats.eliminated == 2
+
+def test_reatribuicao_invalida():
+    """Testa que reatribuir uma entrada impede o reaproveitamento"""
+    program = parse("""Cheese
+Glyn(a) = x times y plus 1;
+Glyn(x) = 5;
+Glyn(b) = x times y plus 1;
+NoCheese""")
+    optimized, stats = eliminate_common_subexpressions(program)
+    assert stats.temporaries == 0
+    assert len(optimized) == 3
+
+def test_loops_e_ramos():
+    """Testa que atribuições em Cheddar e Stilton invalidam os temporários"""
+    code = """Cheese
+Glyn(i) = 0;
+Glyn(s) = i times 2 plus 1;
+Cheddar
+    Glyn(s) = s plus i times 2 plus 1;
+    Glyn(i) = i plus 1;
+Coleraine i greater_equals 4
+Glyn(u) = i times 2 plus 1;
+Stilton s greater 10 Blue
+    Glyn(i) = 100;
+    Glyn(t) = i times 2 plus 1;
+White
+    Glyn(t) = i times 2 plus 1;
+    Wensleydale(Glyn(t));
+NoCheese"""
+    program = parse(code)
+    optimized, _ = eliminate_common_subexpressions(program)
+
+    expected = Runtime(output=lambda line: None)
+    expected.run(program, code)
+    lines = []
+    actual = Runtime(output=lines.append)
+    actual.run(optimized, code)
+    assert actual.env == expected.env
+    assert actual.env["t"] == 201
+    assert lines == []
+
+def test_temporarios_ocultos_e_estatisticas():
+    """Testa que o Program esconde os temporários e conta as avaliações eliminadas"""
+    program = Program("""Cheese
+Glyn(a) = (x plus y) times (x plus y);
+Stilton a greater 10 Blue
+    Glyn(b) = (x plus y) times (x plus y) minus 1;
+White
+    Glyn(b) = 0;
+NoCheese""")
+    result = program.run({"x": 2, "y": 3})
+    assert result.env == {"x": 2, "y": 3, "a": 25, "b": 24}
+    assert program.stats["cse_temporaries"] == 1
+    assert program.stats["cse_eliminated"] == 3
+    assert "cse" in program.timings
+
+def test_cli_so_com_optimize(tmp_path, capsys):
+    """Testa que na linha de comando a eliminação só roda com --optimize"""
+    path = tmp_path / "cse.cheesepp"
+    path.write_text("Cheese Glyn(a) = x times y plus 1; Glyn(b) = x times y minus 1; "
+                    "Glyn(c) = x times y times 2; Wensleydale(a); NoCheese")
+    assert execute_file(str(path), verbose=True) == 0
+    out = capsys.readouterr().out
+    assert "\n1\n" in out and "cse " not in out and "CSE:" not in out
+
+    assert execute_file(str(path), verbose=True, optimize=True) == 0
+    out = capsys.readouterr().out
+    assert "\n1\n" in out and "cse " in out
+    assert "CSE: 1 temporaries, 2 operator evaluations removed from the code (static count)" in out
+
+def test_avaliacoes_poupadas_na_execucao(tmp_path, capsys):
+    """Testa que o Runtime conta as avaliações poupadas em cada volta do Cheddar"""
+    code = """Cheese
+Glyn(i) = 0;
+Cheddar
+    Glyn(a) = x times y plus i;
+    Glyn(b) = x times y minus i;
+    Glyn(c) = (x times y) times (x times y);
+    Glyn(i) = i plus 1;
+Coleraine i greater_equals 1000
+NoCheese"""
+    optimized, stats = eliminate_common_subexpressions(parse(code))
+    assert stats.eliminated == 3
+    runtime = Runtime(output=lambda line: None)
+    runtime.env.update({"x": 3, "y": 4})
+    runtime.cse_savings = stats.savings
+    runtime.run(optimized, code)
+    assert runtime.cse_saved == 3000 and runtime.env["c"] == 144
+
+    # O temporário inteiro em vários comandos: só as repetições poupam
+    optimized, stats = eliminate_common_subexpressions(
+        parse("Cheese Glyn(a) = x times y; Glyn(b) = x times y; Glyn(c) = x times y; NoCheese"))
+    runtime = Runtime(output=lambda line: None)
+    runtime.cse_savings = stats.savings
+    runtime.run(optimized)
+    assert runtime.cse_saved == stats.eliminated == 2
+
+    path = tmp_path / "laco.cheesepp"
+    path.write_text(code)
+    assert execute_file(str(path), verbose=True, optimize=True) == 0
+    out = capsys.readouterr().out
+    assert "; CSE saved 3000 evaluations" in out and "3 operator evaluations removed" in out
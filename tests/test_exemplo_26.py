@@ -0,0 +1,116 @@
+import random
+import pytest
+from lark.exceptions import LarkError
+from cheesepp.ast import *
+from cheesepp.incremental import Document
+from cheesepp.parser import parse
+from cheesepp.runtime import Runtime
+
+def _same(a, b):
+    """Compara comandos; expressões do mesmo pool são comparadas por identidade"""
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, list):
+        return len(a) == len(b) and all(_same(x, y) for x, y in zip(a, b))
+    if isinstance(a, Expression):
+        return a is b
+    if isinstance(a, CheeseAssign):
+        return a.name == b.name and a.value is b.value
+    if isinstance(a, CheesePrint):
+        return a.expr is b.expr
+    if isinstance(a, CheeseIf):
+        return (a.condition is b.condition and _same(a.then_branch, b.then_branch)
+                and _same(a.else_branch, b.else_branch))
+    if isinstance(a, CheeseLoop):
+        return a.condition is b.condition and _same(a.body, b.body)
+    return True
+
+def _check(document):
+    assert _same(document.statements, parse(document.text, document.pool))
+
+def test_edicao_reanalisa_so_o_comando():
+    """Testa que trocar um dígito reanalisa poucos comandos e reaproveita o resto"""
+    code = "Cheese\n" + "\n".join(f"Glyn(a{i}) = a{i} plus {i};" for i in range(20)) + "\nNoCheese"
+    document = Document(code)
+    before = list(document.statements)
+
+    position = code.index("plus 10;") + len("plus ")
+    document.edit(position, position + 2, "99")
+
+    assert document.reparsed <= 3
+    assert document.statements[10].value.right.value == 99
+    assert all(document.statements[i] is before[i] for i in range(20) if abs(i - 10) > 1)
+    _check(document)
+
+def test_cheddar_e_stilton_nas_fronteiras():
+    """Testa edições que continuam a condição de um Cheddar ou entram no White de um Stilton"""
+    document = Document("""Cheese
+Glyn(a) = 1;
+Cheddar Glyn(i) = i plus 1; Coleraine i greater 3
+Glyn(b) = 2;
+Stilton a greater 0 Blue Glyn(c) = 1; White Glyn(c) = 2;
+NoCheese""")
+    loop_end = document.text.index("greater 3") + len("greater 3")
+    document.edit(loop_end, loop_end, " plus 1")
+    assert document.statements[1].condition.right.op == '+'
+    _check(document)
+
+    footer = document.text.index("NoCheese")
+    document.edit(footer, footer, "Wensleydale(c);\n")
+    assert len(document.statements) == 4
+    assert isinstance(document.statements[-1].else_branch[-1], CheesePrint)
+    _check(document)
+
+def test_erro_de_sintaxe_e_recuperacao():
+    """Testa que um erro deixa o texto editado e a correção volta a analisar"""
+    document = Document("Cheese\nGlyn(a) = 1;\nGlyn(b) = a plus 1;\nNoCheese")
+    semicolon = document.text.index(";")
+    with pytest.raises(LarkError):
+        document.edit(semicolon, semicolon + 1, "")
+    assert document.text == "Cheese\nGlyn(a) = 1\nGlyn(b) = a plus 1;\nNoCheese"
+    assert len(document.statements) == 2
+
+    document.edit(semicolon, semicolon, " Brie")
+    _check(document)
+
+def test_codigo_compilado_reaproveitado():
+    """Testa que reescrever uma expressão devolve o mesmo nó já compilado pelo runtime"""
+    document = Document("Cheese\nGlyn(a) = 2;\nGlyn(b) = (a plus 1) times 3;\nNoCheese")
+    runtime = Runtime(output=lambda line: None)
+    runtime.run(document.statements, document.text)
+    expr = document.statements[1].value
+    assert expr in runtime.code
+
+    three = document.text.index("3")
+    document.edit(three, three + 1, "4")
+    document.edit(three, three + 1, "3")
+    assert document.statements[1].value is expr
+    runtime.run(document.statements, document.text)
+    assert runtime.env["b"] == 9
+
+def test_edicoes_aleatorias():
+    """Testa edições aleatórias contra a análise completa do texto"""
+    statements = ["Glyn(a) = 1;", "Glyn(b) = a plus 2 Brie", "Wensleydale(a);", ";",
+                  "Glyn(c) Cheddar b times 3 Coleraine", "Belgian;", "x plus 1;",
+                  "Cheddar Glyn(i) = i plus 1; Coleraine i greater 3"]
+    pieces = [" ", "x", "1", ";", "plus ", "Brie", "Swiss", "Coleraine", "(", ")",
+              "Glyn(q) = 3;", "Stilton a Blue ", "White "]
+    rng = random.Random(7)
+    for _ in range(40):
+        code = "Cheese\n" + "\n".join(rng.choice(statements) for _ in range(25)) + "\nNoCheese"
+        document = Document(code)
+        for _ in range(10):
+            text = document.text
+            start = rng.randint(0, len(text))
+            end = min(len(text), start + rng.choice([0, 1, 3]))
+            new_text = rng.choice(pieces)
+            try:
+                expected = parse(text[:start] + new_text + text[end:], document.pool)
+            except LarkError:
+                with pytest.raises(LarkError):
+                    document.edit(start, end, new_text)
+                document.edit(start, start + len(new_text), text[start:end])
+                expected = parse(text, document.pool)
+            else:
+                document.edit(start, end, new_text)
+            assert _same(document.statements, expected)
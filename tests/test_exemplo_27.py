@@ -0,0 +1,47 @@
+from cheesepp.ctx import SymbolTable, SymbolType
+
+def test_sombreamento_restaurado():
+    """Testa que sair de um escopo devolve o símbolo externo escondido"""
+    table = SymbolTable()
+    table.define("x", SymbolType.VARIABLE, 1)
+    table.enter_scope()
+    table.define("x", SymbolType.VARIABLE, 2)
+    table.define("y", SymbolType.VARIABLE, 3)
+    assert table.lookup("x").value == 2
+
+    table.exit_scope()
+    assert table.lookup("x").value == 1
+    assert table.lookup("x").scope_level == 0
+    assert table.lookup("y") is None
+
+def test_definir_e_atualizar_no_escopo():
+    """Testa redefinição no mesmo escopo e atualização do símbolo mais interno"""
+    table = SymbolTable()
+    assert table.define("x", SymbolType.VARIABLE, 1)
+    assert not table.define("x", SymbolType.VARIABLE, 5)
+    table.enter_scope()
+    assert table.define("x", SymbolType.VARIABLE, 2)
+    assert table.update("x", 20)
+    assert not table.update("z", 0)
+    table.exit_scope()
+    assert table.lookup("x").value == 1
+
+    # Sair do escopo global não apaga nada
+    table.exit_scope()
+    assert table.lookup("x").value == 1
+
+def test_aninhamento_profundo():
+    """Testa muitos escopos aninhados escondendo o mesmo nome"""
+    table = SymbolTable()
+    for level in range(1000):
+        table.define("x", SymbolType.VARIABLE, level)
+        table.define(f"local{level}", SymbolType.VARIABLE, level)
+        table.enter_scope()
+    assert table.lookup("x").value == 999
+
+    for level in reversed(range(1000)):
+        table.exit_scope()
+        assert table.lookup("x").value == level
+        assert table.lookup(f"local{level}").value == level
+        assert table.lookup(f"local{level + 1}") is None
+    assert len(table.get_all_symbols()) == 2
@@ -0,0 +1,72 @@
+from cheesepp import compile_and_run
+from cheesepp.cli import execute_file
+from cheesepp.ctx import CheeseContext
+from cheesepp.parser import parse
+from cheesepp.runtime import Runtime
+
+CODE = """Cheese
+Glyn(i) = 0;
+Cheddar
+    Glyn(i) = i plus 1;
+Coleraine i greater_equals 3
+Wensleydale(Glyn(i));
+Belgian;
+NoCheese"""
+
+def test_saida_e_estatisticas_no_contexto():
+    """Testa que a saída e os contadores do runtime chegam ao contexto"""
+    context = CheeseContext()
+    runtime = Runtime(context=context)
+    runtime.run(parse(CODE), CODE)
+
+    assert context.get_output().split("\n")[:2] == ["3", "=== Belgian Mode ==="]
+    # 7 comandos (3 voltas do corpo), 3 testes da condição na volta do loop,
+    # e o Belgian não avalia expressão
+    assert context.get_statistics() == {
+        "variables_declared": 1,
+        "functions_called": 2,
+        "expressions_evaluated": 9,
+        "statements_executed": 7,
+    }
+
+def test_variaveis_pelo_contexto():
+    """Testa que variáveis do contexto entram na execução e o resultado volta para ele"""
+    context = CheeseContext()
+    context.declare_variable("x", 20)
+    runtime = Runtime(context=context)
+    code = "Cheese Glyn(y) = x plus 1; NoCheese"
+    runtime.run(parse(code), code)
+    assert context.get_variable("y") == 21
+
+    context.set_variable("x", 1)
+    runtime.run(parse(code), code)
+    assert context.get_variable("y") == 2
+    assert context.get_statistics()["variables_declared"] == 2
+
+def test_sincroniza_so_o_que_o_programa_usa():
+    """Testa que só as variáveis lidas entram no runtime e só as atribuídas voltam ao contexto"""
+    context = CheeseContext()
+    for i in range(1000):
+        context.declare_variable(f"v{i}", i)
+    runtime = Runtime(context=context)
+    runtime.env["entrada"] = 7
+    code = "Cheese Glyn(y) = v5 plus entrada; NoCheese"
+    runtime.run(parse(code), code)
+
+    assert dict(runtime.env) == {"entrada": 7, "v5": 5, "y": 12}
+    assert context.get_variable("y") == 12 and context.get_variable("entrada") is None
+    assert context.get_statistics()["variables_declared"] == 1001
+
+def test_modo_detalhado_com_numeros_reais(tmp_path, capsys):
+    """Testa que o modo detalhado do CLI mostra a saída e estatísticas reais"""
+    path = tmp_path / "programa.cheesepp"
+    path.write_text(CODE)
+    assert execute_file(str(path), verbose=True) == 0
+    out = capsys.readouterr().out
+    assert "\n3\n" in out
+    assert "'statements_executed': 7" in out
+
+def test_compile_and_run_devolve_a_saida(capsys):
+    """Testa que compile_and_run devolve a saída em vez de imprimir"""
+    assert compile_and_run("Cheese Wensleydale(1 plus 1); Wensleydale(SwissokSwiss); NoCheese") == "2\nok"
+    assert capsys.readouterr().out == ""
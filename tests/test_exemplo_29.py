@@ -0,0 +1,108 @@
+from cheesepp.node import *
+
+def _program():
+    # x = a + 1; Wensleydale(b)
+    assign = AssignmentNode("x", BinaryOpNode(VariableNode("a"), "+", LiteralNode(1, "int")))
+    show = PrintNode(VariableNode("b"))
+    return ProgramNode([assign, show])
+
+def _labels(nodes):
+    return [getattr(n, "name", None) or getattr(n, "variable", None)
+            or getattr(n, "operator", None) or str(getattr(n, "value", n.node_type.value))
+            for n in nodes]
+
+def test_ordens_de_percurso():
+    """Testa pré-ordem, pós-ordem e largura com os geradores"""
+    program = _program()
+    assert _labels(ASTTraverser.iter_preorder(program)) == ["program", "x", "+", "a", "1", "statement", "b"]
+    assert _labels(ASTTraverser.iter_postorder(program)) == ["a", "1", "+", "x", "b", "statement", "program"]
+    assert _labels(ASTTraverser.iter_breadth_first(program)) == ["program", "x", "statement", "+", "b", "a", "1"]
+
+def test_arvore_profunda_sem_recursao():
+    """Testa percursos, busca e ast_to_dict numa cadeia de 20 mil operadores"""
+    expr = VariableNode("v")
+    for i in range(20_000):
+        expr = BinaryOpNode(expr, "+", LiteralNode(i, "int"))
+    program = ProgramNode([AssignmentNode("x", expr)])
+
+    assert sum(1 for _ in ASTTraverser.iter_preorder(program)) == 40_003
+    assert len(ASTTraverser.find_nodes_by_type(program, NodeType.LITERAL)) == 20_000
+    assert len(ASTTraverser.find_nodes_by_type(expr.left, NodeType.BINARY_OP)) == 19_999
+
+    data = ast_to_dict(program)
+    node = data["children"][0]["children"][0]
+    depth = 0
+    while node["children"]:
+        node = node["children"][0]
+        depth += 1
+    assert depth == 20_000 and node["name"] == "v"
+
+def test_indice_acompanha_a_arvore():
+    """Testa que o índice por tipo segue add_child, remove_child e reparentes"""
+    program = _program()
+    assign, show = program.children
+    assert set(ASTTraverser.find_nodes_by_type(program, NodeType.VARIABLE)) == {assign.value.left, show.children[0]}
+
+    program.remove_child(assign)
+    assert _labels(ASTTraverser.find_nodes_by_type(program, NodeType.VARIABLE)) == ["b"]
+    assert _labels(ASTTraverser.find_nodes_by_type(assign, NodeType.VARIABLE)) == ["a"]
+
+    # Mover a expressão de um pai para outro leva os nós dela junto
+    other = ProgramNode([])
+    other.add_child(assign.value)
+    assert assign.children == []
+    assert ASTTraverser.find_nodes_by_type(assign, NodeType.LITERAL) == []
+    assert len(ASTTraverser.find_nodes_by_type(other, NodeType.LITERAL)) == 1
+
+    program.add_child(other)
+    assert sorted(_labels(ASTTraverser.find_nodes_by_type(program, NodeType.VARIABLE))) == ["a", "b"]
+    assert ASTTraverser.find_nodes_by_type(program, NodeType.BINARY_OP) == [other.children[0]]
+
+def test_filho_compartilhado():
+    """Testa que um nó usado duas vezes nos construtores é copiado"""
+    x = BinaryOpNode(VariableNode("a"), "*", LiteralNode(2, "int"))
+    soma = BinaryOpNode(x, "+", x)
+    assert soma.left is x and soma.right is not x
+    assert soma.children == [soma.left, soma.right] and soma.right.parent is soma
+    assert _labels(ASTTraverser.iter_preorder(soma)) == ["+", "*", "a", "2", "*", "a", "2"]
+    assert len(ASTTraverser.find_nodes_by_type(soma, NodeType.VARIABLE)) == 2
+
+    # Um nó de outra árvore também entra como cópia, sem sair da original
+    program = ProgramNode([AssignmentNode("y", soma), PrintNode(x)])
+    assert program.children[1].expression is not x and x.parent is soma
+    assert len(ASTTraverser.find_nodes_by_type(program, NodeType.BINARY_OP)) == 4
+
+    # add_child move o nó: ele sai do pai anterior
+    program.add_child(x)
+    assert x.parent is program and soma.children == [soma.right]
+    assert len(ASTTraverser.find_nodes_by_type(program, NodeType.BINARY_OP)) == 4
+
+def test_busca_em_pre_ordem():
+    """Testa que a busca na raiz e numa subárvore devolve os nós em pré-ordem"""
+    program = _program()
+    assign, show = program.children
+    novo = PrintNode(VariableNode("c"))
+    program.add_child(novo)
+    # Mover um nó para o começo da árvore muda a ordem da busca
+    show.add_child(assign.value.left)
+    walked = [n for n in ASTTraverser.iter_preorder(program) if n.node_type == NodeType.VARIABLE]
+    assert _labels(walked) == ["b", "a", "c"]
+    assert ASTTraverser.find_nodes_by_type(program, NodeType.VARIABLE) == walked
+    assert ASTTraverser.find_nodes_by_type(show, NodeType.VARIABLE) == walked[:2]
+    assert set(ASTTraverser.find_nodes_by_type_unordered(program, NodeType.VARIABLE)) == set(walked)
+
+def test_busca_igual_ao_percurso():
+    """Testa que a busca indexada acha os mesmos nós que o percurso completo"""
+    statements = []
+    for i in range(50):
+        condition = BinaryOpNode(VariableNode(f"v{i}"), ">", LiteralNode(i, "int"))
+        body = BlockNode([AssignmentNode(f"v{i}", LiteralNode(0, "int")), PrintNode(VariableNode(f"v{i}"))])
+        statements.append(ConditionalNode(condition, body) if i % 2 else LoopNode(body, condition))
+    program = ProgramNode(statements)
+    for statement in statements[::7]:
+        program.remove_child(statement)
+
+    for node_type in NodeType:
+        found = ASTTraverser.find_nodes_by_type(program, node_type)
+        walked = [n for n in ASTTraverser.iter_preorder(program) if n.node_type == node_type]
+        assert set(found) == set(walked) and len(found) == len(walked)
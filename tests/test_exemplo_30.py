@@ -0,0 +1,102 @@
+import glob
+import os
+import pickle
+import pytest
+from cheesepp.ast import *
+from cheesepp.errors import CheeseRuntimeError
+from cheesepp.node import *
+from cheesepp.parser import parse
+from cheesepp.program import Program
+from cheesepp.runtime import Runtime
+from cheesepp.serialize import dump_tree, dumps, load_tree, loads
+from cheesepp.transformer import ConstantPool
+
+EXEMPLOS = os.path.join(os.path.dirname(__file__), "..", "exemplos")
+
+def _output(program, code):
+    lines = []
+    Runtime(output=lines.append).run(program, code)
+    return lines
+
+def test_exemplos_ida_e_volta():
+    """Testa que cada exemplo volta do formato binário e imprime o mesmo"""
+    for path in sorted(glob.glob(os.path.join(EXEMPLOS, "*.cheesepp"))):
+        with open(path) as f:
+            code = f.read()
+        ast = parse(code)
+        source, loaded = loads(dumps(code, ast))
+        assert source == code
+        assert _output(loaded, code) == _output(ast, code)
+        # Codificar de novo dá exatamente os mesmos bytes
+        assert dumps(code, loaded) == dumps(code, ast)
+
+def test_expressoes_compartilhadas():
+    """Testa que uma expressão repetida é gravada uma vez e volta compartilhada"""
+    code = "Cheese Glyn(x) = (a plus 1) times (a plus 1); Wensleydale(a plus 1); NoCheese"
+    pool = ConstantPool()
+    ast = parse(code, pool)
+    data = dumps(ast)
+    # Cada string entra uma vez na tabela; as repetições viram referências
+    assert data.count(b"+") == 1 and data.count(b"a") == 1
+    assert len(data) < 40
+
+    (loaded,) = loads(data, pool)
+    assert loaded[0].value is ast[0].value
+    assert loaded[1].expr is loaded[0].value.left is loaded[0].value.right
+
+    # Sem o pool original, o compartilhamento continua valendo entre as cópias
+    (fresh,) = loads(data)
+    assert fresh[1].expr is fresh[0].value.left
+    assert fresh[1].expr is not ast[1].expr
+
+def test_cadeia_profunda_e_literais():
+    """Testa uma cadeia de 50 mil operações, floats, strings e comandos vazios"""
+    pool = ConstantPool()
+    expr = pool.var("x")
+    for i in range(50_000):
+        expr = pool.binop(expr, "+" if i % 2 else "-", pool.number(i if i % 3 else -i * 1.5))
+    program = [CheeseAssign("y", expr), None, CheeseIf(pool.var("y"), [CheesePrint(pool.string("sim"))],
+                                                       [None, Belgian()])]
+    (loaded,) = loads(dumps(program), pool)
+    assert loaded[0].value is expr
+    assert loaded[1] is None
+    assert loaded[2].else_branch[0] is None and isinstance(loaded[2].else_branch[1], Belgian)
+    assert loaded[2].then_branch[0].expr.value == "sim"
+
+def test_arvore_de_nodes():
+    """Testa a ida e volta de todos os nós de node.py, com posições e atributos"""
+    tree = ProgramNode([
+        AssignmentNode("x", BinaryOpNode(VariableNode("a", Position(2, 5)), "+", LiteralNode(1.5, "float")),
+                       "Cheddar...Coleraine", Position(2, 1)),
+        ConditionalNode(VariableNode("c"), BlockNode([PrintNode(LiteralNode("oi", "string")), DebugNode()])),
+        LoopNode(BlockNode([]), UnaryOpNode("-", FunctionCallNode("f", [LiteralNode(None, "none"),
+                                                                        LiteralNode(True, "bool")])), "do"),
+    ])
+    data = dump_tree(tree)
+    loaded = load_tree(data)
+    assert dump_tree(loaded) == data
+
+    assign, conditional, loop = loaded.children
+    assert assign.assignment_type == "Cheddar...Coleraine" and assign.position == Position(2, 1)
+    assert assign.value.left.position == Position(2, 5) and assign.value.right.value == 1.5
+    assert conditional.else_branch is None and len(conditional.children) == 2
+    assert isinstance(conditional.then_branch.children[1], DebugNode)
+    assert loop.loop_type == "do" and loop.condition.operand.arguments[1].value is True
+    assert len(ASTTraverser.find_nodes_by_type(loaded, NodeType.LITERAL)) == 4
+
+def test_program_em_bytes_e_pickle():
+    """Testa Program.from_bytes, pickle de Program e dados corrompidos"""
+    code = "Cheese Glyn(y) = x times 2 plus x times 2; Wensleydale(y); NoCheese"
+    program = Program(code)
+    loaded = Program.from_bytes(program.to_bytes())
+    assert loaded.source == code
+    assert loaded.run({"x": 3}).output == ["12"]
+    assert pickle.loads(pickle.dumps(program)).run({"x": 1}).output == ["4"]
+
+    data = program.to_bytes()
+    with pytest.raises(CheeseRuntimeError):
+        loads(data[:-3])
+    with pytest.raises(CheeseRuntimeError):
+        loads(b"XYZ" + data[3:])
+    with pytest.raises(CheeseRuntimeError):
+        load_tree(data)
@@ -0,0 +1,123 @@
+import pytest
+from cheesepp.ast import *
+from cheesepp.batch import BatchRuntime
+from cheesepp.columnar import assigned_names
+from cheesepp.errors import CheeseSemanticError
+from cheesepp.ir import IRVisitor, dispatch_table, iter_nodes, iter_statements, lower
+from cheesepp.node import *
+from cheesepp.parser import parse
+from cheesepp.runtime import Runtime
+from cheesepp.transformer import ConstantPool
+
+CODE = """Cheese
+Glyn(i) = 0;
+Cheddar
+    Glyn(i) = i plus 1;
+Coleraine i greater_equals 3
+Stilton i equals 3 Blue Wensleydale(SwissprontoSwiss); White Wensleydale(i);
+NoCheese"""
+
+def _tree():
+    """A mesma lógica de CODE montada com node.py"""
+    return ProgramNode([
+        AssignmentNode("i", LiteralNode(0, "int")),
+        LoopNode(BlockNode([AssignmentNode("i", BinaryOpNode(VariableNode("i"), "plus", LiteralNode(1, "int")))]),
+                 BinaryOpNode(VariableNode("i"), ">=", LiteralNode(3, "int")), "until"),
+        ConditionalNode(BinaryOpNode(VariableNode("i"), "==", LiteralNode(3, "int")),
+                        PrintNode(LiteralNode("pronto", "string")),
+                        BlockNode([FunctionCallNode("Wensleydale", [VariableNode("i")])])),
+    ])
+
+def _output(program):
+    lines = []
+    Runtime(output=lines.append).run(program)
+    return lines
+
+def test_lower_igual_ao_parser():
+    """Testa que a árvore de node.py vira o mesmo IR que o parser produz"""
+    pool = ConstantPool()
+    parsed = parse(CODE, pool)
+    lowered = lower(_tree(), pool)
+    assert lowered[1].condition is parsed[1].condition
+    assert lowered[1].body[0].value is parsed[1].body[0].value
+    assert _output(lowered) == _output(parsed) == ["pronto"]
+
+def test_engines_aceitam_node_py():
+    """Testa Runtime e BatchRuntime executando uma árvore de node.py"""
+    assert _output(_tree()) == ["pronto"]
+    # 'while' repete enquanto a condição vale
+    tree = ProgramNode([LoopNode(AssignmentNode("n", BinaryOpNode(VariableNode("n"), "-", LiteralNode(1, "int"))),
+                                 BinaryOpNode(VariableNode("n"), ">", LiteralNode(0, "int")))])
+    batch = BatchRuntime(3)
+    env = batch.run(tree, inputs={"n": [0, 2, 5]})
+    assert list(env["n"]) == [0, 0, 0]
+
+def test_not_com_strings():
+    """Testa que `not` e a condição do 'while' tratam a string vazia como falsa"""
+    tree = ProgramNode([
+        AssignmentNode("s", LiteralNode("", "string")),
+        PrintNode(UnaryOpNode("not", VariableNode("s"))),
+        PrintNode(UnaryOpNode("not", LiteralNode("queijo", "string"))),
+        PrintNode(UnaryOpNode("!", LiteralNode(0.0, "float"))),
+        PrintNode(UnaryOpNode("not", LiteralNode(7, "int"))),
+        # 'while' com uma string: repete enquanto ela não está vazia
+        AssignmentNode("t", LiteralNode("abc", "string")),
+        AssignmentNode("n", LiteralNode(0, "int")),
+        LoopNode(BlockNode([AssignmentNode("n", BinaryOpNode(VariableNode("n"), "+", LiteralNode(1, "int"))),
+                            AssignmentNode("t", LiteralNode("", "string"))]),
+                 VariableNode("t"), "while"),
+        PrintNode(VariableNode("n")),
+    ])
+    assert _output(lower(tree)) == ["True", "False", "True", "False", "1"]
+
+def test_lower_rejeita_o_que_nao_existe():
+    """Testa o erro semântico, com posição, para nós sem equivalente"""
+    tree = ProgramNode([PrintNode(FunctionCallNode("sqrt", [LiteralNode(4, "int")], Position(3, 7)))])
+    with pytest.raises(CheeseSemanticError) as error:
+        lower(tree)
+    assert error.value.error_info.line_number == 3
+    with pytest.raises(CheeseSemanticError):
+        lower(ProgramNode([AssignmentNode("x", PrintNode(LiteralNode(1, "int")))]))
+
+def test_visitor_por_tabela():
+    """Testa a tabela por classe, herança de métodos e argumentos extras"""
+    class Names(IRVisitor):
+        def __init__(self):
+            self.reads, self.writes = [], []
+
+        def visit_var(self, node):
+            self.reads.append(node.name)
+
+        def visit_assign(self, node, prefix=""):
+            self.writes.append(prefix + node.name)
+
+    class Louder(Names):
+        def visit_print(self, node, prefix=""):
+            self.writes.append(prefix + "print")
+
+    program = parse(CODE)
+    names = Names()
+    names.walk(program)
+    assert names.reads == ["i", "i", "i", "i"]
+    assert names.writes == ["i", "i"]
+    assert Names._dispatch[CheeseAssign] is Names.visit_assign
+    assert Names._dispatch[CheesePrint] is Names.generic_visit
+
+    louder = Louder()
+    louder.visit(program[0], "> ")
+    louder.visit(CheesePrint(Number(1)), "> ")
+    louder.visit_block([None, Belgian()])
+    assert louder.writes == ["> i", "> print"]
+    assert dispatch_table(Louder, "visit_")[Var] is Names.visit_var
+
+def test_percursos_sem_recursao():
+    """Testa iter_nodes numa cadeia de 50 mil operações e a ordem de iter_statements"""
+    expr = Var("x")
+    for i in range(50_000):
+        expr = BinOp(expr, "+", Number(i))
+    assert sum(1 for _ in iter_nodes([CheeseAssign("y", expr)])) == 100_002
+
+    program = parse(CODE)
+    kinds = [type(stmt).__name__ for stmt in iter_statements(program)]
+    assert kinds == ["CheeseAssign", "CheeseLoop", "CheeseAssign", "CheeseIf", "CheesePrint", "CheesePrint"]
+    assert assigned_names(program) == ["i"]
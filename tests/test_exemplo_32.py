@@ -0,0 +1,88 @@
+import pytest
+from cheesepp.cli import CheeseREPL
+from cheesepp.ctx import CheeseContext
+from cheesepp.errors import CheeseLexicalError, CheeseSyntaxError, ErrorReporter
+from cheesepp.parser import parse, parse_statements
+from cheesepp.session import Session
+from cheesepp.transformer import ConstantPool
+
+def test_comandos_soltos():
+    """Testa parse_statements e entradas com e sem Cheese/NoCheese e sem ';'"""
+    pool = ConstantPool()
+    assert parse_statements("Glyn(x) = a plus 1;", pool)[0].value is parse("Cheese Glyn(y) = a plus 1; NoCheese", pool)[0].value
+
+    session = Session()
+    session.execute("Glyn(x) = 2")
+    session.execute("Glyn(y) = x times 3; Glyn(s) = SwissqueijoSwiss;")
+    session.execute("Cheese Wensleydale(y plus x); NoCheese")
+    assert session.context.get_output() == "8"
+    assert dict(session.variables) == {"x": 2, "y": 6, "s": "queijo"}
+
+def test_erros_de_sintaxe_na_entrada():
+    """Testa que os erros da entrada vêm como CheeseSyntaxError na linha da própria entrada"""
+    session = Session()
+    with pytest.raises(CheeseSyntaxError) as info:
+        session.execute("Glyn(z) = ")
+    assert info.value.error_info.line_number == 1
+    assert info.value.error_info.message == "Incomplete statement at the end of the input"
+    with pytest.raises(CheeseSyntaxError) as info:
+        session.execute("Glyn(a) = 1;\nGlyn(b) = ;")
+    assert (info.value.error_info.line_number, info.value.error_info.column_number) == (2, 11)
+    with pytest.raises(CheeseLexicalError) as info:
+        session.execute("Cheese Glyn(c) = 1 @ 2; NoCheese")
+    assert info.value.error_info.line_number == 1
+
+    reporter = ErrorReporter()
+    assert parse_statements("Glyn(x) = 1;\nWensleydale(;\nGlyn(y) = ;", reporter=reporter) is not None
+    assert [e.error_info.line_number for e in reporter.errors] == [2, 3]
+
+def test_variaveis_sao_uma_visao():
+    """Testa que `variables` acompanha o runtime sem cópia e não aceita escrita"""
+    session = Session()
+    view = session.variables
+    session.execute("Glyn(a) = 1;")
+    assert view["a"] == 1
+    session.execute("Glyn(a) = a plus 1;")
+    assert view["a"] == 2 and len(view) == 1
+    with pytest.raises(TypeError):
+        view["a"] = 5
+
+def test_codigo_continua_quente():
+    """Testa o cache de entradas, o pool compartilhado e o código pós-fixo entre entradas"""
+    session = Session(cache_size=2)
+    session.execute("Glyn(x) = (a plus 1) times 2;")
+    program, names = session.compile("Glyn(x) = (a plus 1) times 2;")
+    assert session.hits == 1 and names == ("x",)
+    other, _ = session.compile("Glyn(y) = (a plus 1) times 2;")
+    # A mesma expressão em outra entrada é o mesmo nó e já tem código
+    assert other[0].value is program[0].value
+    assert other[0].value in session.runtime.code
+
+    session.compile("Wensleydale(x);")
+    session.compile("Wensleydale(y);")
+    assert len(session._compiled) == 2
+
+    code = session.runtime.code
+    session.reset()
+    assert len(session.variables) == 0 and session.runtime.code is code
+
+def test_contexto_recebe_so_a_entrada():
+    """Testa que o contexto recebe as variáveis atribuídas e os contadores de cada entrada"""
+    context = CheeseContext(keep_output=False)
+    session = Session(context)
+    session.execute("Glyn(a) = 1; Glyn(b) = 2;")
+    session.execute("Glyn(a) = a plus b; Wensleydale(a);")
+    assert context.get_variable("a") == 3 and context.get_variable("b") == 2
+    stats = context.get_statistics()
+    assert stats["variables_declared"] == 2
+    assert stats["statements_executed"] == 4 and stats["functions_called"] == 1
+
+def test_repl_usa_a_sessao(capsys):
+    """Testa o REPL com comandos soltos, vars e reset"""
+    repl = CheeseREPL()
+    repl.welcome_message()
+    for line in ["Glyn(x) = 4", "Wensleydale(x times 2);", "vars", "reset", "vars"]:
+        assert repl.execute_line(line)
+    out = capsys.readouterr().out
+    assert "8" in out and "x = 4" in out and "No variables defined" in out
+    assert repl.history == ["Glyn(x) = 4", "Wensleydale(x times 2);"]
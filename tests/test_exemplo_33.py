@@ -0,0 +1,73 @@
+import pytest
+from lark.exceptions import LarkError
+from cheesepp import compile_and_run
+from cheesepp.cli import execute_file
+from cheesepp.errors import CheeseLexicalError, CheeseSyntaxError, ErrorReporter, ErrorType
+from cheesepp.parser import parse
+
+CODE = """Cheese
+Glyn(x) = 1 @ 2;
+Glyn(y) = );
+Cheddar Glyn(x) = x plus ; Coleraine x greater 3
+Wensleydale(x);
+NoCheese"""
+
+def _errors(code, max_errors=10):
+    reporter = ErrorReporter()
+    reporter.max_errors = max_errors
+    program = parse(code, reporter=reporter)
+    return program, reporter
+
+def test_todos_os_erros_numa_passada():
+    """Testa que os erros de várias linhas saem numa só análise, com posições"""
+    program, reporter = _errors(CODE)
+    positions = [(e.error_info.line_number, e.error_info.column_number) for e in reporter.errors]
+    assert positions == [(2, 13), (3, 11), (4, 26)]
+    assert isinstance(reporter.errors[0], CheeseLexicalError)
+    assert reporter.errors[0].error_info.message == "Invalid character '@'"
+    assert all(isinstance(e, CheeseSyntaxError) for e in reporter.errors[1:])
+    assert reporter.errors[1].error_info.message == "Invalid syntax near ')'"
+    assert reporter.errors[1].error_info.context == "Glyn(y) = );"
+    # Os comandos corretos continuam no resultado: o laço e o Wensleydale
+    assert [type(stmt).__name__ for stmt in program] == ["CheeseLoop", "CheesePrint"]
+
+def test_ressincroniza_em_blocos():
+    """Testa a volta ao bloco aberto em Coleraine e o Cheese que falta"""
+    program, reporter = _errors("Cheese Cheddar Glyn(x) = 1 Coleraine x equals 1 Wensleydale(x); NoCheese")
+    assert reporter.get_error_count() == 1
+    assert [type(stmt).__name__ for stmt in program] == ["CheeseLoop", "CheesePrint"]
+
+    program, reporter = _errors("Glyn(x) = 2; Wensleydale(x); NoCheese")
+    assert reporter.errors[0].error_info.message == "Missing 'Cheese' at the beginning of the program"
+    assert len(program) == 2
+
+    program, reporter = _errors("Cheese Glyn(x) = 1; Wensleydale(SwissSem fimSwiss);")
+    assert program is None
+    assert reporter.errors[-1].error_info.message == "Missing 'NoCheese' at the end of the program"
+
+def test_limite_de_erros_e_caracteres():
+    """Testa max_errors, caracteres inválidos e o parse sem reporter"""
+    code = "Cheese " + "Glyn(x) = ; " * 30 + "NoCheese"
+    program, reporter = _errors(code, max_errors=5)
+    assert reporter.get_error_count() == 5 and reporter.should_stop_compilation()
+    assert program is None
+
+    _, reporter = _errors("Cheese Glyn(x) = 1; # Wensleydale(x); NoCheese")
+    assert isinstance(reporter.errors[0], CheeseLexicalError)
+    assert reporter.get_errors_by_type(ErrorType.LEXICAL)[0].error_info.column_number == 21
+
+    with pytest.raises(LarkError):
+        parse(CODE)
+
+def test_compile_and_run_e_cli(tmp_path, capsys):
+    """Testa compile_and_run e execute_file relatando todos os erros"""
+    with pytest.raises(CheeseSyntaxError) as error:
+        compile_and_run(CODE)
+    message = str(error.value)
+    assert "Encontrados 3 erro(s)" in message and "line 4" in message
+
+    path = tmp_path / "erros.cheesepp"
+    path.write_text(CODE)
+    assert execute_file(str(path)) == 1
+    out = capsys.readouterr().out
+    assert out.count("SYNTAX ERROR") == 2 and "LEXICAL ERROR" in out
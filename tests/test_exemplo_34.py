@@ -0,0 +1,84 @@
+import io
+import json
+from cheesepp.cli import check_files
+from cheesepp.diagnostics import JSONLWriter, SARIFWriter, TextWriter, diagnostic
+from cheesepp.errors import CheeseSyntaxError, CheeseTypeError, ErrorReporter, ErrorType
+from cheesepp.parser import parse
+
+BROKEN = "Cheese\nGlyn(x) = 1 @ 2;\nGlyn(y) = );\nNoCheese"
+TYPED = "Cheese Glyn(t) = SwissaSwiss minus 1; NoCheese"
+
+def _files(tmp_path):
+    paths = []
+    for name, code in [("a.cheesepp", BROKEN), ("b.cheesepp", TYPED), ("c.cheesepp", "Cheese Wensleydale(1); NoCheese")]:
+        path = tmp_path / name
+        path.write_text(code)
+        paths.append(str(path))
+    return paths
+
+class _Lines(io.StringIO):
+    """Guarda o que já foi escrito a cada flush"""
+    def __init__(self):
+        super().__init__()
+        self.flushed = []
+
+    def flush(self):
+        self.flushed.append(self.getvalue())
+
+def test_jsonl_sai_a_cada_erro():
+    """Testa que cada erro vira uma linha JSON assim que é relatado"""
+    stream = _Lines()
+    reporter = ErrorReporter(sink=JSONLWriter(stream))
+    reporter.start_file("a.cheesepp")
+    parse(BROKEN, reporter=reporter)
+    assert len(stream.flushed) == 2
+    first = json.loads(stream.flushed[0])
+    assert first == {"file": "a.cheesepp", "line": 2, "column": 13, "type": "lexical",
+                     "message": "Invalid character '@'", "context": "Glyn(x) = 1 @ 2;", "suggestions": []}
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert records[1]["type"] == "syntax" and records[1]["suggestions"]
+
+def test_sarif_valido_depois_do_close():
+    """Testa o log SARIF escrito aos poucos e fechado no fim"""
+    stream = io.StringIO()
+    with SARIFWriter(stream) as sink:
+        assert stream.getvalue().endswith('"results": [\n')
+        sink.write(CheeseSyntaxError("Invalid syntax near ')'", 3, 11, "Glyn(y) = );", ["Expected one of: NAME"]), "dir\\a.cheesepp")
+        sink.write(CheeseTypeError("Invalid operation"), None)
+    log = json.loads(stream.getvalue())
+    assert log["version"] == "2.1.0"
+    first, second = log["runs"][0]["results"]
+    location = first["locations"][0]["physicalLocation"]
+    assert location["region"] == {"startLine": 3, "startColumn": 11, "snippet": {"text": "Glyn(y) = );"}}
+    assert first["ruleId"] == "syntax" and first["properties"]["suggestions"] == ["Expected one of: NAME"]
+    assert second["ruleId"] == "type" and "locations" not in second
+
+def test_memoria_limitada():
+    """Testa keep: os erros além do limite só entram nas contagens"""
+    reporter = ErrorReporter(keep=2)
+    for i in range(50):
+        reporter.start_file(f"f{i}")
+        reporter.report_error(CheeseSyntaxError("x", i + 1) if i % 2 else CheeseTypeError("y"))
+    assert len(reporter.errors) == 2 and reporter.get_error_count() == 50
+    assert reporter.counts == {ErrorType.TYPE: 25, ErrorType.SYNTAX: 25}
+    assert "e mais 48 erro(s)" in reporter.get_formatted_errors()
+    assert "- Syntax: 25" in reporter.get_summary()
+    # max_errors vale por arquivo
+    assert not reporter.should_stop_compilation()
+    assert TextWriter(io.StringIO()).format(CheeseSyntaxError("z", 4, 2), "f.cheesepp") == "f.cheesepp:4:2: syntax error: z\n"
+    assert diagnostic(CheeseTypeError("w"))["line"] is None
+
+def test_check_files(tmp_path, capsys):
+    """Testa o subcomando check em JSONL e SARIF sobre vários arquivos"""
+    paths = _files(tmp_path)
+    output = tmp_path / "out.jsonl"
+    assert check_files(paths + [str(tmp_path / "falta.cheesepp")], "jsonl", str(output)) == 1
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [(r["file"].rsplit("/", 1)[-1], r["type"]) for r in records] == [
+        ("a.cheesepp", "lexical"), ("a.cheesepp", "syntax"), ("b.cheesepp", "type"), ("falta.cheesepp", "runtime")]
+
+    assert check_files(paths, "sarif") == 1
+    log = json.loads(capsys.readouterr().out)
+    assert len(log["runs"][0]["results"]) == 3
+    assert check_files(paths[2:], "text") == 0
+    assert "0 error(s) in 1 file(s)" in capsys.readouterr().err
@@ -0,0 +1,64 @@
+import json
+import pytest
+from cheesepp import Runtime, check_semantics
+from cheesepp.cli import check_files, execute_file
+from cheesepp.ctx import CheeseContext
+from cheesepp.errors import CheeseSemanticError, CheeseTypeError
+from cheesepp.parser import parse
+
+def _messages(code, defined=None):
+    return [e.error_info.message for e in check_semantics(parse(code), defined)]
+
+def test_variavel_indefinida_com_sugestao():
+    """Testa o nome nunca atribuído e a sugestão do nome parecido"""
+    errors = check_semantics(parse("Cheese Glyn(total) = 1; Wensleydale(totla); Wensleydale(totla); NoCheese"))
+    assert len(errors) == 1 and isinstance(errors[0], CheeseSemanticError)
+    assert errors[0].error_info.message == "Variable 'totla' is not defined"
+    assert errors[0].error_info.suggestions[0] == "Did you mean 'total'?"
+
+def test_uso_antes_da_atribuicao():
+    """Testa leituras que podem vir antes da atribuição em Stilton e Cheddar"""
+    loop = "Cheese Cheddar Glyn(y) = 1; Coleraine 1 equals 1 Wensleydale(y); NoCheese"
+    assert _messages(loop) == ["Variable 'y' may be used before it is assigned"]
+    assert _messages("Cheese Wensleydale(x); Glyn(x) = 1; NoCheese") == [
+        "Variable 'x' may be used before it is assigned"]
+    # Atribuída nos dois ramos: definida depois do Stilton
+    both = "Cheese Stilton 1 equals 1 Blue Glyn(z) = 1; White Glyn(z) = 2; Wensleydale(z); NoCheese"
+    assert _messages(both) == []
+    assert _messages("Cheese Wensleydale(n); NoCheese", defined={"n"}) == []
+
+def test_erro_de_tipo():
+    """Testa que os conflitos da inferência entram no resultado"""
+    errors = check_semantics(parse("Cheese Glyn(t) = SwissaSwiss minus 1; NoCheese"))
+    assert [type(e) for e in errors] == [CheeseTypeError]
+
+def test_modo_estrito(tmp_path, capsys):
+    """Testa que o modo estrito recusa o programa e o normal roda como antes"""
+    program = parse("Cheese Glyn(a) = 1; Wensleydale(b); NoCheese")
+    context = CheeseContext()
+    Runtime(context=context).run(program)
+    assert context.get_output() == "0"
+
+    context = CheeseContext()
+    with pytest.raises(CheeseSemanticError):
+        Runtime(context=context, strict=True).run(program)
+    assert context.get_output() == ""
+
+    runtime = Runtime(strict=True)
+    runtime.env["b"] = 5
+    runtime.run(program)
+
+    path = tmp_path / "indefinida.cheesepp"
+    path.write_text("Cheese Glyn(a) = 1; Wensleydale(b); NoCheese")
+    assert execute_file(str(path), strict=True) == 1
+    assert "Variable 'b' is not defined" in capsys.readouterr().out
+    assert execute_file(str(path)) == 0
+
+def test_check_relata_semanticos(tmp_path):
+    """Testa o subcomando check com erros semânticos"""
+    path = tmp_path / "a.cheesepp"
+    path.write_text("Cheese Glyn(a) = 1; Wensleydale(b); NoCheese")
+    output = tmp_path / "out.jsonl"
+    assert check_files([str(path)], "jsonl", str(output)) == 1
+    record = json.loads(output.read_text())
+    assert record["type"] == "semantic" and record["message"] == "Variable 'b' is not defined"
@@ -0,0 +1,111 @@
+import pytest
+import cheesepp.memo as memo
+from cheesepp.errors import CheeseRuntimeError
+from cheesepp.memo import FileStore, MemoryStore, ResultCache, cache_key
+from cheesepp.program import Program
+from cheesepp.server import execute_request
+
+FATORIAL = """Cheese
+Glyn(r) = 1;
+Glyn(i) = 1;
+Cheddar
+    Glyn(r) = r times i;
+    Glyn(i) = i plus 1;
+Coleraine i greater n
+Wensleydale(Glyn(r));
+NoCheese"""
+
+class _Clock:
+    """Relógio controlado pelo teste no lugar do módulo time"""
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    time = perf_counter = monotonic
+
+def test_chave_normalizada_e_pureza():
+    """Testa que a chave ignora a formatação e que Belgian deixa o programa impuro"""
+    a = Program("Cheese Glyn(x) = 1; Wensleydale(x); NoCheese")
+    b = Program("Cheese\n   Glyn(x)   =  1;\n\nWensleydale(x);\nNoCheese")
+    assert a.fingerprint == b.fingerprint
+    assert cache_key(a, {"n": 1}) == cache_key(b, {"n": 1}) != cache_key(a, {"n": 1.0})
+    assert cache_key(a, {"n": 1, "m": 2}) == cache_key(a, {"m": 2, "n": 1})
+    belgian = Program("Cheese Stilton 1 equals 1 Blue Belgian; White Wensleydale(1); NoCheese")
+    assert not belgian.pure and cache_key(belgian) is None
+    assert cache_key(a, {"n": object()}) is None
+
+def test_resultado_reaproveitado(monkeypatch):
+    """Testa que a segunda execução igual não roda o programa"""
+    programa = Program(FATORIAL)
+    cache = ResultCache()
+    first = cache.run(programa, {"n": 5})
+    first.env["r"] = -1
+    first.output.append("x")
+
+    monkeypatch.setattr(Program, "run", lambda *a, **k: pytest.fail("executou de novo"))
+    again = cache.run(Program(FATORIAL.replace("\n", " ")), {"n": 5})
+    assert again.output == ["120"] and again.env == {"n": 5, "r": 120, "i": 6}
+    assert (cache.hits, cache.misses, cache.skipped) == (1, 1, 0)
+
+def test_impuros_e_falhas_fora_do_cache():
+    """Testa Belgian, entradas fora do JSON e o limite de tempo"""
+    cache = ResultCache()
+    belgian = Program("Cheese Belgian; NoCheese")
+    cache.run(belgian)
+    cache.run(belgian)
+    assert cache.skipped == 2 and len(cache.store) == 0
+
+    infinito = Program("Cheese Glyn(i) = 0; Cheddar Glyn(i) = i plus 1; Coleraine i less 0 NoCheese")
+    with pytest.raises(CheeseRuntimeError):
+        cache.run(infinito, time_limit=0.05)
+    assert len(cache.store) == 0
+
+    # Resultado que levou mais que o limite pedido não atende o pedido
+    programa = Program(FATORIAL)
+    cache.run(programa, {"n": 3})
+    [(_, entry)] = cache.store._entries.values()
+    entry.seconds = 10.0
+    cache.run(programa, {"n": 3}, time_limit=1.0)
+    assert cache.hits == 0 and cache.misses == 2
+    cache.run(programa, {"n": 3})
+    assert cache.hits == 1
+
+def test_tamanho_e_validade(monkeypatch, tmp_path):
+    """Testa o LRU, o TTL e o armazenamento em arquivos"""
+    clock = _Clock()
+    monkeypatch.setattr(memo, "time", clock)
+    programa = Program(FATORIAL)
+
+    cache = ResultCache(max_size=2, ttl=60)
+    for n in (1, 2, 3):
+        cache.run(programa, {"n": n})
+    assert len(cache.store) == 2 and cache.store.get(cache_key(programa, {"n": 1})) is None
+    clock.now += 61
+    cache.run(programa, {"n": 3})
+    assert cache.hits == 0 and cache.misses == 4
+
+    directory = str(tmp_path / "resultados")
+    cache = ResultCache(path=directory, max_size=10, ttl=60)
+    cache.run(programa, {"n": 4})
+    outro = ResultCache(FileStore(directory, ttl=60))
+    assert outro.run(programa, {"n": 4}).output == ["24"] and outro.hits == 1
+    clock.now += 61
+    outro.run(programa, {"n": 4})
+    assert outro.hits == 1
+
+    store = FileStore(directory, max_size=10)
+    for n in range(12):
+        cache.run(programa, {"n": n})
+    assert len(store) <= 10
+    (tmp_path / "resultados" / (cache_key(programa, {"n": 11}) + ".json")).write_text("{")
+    assert cache.store.get(cache_key(programa, {"n": 11})) is None
+
+def test_servidor_memoriza():
+    """Testa a marca memoized nas respostas do servidor"""
+    code = "Cheese Glyn(y) = x times 3; Wensleydale(Glyn(y)); NoCheese"
+    first = execute_request(code, {"x": 7})
+    second = execute_request(code, {"x": 7})
+    assert first["output"] == second["output"] == ["21"]
+    assert not first["timing"]["memoized"] and second["timing"]["memoized"]
@@ -0,0 +1,79 @@
+from cheesepp.ast import Belgian, CheeseAssign, CheeseLoop, CheesePrint
+from cheesepp.cli import execute_file
+from cheesepp.parser import parse
+from cheesepp.partial import partially_evaluate
+from cheesepp.program import Program
+from cheesepp.runtime import Runtime
+
+SOMA = """Cheese
+Glyn(soma) = 0;
+Glyn(i) = 1;
+Cheddar
+    Glyn(soma) = soma plus i;
+    Glyn(i) = i plus 1;
+Coleraine i greater 100
+Wensleydale(soma);
+Stilton soma greater 5000 Blue Wensleydale(SwissgrandeSwiss); White Wensleydale(SwisspequenoSwiss);
+NoCheese"""
+
+def _run(program, source=None, inputs=None):
+    output = []
+    runtime = Runtime(output=output.append)
+    runtime.env.update(inputs or {})
+    value = runtime.run(program, source)
+    return output, dict(runtime.env), value
+
+def test_programa_sem_entradas_vira_literais():
+    """Testa que laços e Stiltons conhecidos somem do residual"""
+    program = parse(SOMA)
+    residual, stats = partially_evaluate(program)
+    assert _run(residual) == _run(program) == (["5050", "grande"], {"soma": 5050, "i": 101}, "grande")
+    assert [type(stmt) for stmt in residual] == [CheeseAssign, CheeseAssign, CheesePrint, CheesePrint]
+    assert stats.folded == 5 and stats.residual == 4 and not stats.exhausted
+
+def test_comandos_que_ficam_no_residual():
+    """Testa Belgian, variáveis desconhecidas e falhas, com as atribuições antes"""
+    source = "Cheese Glyn(a) = 2; Belgian; Glyn(b) = a times 3; Wensleydale(b); NoCheese"
+    program = parse(source)
+    residual, stats = partially_evaluate(program)
+    assert _run(residual, source) == _run(program, source)
+    assert type(residual[1]) is Belgian and stats.folded == 3
+
+    program = parse("Cheese Glyn(a) = 1; Glyn(b) = n plus a; Wensleydale(b); Wensleydale(a); NoCheese")
+    residual, _ = partially_evaluate(program, closed=False)
+    assert _run(residual, inputs={"n": 4}) == _run(program, inputs={"n": 4})
+    assert residual[1] is program[1] and type(residual[-1]) is CheesePrint
+
+    program = parse("Cheese Wensleydale(1); Glyn(z) = 1 divided 0; Wensleydale(2); NoCheese")
+    residual, _ = partially_evaluate(program)
+    assert residual[1:] == program[1:]
+
+def test_combustivel():
+    """Testa que um laço infinito termina a compilação e fica no residual"""
+    program = parse("Cheese Glyn(i) = 0; Wensleydale(i); Cheddar Glyn(i) = i plus 1; Coleraine i less 0 NoCheese")
+    residual, stats = partially_evaluate(program, fuel=1000)
+    assert stats.exhausted and stats.fuel_used == 1001
+    assert type(residual[-1]) is CheeseLoop and residual[-1] is program[-1]
+
+    # Strings grandes demais para um literal também ficam como estão
+    program = parse("Cheese Glyn(s) = SwissaSwiss times 1000000; NoCheese")
+    residual, _ = partially_evaluate(program)
+    assert residual == program
+
+def test_program_e_cli(tmp_path, capsys):
+    """Testa Program(partial=True), as entradas e o tempo da fase"""
+    programa = Program(SOMA, partial=True)
+    assert "partial" in programa.timings and programa.stats["partial_folded"] == 5
+    assert programa.run().output == ["5050", "grande"]
+    assert Program.from_bytes(programa.to_bytes()).run().env == {"soma": 5050, "i": 101}
+
+    entradas = Program("Cheese Glyn(y) = x times 2; Glyn(k) = SwissokSwiss; Wensleydale(k); NoCheese", partial=True)
+    assert entradas.run({"x": 4}).env == {"x": 4, "y": 8, "k": "ok"}
+    assert entradas.stats["partial_folded"] == 2
+
+    path = tmp_path / "soma.cheesepp"
+    path.write_text(SOMA)
+    assert execute_file(str(path), verbose=True, partial=True) == 0
+    out = capsys.readouterr().out
+    assert "5050\ngrande\n" in out and "partial " in out
+    assert "Partial evaluation: 5 statements folded" in out